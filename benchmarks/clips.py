@@ -0,0 +1,80 @@
+# benchmarks/clips.py
+#
+# Synthetic test clips for the benchmarks, rendered with videotestsrc so no
+# sample media has to be shipped with the repo.
+
+import os
+import tempfile
+
+import gi
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+# (video encoder, audio encoder, muxer, extension), first one installed wins
+ENCODERS = [
+    ("x264enc tune=zerolatency", "vorbisenc", "matroskamux", "mkv"),
+    ("vp8enc deadline=1", "vorbisenc", "webmmux", "webm"),
+    ("theoraenc", "vorbisenc", "oggmux", "ogv"),
+    ("avenc_mpeg4", "avenc_ac3", "avimux", "avi"),
+]
+
+
+def _pick_encoder():
+    for video, audio, muxer, ext in ENCODERS:
+        names = (video.split()[0], audio, muxer)
+        if all(Gst.ElementFactory.find(n) for n in names):
+            return video, audio, muxer, ext
+    raise RuntimeError("No usable video encoder found (need x264, vpx, theora or libav plugins)")
+
+
+def render_clip(path, seconds=2.0, width=1280, height=720, fps=30, pattern="smpte", audio=True):
+    encoder, audio_encoder, muxer, _ = _pick_encoder()
+    frames = int(seconds * fps)
+    desc = (
+        f"videotestsrc num-buffers={frames} pattern={pattern} "
+        f"! video/x-raw,width={width},height={height},framerate={fps}/1 "
+        f"! videoconvert ! {encoder} ! queue ! mux. "
+        f"{muxer} name=mux ! filesink location=\"{path}\""
+    )
+    if audio:
+        samples = int(seconds * 48000)
+        desc += (
+            f" audiotestsrc num-buffers={samples // 1024} samplesperbuffer=1024 "
+            f"! audio/x-raw,rate=48000,channels=2 ! audioconvert ! {audio_encoder} ! queue ! mux."
+        )
+
+    pipeline = Gst.parse_launch(desc)
+    pipeline.set_state(Gst.State.PLAYING)
+    msg = pipeline.get_bus().timed_pop_filtered(
+        Gst.CLOCK_TIME_NONE, Gst.MessageType.EOS | Gst.MessageType.ERROR
+    )
+    pipeline.set_state(Gst.State.NULL)
+    if msg.type == Gst.MessageType.ERROR:
+        err, debug = msg.parse_error()
+        raise RuntimeError(f"Rendering {path} failed: {err.message}")
+    return path
+
+
+def make_clips(count, directory=None, **kwargs):
+    """Render `count` clips into `directory` (a temp dir by default) and return their paths."""
+    Gst.init(None)
+    directory = directory or tempfile.mkdtemp(prefix="cinesq-bench-")
+    os.makedirs(directory, exist_ok=True)
+    ext = _pick_encoder()[-1]
+    patterns = ["smpte", "ball", "snow", "checkers-8", "circular", "zone-plate"]
+
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"clip_{i:04}.{ext}")
+        if not os.path.exists(path):
+            render_clip(path, pattern=patterns[i % len(patterns)], **kwargs)
+        paths.append(path)
+    return paths
+
+
+def find_clips(directory):
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if not name.startswith(".") and os.path.isfile(os.path.join(directory, name))
+    )
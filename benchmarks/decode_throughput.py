@@ -0,0 +1,97 @@
+# benchmarks/decode_throughput.py
+#
+# Headless decode speed per rendering configuration.
+#
+#   python -m benchmarks.decode_throughput [FILE ...] [--threads 0,1,4]
+#
+# Each configuration decodes the files through playbin into
+# `fakesink sync=false` in a fresh process (decoder ranks are global to a
+# process) and reports decoded frames per second and CPU time per frame.
+# Without files, a 1080p videotestsrc clip is rendered first.
+
+import argparse
+import multiprocessing
+import sys
+import time
+
+import gi
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+
+def decode(path, decoder, threads):
+    from player.rendering import RenderConfig, apply_decoder_ranks, configure_decoder_threads
+
+    Gst.init(None)
+    config = RenderConfig(decoder=decoder, decoder_threads=threads)
+    apply_decoder_ranks(config)
+
+    frames = 0
+
+    def on_handoff(sink, buffer, pad):
+        nonlocal frames
+        frames += 1
+
+    pipeline = Gst.ElementFactory.make("playbin", None)
+    video_sink = Gst.ElementFactory.make("fakesink", None)
+    video_sink.set_property("sync", False)
+    video_sink.set_property("signal-handoffs", True)
+    video_sink.connect("handoff", on_handoff)
+    audio_sink = Gst.ElementFactory.make("fakesink", None)
+    audio_sink.set_property("sync", False)
+    pipeline.set_property("video-sink", video_sink)
+    pipeline.set_property("audio-sink", audio_sink)
+    pipeline.connect("element-setup", lambda p, e: configure_decoder_threads(e, threads))
+    pipeline.set_property("uri", Gst.filename_to_uri(path))
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    pipeline.set_state(Gst.State.PLAYING)
+    msg = pipeline.get_bus().timed_pop_filtered(
+        Gst.CLOCK_TIME_NONE, Gst.MessageType.EOS | Gst.MessageType.ERROR
+    )
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    pipeline.set_state(Gst.State.NULL)
+
+    error = None
+    if msg.type == Gst.MessageType.ERROR:
+        error = msg.parse_error()[0].message
+    return {"frames": frames, "wall": wall, "cpu": cpu, "error": error}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless decode throughput per configuration")
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--decoders", default="auto,software,hardware")
+    parser.add_argument("--threads", default="0,1,4", help="software decoder thread counts to try")
+    args = parser.parse_args(argv)
+
+    files = args.files
+    if not files:
+        from benchmarks.clips import make_clips
+        files = make_clips(1, seconds=10, width=1920, height=1080, audio=False)
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{'decoder':<10} {'threads':>7} {'frames':>8} {'fps':>9} {'cpu ms/frame':>13}")
+    for decoder in args.decoders.split(","):
+        for threads in (int(t) for t in args.threads.split(",")):
+            frames = wall = cpu = 0
+            errors = []
+            for path in files:
+                with ctx.Pool(1) as pool:
+                    result = pool.apply(decode, (path, decoder, threads))
+                frames += result["frames"]
+                wall += result["wall"]
+                cpu += result["cpu"]
+                if result["error"]:
+                    errors.append(f"{path}: {result['error']}")
+            fps = frames / wall if wall else 0.0
+            per_frame = cpu / frames * 1000 if frames else 0.0
+            print(f"{decoder:<10} {threads or 'default':>7} {frames:>8} {fps:>9.1f} {per_frame:>13.2f}")
+            for error in errors:
+                print(f"    {error}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# benchmarks/gapless_gap.py
+#
+# Gap between consecutive playlist items, measured at the video sink.
+#
+#   python -m benchmarks.gapless_gap [CLIP_DIR] [--count N] [--no-gapless]
+#
+# Plays a playlist of short clips in real time and reports, for every track
+# change, the wall-clock time between the last frame of one item and the
+# first frame of the next, minus one frame duration. --no-gapless switches
+# items by reopening on EOS, the way the player used to.
+
+import argparse
+import statistics
+import sys
+import time
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from benchmarks.clips import find_clips, make_clips
+from player.bus import BusDispatcher
+from player.gapless import GaplessController
+from player.opener import MediaOpener
+from player.playlist import Playlist
+
+from gi.repository import Gst
+
+FPS = 30
+
+
+class GapRecorder:
+    def __init__(self):
+        self.frames = []  # (wall clock, pts, stream number)
+        self.stream = 0
+
+    def on_stream_start(self):
+        self.stream += 1
+
+    def on_handoff(self, sink, buffer, pad):
+        # Streaming thread
+        self.frames.append((time.perf_counter(), buffer.pts, self.stream))
+
+    def gaps(self):
+        gaps = []
+        frame = 1.0 / FPS
+        for (t0, pts0, _), (t1, pts1, _) in zip(self.frames, self.frames[1:]):
+            # A new item starts its timestamps from zero again
+            if pts1 != Gst.CLOCK_TIME_NONE and pts0 != Gst.CLOCK_TIME_NONE and pts1 < pts0:
+                gaps.append(max(0.0, t1 - t0 - frame))
+        return gaps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the gap between playlist items")
+    parser.add_argument("clip_dir", nargs="?")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=0.5, help="length of generated clips")
+    parser.add_argument("--no-gapless", action="store_true")
+    args = parser.parse_args(argv)
+
+    Gst.init(None)
+    app = QCoreApplication(sys.argv[:1])
+    if args.clip_dir:
+        clips = find_clips(args.clip_dir)
+    else:
+        clips = make_clips(args.count, seconds=args.seconds, fps=FPS)
+
+    recorder = GapRecorder()
+    pipeline = Gst.ElementFactory.make("playbin", None)
+    video_sink = Gst.ElementFactory.make("fakesink", None)
+    video_sink.set_property("sync", True)
+    video_sink.set_property("signal-handoffs", True)
+    video_sink.connect("handoff", recorder.on_handoff)
+    audio_sink = Gst.ElementFactory.make("fakesink", None)
+    audio_sink.set_property("sync", True)
+    pipeline.set_property("video-sink", video_sink)
+    pipeline.set_property("audio-sink", audio_sink)
+
+    dispatcher = BusDispatcher(pipeline)
+    opener = MediaOpener(pipeline, dispatcher)
+    playlist = Playlist()
+    gapless = GaplessController(pipeline, dispatcher, playlist)
+    gapless.set_enabled(not args.no_gapless)
+
+    loop = QEventLoop()
+
+    def on_eos():
+        index = playlist.next_index()
+        if index >= 0:
+            playlist.set_index(index)
+        else:
+            loop.quit()
+
+    playlist.index_changed.connect(lambda i: opener.open(Gst.filename_to_uri(playlist.files[i])))
+    dispatcher.stream_start.connect(recorder.on_stream_start)
+    dispatcher.eos.connect(on_eos)
+    dispatcher.error.connect(lambda message, debug: (print(f"Error: {message}"), loop.quit()))
+
+    for path in clips:
+        playlist.add(path)
+    QTimer.singleShot(0, lambda: playlist.set_index(0))
+    loop.exec_()
+
+    gapless.shutdown()
+    opener.shutdown()
+
+    gaps = recorder.gaps()
+    mode = "reopen on EOS" if args.no_gapless else "gapless"
+    print(f"{len(clips)} items, {len(gaps)} track changes ({mode})")
+    if not gaps:
+        return 1
+    gaps.sort()
+    print(f"gap  median {statistics.median(gaps) * 1000:7.1f} ms   "
+          f"mean {statistics.mean(gaps) * 1000:7.1f} ms   max {gaps[-1] * 1000:7.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
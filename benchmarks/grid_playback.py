@@ -0,0 +1,136 @@
+# benchmarks/grid_playback.py
+#
+# Synced multi-stream playback and the cost of extra views.
+#
+#   python -m benchmarks.grid_playback [CLIP_DIR] [--streams N] [--seconds S]
+#       [--max-drops PERCENT] [--views N]
+#
+# Without CLIP_DIR, N videotestsrc clips of S seconds are rendered to a temp
+# dir. The default mode plays them in a GridSession into synced fakesinks
+# (a display would only add its own cost) and reports frames rendered and
+# dropped per stream, the largest offset from the first stream and the CPU
+# used; the exit code is 1 when a stream shows nothing or more than
+# --max-drops percent of all frames were dropped.
+#
+# --views N plays one clip N times instead, once through a single playbin
+# whose VideoTee feeds N fakesinks, then through N playbins, to show what
+# a second view costs with and without a second decode.
+
+import argparse
+import sys
+import time
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from benchmarks.clips import find_clips, make_clips
+from player.multiview import MAX_GRID_STREAMS, GridSession
+from player.rendering import VideoTee
+
+from gi.repository import Gst
+
+# On top of the clip length, for prerolling and the last frames
+SLACK_MS = 5000
+
+
+def fakesink():
+    sink = Gst.ElementFactory.make("fakesink", None)
+    sink.set_property("sync", True)
+    sink.set_property("qos", True)
+    return sink
+
+
+def run_session(session, seconds):
+    loop = QEventLoop()
+    session.finished.connect(loop.quit)
+    QTimer.singleShot(int(seconds * 1000) + SLACK_MS, loop.quit)
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    session.start(play=True)
+    loop.exec_()
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    stats = session.stats()
+    session.shutdown()
+    return stats, cpu, wall
+
+
+def run_tee(uri, views, seconds):
+    """One decode feeding `views` sinks through the player's VideoTee."""
+    pipeline = Gst.ElementFactory.make("playbin", None)
+    tee = VideoTee(fakesink())
+    for _ in range(views - 1):
+        tee.add_view(fakesink())
+    pipeline.set_property("video-sink", tee.bin)
+    pipeline.set_property("audio-sink", fakesink())
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    pipeline.set_property("uri", uri)
+    pipeline.set_state(Gst.State.PLAYING)
+    pipeline.get_bus().timed_pop_filtered(
+        (int(seconds * 1000) + SLACK_MS) * Gst.MSECOND, Gst.MessageType.EOS | Gst.MessageType.ERROR)
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    pipeline.set_state(Gst.State.NULL)
+    return cpu, wall
+
+
+def grid(clips, args):
+    session = GridSession([Gst.filename_to_uri(path) for path in clips],
+                          sink_factory=lambda i: fakesink(), audio_sink=fakesink())
+    stats, cpu, wall = run_session(session, args.seconds)
+
+    rendered = dropped = 0
+    worst_offset = 0.0
+    ok = True
+    for i, s in enumerate(stats):
+        offset = f"{s['offset_ms']:+7.1f} ms" if s["offset_ms"] is not None else "      -   "
+        print(f"stream {i + 1}: {s['rendered'] or 0:6} rendered {s['dropped'] or 0:6} dropped   offset {offset}")
+        rendered += s["rendered"] or 0
+        dropped += s["dropped"] or 0
+        if s["offset_ms"] is not None:
+            worst_offset = max(worst_offset, abs(s["offset_ms"]))
+        ok = ok and bool(s["rendered"])
+
+    total = rendered + dropped
+    drop_percent = dropped / total * 100 if total else 100.0
+    print()
+    print(f"{len(clips)} streams, {session.decoder_threads} decoder threads each: "
+          f"{drop_percent:.2f}% frames dropped (limit {args.max_drops}%), worst offset {worst_offset:.1f} ms")
+    print(f"CPU {cpu:.2f}s over {wall:.2f}s wall: {cpu / max(wall, 1e-9) * 100:.0f}% of one core")
+    return 0 if ok and drop_percent <= args.max_drops else 1
+
+
+def views(clips, args):
+    uri = Gst.filename_to_uri(clips[0])
+    tee_cpu, tee_wall = run_tee(uri, args.views, args.seconds)
+    session = GridSession([uri] * args.views, sink_factory=lambda i: fakesink(), audio_sink=fakesink())
+    _, grid_cpu, grid_wall = run_session(session, args.seconds)
+
+    print(f"{args.views} views of {clips[0]}")
+    print(f"one decode + tee  CPU {tee_cpu:6.2f}s over {tee_wall:6.2f}s wall")
+    print(f"{args.views} decodes         CPU {grid_cpu:6.2f}s over {grid_wall:6.2f}s wall")
+    print(f"decoding once takes {tee_cpu / max(grid_cpu, 1e-9) * 100:.0f}% of the CPU of decoding per view")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synced grid playback and extra view cost")
+    parser.add_argument("clip_dir", nargs="?")
+    parser.add_argument("--streams", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--max-drops", type=float, default=5.0, help="max dropped frames, percent of all")
+    parser.add_argument("--views", type=int, default=0, help="compare N views of one decode with N decodes")
+    args = parser.parse_args(argv)
+
+    Gst.init(None)
+    app = QCoreApplication(sys.argv[:1])
+    count = min(args.streams, MAX_GRID_STREAMS) if not args.views else 1
+    clips = find_clips(args.clip_dir)[:count] if args.clip_dir else make_clips(count, seconds=args.seconds)
+    if not clips:
+        print("No clips")
+        return 1
+    return views(clips, args) if args.views else grid(clips, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# benchmarks/ingest_drop.py
+#
+# Dropping a large folder: time to the first playable file, time until the
+# whole batch is in the playlist, and the worst GUI-thread stall meanwhile.
+#
+#   python -m benchmarks.ingest_drop [--files N] [--legacy]
+#
+# A temp tree of N files spread over nested folders is built from hard links
+# to a few rendered clips, with one non-media file in ten. --legacy sniffs
+# and adds every file one by one on the GUI thread, the way a drop used to
+# be handled.
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from benchmarks.clips import make_clips
+from benchmarks.open_latency import StallMeter
+from player.ingest import MediaIngest, is_media
+from player.playlist import Playlist
+
+TIMEOUT_MS = 120000
+
+
+def build_tree(root, files):
+    clips = make_clips(4, os.path.join(root, ".clips"), seconds=1)
+    for i in range(files):
+        directory = os.path.join(root, f"season {i // 500:02}", f"disc {i // 100 % 5}")
+        os.makedirs(directory, exist_ok=True)
+        if i % 10 == 9:
+            with open(os.path.join(directory, f"notes {i:05}.mkv"), "w") as f:
+                f.write("not a video, whatever the name says\n")
+        else:
+            clip = clips[i % len(clips)]
+            os.link(clip, os.path.join(directory, f"episode {i:05}{os.path.splitext(clip)[1]}"))
+
+
+def run_ingest(root, playlist):
+    ingest = MediaIngest()
+    loop = QEventLoop()
+    times = {}
+    start = time.perf_counter()
+    ingest.first_found.connect(lambda *_: times.setdefault("first", time.perf_counter() - start))
+
+    def finished(paths, stats):
+        playlist.add_many(paths)
+        times["done"] = time.perf_counter() - start
+        loop.quit()
+
+    ingest.finished.connect(finished)
+    ingest.ingest([root])
+    QTimer.singleShot(TIMEOUT_MS, loop.quit)
+    loop.exec_()
+    ingest.shutdown()
+    return times
+
+
+def run_legacy(root, playlist):
+    start = time.perf_counter()
+    times = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if is_media(path):
+                times.setdefault("first", time.perf_counter() - start)
+                playlist.add(path)
+    times["done"] = time.perf_counter() - start
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Folder drop latency and UI stall")
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--legacy", action="store_true", help="sniff and add on the GUI thread")
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication(sys.argv[:1])
+    root = tempfile.mkdtemp(prefix="cinesq-bench-drop-")
+    try:
+        build_tree(root, args.files)
+        playlist = Playlist()
+        notifications = []
+        playlist.changed.connect(lambda: notifications.append(1))
+
+        meter = StallMeter()
+        meter.start()
+        times = (run_legacy if args.legacy else run_ingest)(root, playlist)
+        stall = meter.stop()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if "done" not in times:
+        print("timed out")
+        return 1
+    label = "legacy" if args.legacy else "ingest"
+    print(f"{label}: {args.files} files, {len(playlist)} added in {len(notifications)} change notifications")
+    print(f"first playable {times.get('first', 0) * 1000:.1f} ms  all added {times['done'] * 1000:.1f} ms  "
+          f"worst UI stall {stall * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
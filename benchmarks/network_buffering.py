@@ -0,0 +1,146 @@
+# benchmarks/network_buffering.py
+#
+# Start-up time, stalls and throughput when playing over HTTP at a capped
+# bandwidth.
+#
+#   python -m benchmarks.network_buffering [CLIP] [--rate KBPS] [--seconds S]
+#       [--buffer-size KB] [--buffer-duration S] [--download]
+#
+# The clip (a rendered videotestsrc clip by default) is served from a local
+# http.server whose responses are throttled to --rate KB/s, and played in
+# real time through PlaybackEngine into fakesinks with the given buffering
+# settings. Run it with a few settings at a rate just above the clip's
+# bitrate to compare how often and how long playback stalls.
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from benchmarks.clips import make_clips
+from player.engine import PlaybackEngine
+from player.network import BufferConfig
+
+from gi.repository import Gst
+
+CHUNK = 16 * 1024
+
+
+class ThrottledHandler(SimpleHTTPRequestHandler):
+    """Serves files at no more than `rate` bytes per second per response."""
+
+    rate = 256 * 1024
+    sent = 0
+
+    def copyfile(self, source, outputfile):
+        start = time.perf_counter()
+        sent = 0
+        while True:
+            data = source.read(CHUNK)
+            if not data:
+                break
+            try:
+                outputfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                break
+            sent += len(data)
+            ThrottledHandler.sent += len(data)
+            ahead = sent / self.rate - (time.perf_counter() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(directory, rate):
+    ThrottledHandler.rate = rate
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(ThrottledHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fakesink():
+    sink = Gst.ElementFactory.make("fakesink", None)
+    sink.set_property("sync", True)
+    return sink
+
+
+def play(uri, config, timeout):
+    engine = PlaybackEngine(fakesink(), fakesink())
+    engine.buffering.apply(config)
+    result = {"first_frame": None, "error": None}
+    loop = QEventLoop()
+    start = time.perf_counter()
+
+    def on_phase(phase):
+        if phase == engine.opener.PLAYING and result["first_frame"] is None:
+            result["first_frame"] = time.perf_counter() - start
+
+    def on_error(message, debug):
+        result["error"] = message
+        loop.quit()
+
+    engine.opener.phase_changed.connect(on_phase)
+    engine.bus.eos.connect(loop.quit)
+    engine.bus.error.connect(on_error)
+    QTimer.singleShot(int(timeout * 1000), loop.quit)
+    engine.open(uri)
+    loop.exec_()
+    result["wall"] = time.perf_counter() - start
+
+    engine.buffering.reset()
+    result["stalls"] = engine.buffering.stalls
+    result["stall_time"] = engine.buffering.stall_time
+    engine.stop()
+    engine.shutdown()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Playback stalls over throttled HTTP")
+    parser.add_argument("clip", nargs="?")
+    parser.add_argument("--rate", type=int, default=400, help="bandwidth cap in KB/s")
+    parser.add_argument("--seconds", type=float, default=20.0, help="length of the rendered clip")
+    parser.add_argument("--buffer-size", type=int, default=-1, help="KB, -1 for the default")
+    parser.add_argument("--buffer-duration", type=float, default=-1, help="seconds, -1 for the default")
+    parser.add_argument("--download", action="store_true")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args(argv)
+
+    Gst.init(None)
+    app = QCoreApplication(sys.argv[:1])
+    clip = args.clip
+    if clip is None:
+        clip = make_clips(1, tempfile.mkdtemp(prefix="cinesq-net-"), seconds=args.seconds)[0]
+    clip = os.path.abspath(clip)
+    size = os.path.getsize(clip)
+
+    server = serve(os.path.dirname(clip), args.rate * 1024)
+    uri = f"http://127.0.0.1:{server.server_address[1]}/{os.path.basename(clip)}"
+    config = BufferConfig(size=args.buffer_size * 1024 if args.buffer_size > 0 else -1,
+                          duration=args.buffer_duration, download=args.download)
+    print(f"{os.path.basename(clip)}: {size / 1e6:.1f} MB at {args.rate} KB/s, {config.describe()}")
+
+    result = play(uri, config, args.timeout)
+    server.shutdown()
+
+    if result["error"]:
+        print(f"error: {result['error']}")
+        return 1
+    throughput = ThrottledHandler.sent / result["wall"] / 1024 if result["wall"] else 0
+    first = f"{result['first_frame'] * 1000:.0f} ms" if result["first_frame"] is not None else "never"
+    print(f"first frame {first}   stalls {result['stalls']}   "
+          f"stalled {result['stall_time']:.2f} s   wall {result['wall']:.1f} s   "
+          f"served {ThrottledHandler.sent / 1e6:.1f} MB ({throughput:.0f} KB/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
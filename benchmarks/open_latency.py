@@ -0,0 +1,138 @@
+# benchmarks/open_latency.py
+#
+# Time-to-first-frame and GUI-thread stall time when opening media.
+#
+#   python -m benchmarks.open_latency [CLIP_DIR] [--count N] [--legacy]
+#
+# Without CLIP_DIR a set of videotestsrc clips is rendered to a temp dir.
+# --legacy opens files the way CinesqPlayer used to (set_state on the GUI
+# thread) for comparison.
+
+import argparse
+import statistics
+import sys
+import time
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from benchmarks.clips import find_clips, make_clips
+from player.bus import BusDispatcher
+from player.opener import MediaOpener
+
+from gi.repository import Gst
+
+TICK_MS = 5
+TIMEOUT_MS = 15000
+
+
+class StallMeter:
+    """Longest gap between ticks of a fast GUI-thread timer."""
+
+    def __init__(self):
+        self.timer = QTimer()
+        self.timer.setInterval(TICK_MS)
+        self.timer.timeout.connect(self._tick)
+        self.last = 0.0
+        self.worst = 0.0
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.worst = 0.0
+        self.timer.start()
+
+    def stop(self):
+        self._tick()
+        self.timer.stop()
+        return self.worst
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.worst = max(self.worst, now - self.last - TICK_MS / 1000)
+        self.last = now
+
+
+class Probe:
+    def __init__(self):
+        self.pipeline = Gst.ElementFactory.make("playbin", None)
+        self.video_sink = Gst.ElementFactory.make("fakesink", None)
+        self.video_sink.set_property("signal-handoffs", True)
+        self.video_sink.connect("preroll-handoff", self._on_first_frame)
+        self.pipeline.set_property("video-sink", self.video_sink)
+        self.pipeline.set_property("audio-sink", Gst.ElementFactory.make("fakesink", None))
+
+        self.dispatcher = BusDispatcher(self.pipeline)
+        self.opener = MediaOpener(self.pipeline, self.dispatcher)
+        self.first_frame = None
+
+    def _on_first_frame(self, sink, buffer, pad):
+        # Streaming thread; only the first preroll buffer per open counts
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter()
+
+    def open(self, uri, legacy):
+        loop = QEventLoop()
+        self.opener.prerolled.connect(loop.quit)
+        self.dispatcher.error.connect(loop.quit)
+        QTimer.singleShot(TIMEOUT_MS, loop.quit)
+
+        self.first_frame = None
+        start = time.perf_counter()
+        if legacy:
+            self.pipeline.set_state(Gst.State.NULL)
+            self.pipeline.set_property("uri", uri)
+            self.pipeline.set_state(Gst.State.PAUSED)
+            self.pipeline.get_state(Gst.CLOCK_TIME_NONE)
+            loop.quit()
+        else:
+            self.opener.open(uri, play=False)
+            loop.exec_()
+
+        self.opener.prerolled.disconnect(loop.quit)
+        self.dispatcher.error.disconnect(loop.quit)
+        if self.first_frame is None:
+            return None
+        return self.first_frame - start
+
+
+def summarize(label, values):
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    print(f"{label:<20} median {statistics.median(values) * 1000:8.1f} ms   "
+          f"p95 {p95 * 1000:8.1f} ms   max {values[-1] * 1000:8.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time-to-first-frame and UI stall when opening media")
+    parser.add_argument("clip_dir", nargs="?")
+    parser.add_argument("--count", type=int, default=12)
+    parser.add_argument("--legacy", action="store_true", help="open on the GUI thread like the old player")
+    args = parser.parse_args(argv)
+
+    Gst.init(None)
+    app = QCoreApplication(sys.argv[:1])
+    clips = find_clips(args.clip_dir) if args.clip_dir else make_clips(args.count)
+
+    probe = Probe()
+    meter = StallMeter()
+    ttff, stalls = [], []
+    for path in clips:
+        meter.start()
+        elapsed = probe.open(Gst.filename_to_uri(path), args.legacy)
+        stall = meter.stop()
+        if elapsed is None:
+            print(f"{path}: no frame (error or timeout)")
+            continue
+        ttff.append(elapsed)
+        stalls.append(stall)
+        print(f"{path}: first frame {elapsed * 1000:7.1f} ms, worst UI stall {stall * 1000:7.1f} ms")
+
+    probe.opener.shutdown()
+    if ttff:
+        print()
+        summarize("time-to-first-frame", ttff)
+        summarize("UI-thread stall", stalls)
+    return 0 if ttff else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# benchmarks/playlist_scale.py
+#
+# Load, dedup, edit and scroll timings for a very large playlist.
+#
+#   python -m benchmarks.playlist_scale [--entries 100000]
+#
+# Runs on the offscreen Qt platform unless QT_QPA_PLATFORM says otherwise.
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QListView
+
+from player.playlist import Playlist, PlaylistModel
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed * 1000:10.2f} ms")
+    return result
+
+
+def scroll_through(app, view, steps):
+    bar = view.verticalScrollBar()
+    for i in range(steps + 1):
+        bar.setValue(bar.maximum() * i // steps)
+        view.viewport().repaint()
+        app.processEvents()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Large playlist benchmark")
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--scroll-steps", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    app = QApplication(sys.argv[:1])
+    playlist = Playlist()
+    view = QListView()
+    view.setUniformItemSizes(True)
+    view.setModel(PlaylistModel(playlist))
+    view.resize(600, 400)
+    view.show()
+    app.processEvents()
+
+    paths = [f"/media/library/show_{i // 1000:03}/episode_{i:06}.mkv" for i in range(args.entries)]
+
+    timed(f"load {args.entries} entries", playlist.add_many, paths)
+    app.processEvents()
+    timed(f"re-add {args.entries} duplicates", playlist.add_many, paths)
+    timed("add 1000 entries one by one", lambda: [playlist.add(f"/extra/{i}.mkv") for i in range(1000)])
+    timed("membership check x10000", lambda: [p in playlist for p in paths[::len(paths) // 10000 or 1]])
+    timed("remove one entry from the middle", playlist.remove, len(playlist) // 2)
+    timed("index_of after removal", playlist.index_of, paths[-1])
+    timed("move last entry to the top", playlist.move, len(playlist) - 1, 0)
+    timed(f"scroll top to bottom ({args.scroll_steps} steps)", scroll_through, app, view, args.scroll_steps)
+    timed("clear", playlist.clear)
+    app.processEvents()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
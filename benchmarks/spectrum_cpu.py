@@ -0,0 +1,77 @@
+# benchmarks/spectrum_cpu.py
+#
+# CPU cost of the spectrum visualizer's analysis on multichannel audio.
+#
+#   python -m benchmarks.spectrum_cpu [--rate HZ] [--channels N] [--seconds S]
+#       [--buffer FRAMES] [--budget PERCENT] [--unbatched]
+#
+# Synthetic float32 PCM (a few sines plus noise on every channel) is fed to
+# SpectrumAnalysis buffer by buffer, as the audio tap would. The CPU time
+# spent is compared with the audio's duration; the exit code is 1 when it
+# exceeds the budget. --unbatched transforms one window at a time in a
+# Python loop instead of one rfft per buffer, for comparison.
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from player.visualizer import FFT_SIZE, SpectrumAnalysis
+
+
+def synthesize(rate, channels, seconds):
+    t = np.arange(int(rate * seconds), dtype=np.float64) / rate
+    mono = 0.3 * np.sin(2 * np.pi * 110 * t) + 0.2 * np.sin(2 * np.pi * 1000 * t) \
+        + 0.1 * np.sin(2 * np.pi * 6000 * t)
+    rng = np.random.default_rng(0)
+    pcm = mono[:, None] + 0.05 * rng.standard_normal((len(t), channels))
+    return pcm.astype(np.float32)
+
+
+class UnbatchedAnalysis(SpectrumAnalysis):
+    def feed(self, data):
+        pcm = np.frombuffer(data, dtype=np.float32).reshape(-1, self.channels)
+        frames = np.concatenate((self._tail, pcm.mean(axis=1, dtype=np.float32)))
+        power = None
+        start = 0
+        while start + self.fft_size <= len(frames):
+            spectrum = np.abs(np.fft.rfft(frames[start:start + self.fft_size] * self.window)) ** 2
+            power = spectrum if power is None else power + spectrum
+            start += self.hop
+        self._tail = frames[start:]
+        return power
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Spectrum analysis CPU cost")
+    parser.add_argument("--rate", type=int, default=48000)
+    parser.add_argument("--channels", type=int, default=6)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--buffer", type=int, default=1024, help="frames per buffer")
+    parser.add_argument("--budget", type=float, default=2.0, help="max CPU, percent of one core")
+    parser.add_argument("--unbatched", action="store_true", help="one rfft call per window")
+    args = parser.parse_args(argv)
+
+    pcm = synthesize(args.rate, args.channels, args.seconds)
+    buffers = [pcm[i:i + args.buffer].tobytes() for i in range(0, len(pcm), args.buffer)]
+    analysis = (UnbatchedAnalysis if args.unbatched else SpectrumAnalysis)(args.rate, args.channels)
+
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    spectra = sum(analysis.feed(data) is not None for data in buffers)
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+
+    percent = cpu / args.seconds * 100
+    label = "unbatched" if args.unbatched else "batched"
+    print(f"{label}: {args.rate} Hz x {args.channels} ch, {len(buffers)} buffers of {args.buffer} frames, "
+          f"FFT {FFT_SIZE}, {spectra} updates")
+    print(f"{args.seconds:.0f}s of audio in {cpu * 1000:.0f} ms CPU ({wall * 1000:.0f} ms wall): "
+          f"{percent:.2f}% of one core, {args.seconds / max(wall, 1e-9):.0f}x realtime "
+          f"(budget {args.budget}%)")
+    return 0 if percent <= args.budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# benchmarks/startup.py
+#
+# Cold and warm start-up time of the full player.
+#
+#   python -m benchmarks.startup [--runs N] [--cold] [--max-window MS] [--max-ready MS]
+#
+# Each run launches `main.py --benchmark-startup` in a fresh process, which
+# quits once the window has painted and GStreamer is ready and prints its
+# startup profile. --cold removes the registry stamp before every run so
+# GStreamer rechecks its plugins. With --max-window/--max-ready the exit
+# status is non-zero when the median exceeds the budget, for use in CI
+# (set QT_QPA_PLATFORM=offscreen on headless machines).
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from player.startup import REGISTRY_STAMP
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(cold):
+    if cold:
+        try:
+            os.remove(REGISTRY_STAMP)
+        except FileNotFoundError:
+            pass
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "main.py", "--benchmark-startup"],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    wall = time.perf_counter() - start
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            report = json.loads(line)
+            report["process"] = wall
+            return report
+    return {"error": f"exit status {result.returncode}", "process": wall}
+
+
+def summarize(label, values):
+    values = sorted(values)
+    print(f"{label:<16} median {statistics.median(values) * 1000:8.1f} ms   "
+          f"min {values[0] * 1000:8.1f} ms   max {values[-1] * 1000:8.1f} ms")
+    return statistics.median(values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold and warm start-up time of the player")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--cold", action="store_true", help="invalidate the registry stamp first")
+    parser.add_argument("--max-window", type=float, help="fail above this median time-to-window (ms)")
+    parser.add_argument("--max-ready", type=float, help="fail above this median time-to-ready (ms)")
+    args = parser.parse_args(argv)
+
+    reports = []
+    for i in range(args.runs):
+        report = run_once(args.cold)
+        if "error" in report:
+            print(f"run {i + 1}: {report['error']}")
+            continue
+        reports.append(report)
+        phases = "  ".join(f"{name} {secs * 1000:.0f}" for name, secs in report["phases"].items())
+        print(f"run {i + 1}: {phases}  (ms)")
+
+    if not reports:
+        return 1
+    print()
+    window = summarize("time-to-window", [r["time_to_window"] for r in reports])
+    ready = summarize("time-to-ready", [r["time_to_ready"] for r in reports])
+    summarize("process", [r["process"] for r in reports])
+
+    failed = False
+    if args.max_window is not None and window * 1000 > args.max_window:
+        print(f"time-to-window over budget ({args.max_window:.0f} ms)")
+        failed = True
+    if args.max_ready is not None and ready * 1000 > args.max_ready:
+        print(f"time-to-ready over budget ({args.max_ready:.0f} ms)")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
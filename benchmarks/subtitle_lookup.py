@@ -0,0 +1,118 @@
+# benchmarks/subtitle_lookup.py
+#
+# Subtitle parse time and cue lookup cost.
+#
+#   python -m benchmarks.subtitle_lookup [FILE ...] [--cues N] [--lookups N]
+#
+# Without files, synthetic SRT and ASS files with N overlapping cues (the
+# ASS one carrying override tags, several MB at the default size) are
+# written to a temp dir. Lookups at random timestamps are timed against the
+# segment index and, for comparison, a linear scan over the raw cues.
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from player.subtitles import PARSERS, CueTrack, decode_subtitle, load_track
+
+
+def _stamp(ms, sep):
+    h, ms = divmod(ms, 3600000)
+    m, ms = divmod(ms, 60000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02}:{m:02}:{s:02}{sep}{ms:03}"
+
+
+def write_srt(path, cues):
+    with open(path, "w", encoding="utf-8") as f:
+        for n, (start, end, text) in enumerate(cues, 1):
+            f.write(f"{n}\n{_stamp(start, ',')} --> {_stamp(end, ',')}\n{text}\n\n")
+
+
+def write_ass(path, cues):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[Script Info]\nScriptType: v4.00+\n\n[Events]\n")
+        f.write("Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
+        for start, end, text in cues:
+            centis = lambda ms: _stamp(ms, ".")[1:-1]  # H:MM:SS.cc
+            body = "{\\an8\\fad(120,120)\\c&H00FFFF&}" + text.replace("\n", "\\N")
+            f.write(f"Dialogue: 0,{centis(start)},{centis(end)},Default,,0,0,0,,{body}\n")
+
+
+def synthetic_cues(count):
+    rng = random.Random(1)
+    cues = []
+    t = 0
+    for n in range(count):
+        length = rng.randint(800, 4000)
+        words = " ".join(rng.choice(("the", "player", "frame", "cue", "subtitle", "line"))
+                         for _ in range(rng.randint(4, 14)))
+        cues.append((t, t + length, f"{n}: {words}\nsecond line {n}"))
+        # Roughly one in five cues overlaps the next
+        t += length if rng.random() > 0.2 else length // 2
+    return cues
+
+
+def linear_lookup(cues, ms):
+    return "\n".join(text for start, end, text in cues if start <= ms < end)
+
+
+def bench_file(path, lookups):
+    size = os.path.getsize(path)
+    start = time.perf_counter()
+    track = load_track(path)
+    parse = time.perf_counter() - start
+
+    end = track.boundaries[-1]
+    rng = random.Random(2)
+    points = [rng.randrange(end) for _ in range(lookups)]
+    start = time.perf_counter()
+    for ms in points:
+        track.lookup(ms)
+    indexed = (time.perf_counter() - start) / lookups
+
+    with open(path, "rb") as f:
+        raw = PARSERS[os.path.splitext(path)[1].lower()](decode_subtitle(f.read()))
+    sample = points[:min(lookups, 200)]
+    start = time.perf_counter()
+    for ms in sample:
+        linear_lookup(raw, ms)
+    linear = (time.perf_counter() - start) / len(sample)
+
+    for ms in sample:
+        assert track.lookup(ms)[0] == linear_lookup(raw, ms), ms
+
+    print(f"{os.path.basename(path):<24} {size / 1e6:7.1f} MB {len(track):>8} cues  "
+          f"parse {parse * 1000:8.1f} ms  lookup {indexed * 1e6:6.2f} us  "
+          f"(linear scan {linear * 1e6:9.1f} us)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Subtitle parse time and cue lookup cost")
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--cues", type=int, default=60000)
+    parser.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    files = args.files
+    if not files:
+        directory = tempfile.mkdtemp(prefix="cinesq-subs-")
+        cues = synthetic_cues(args.cues)
+        files = [os.path.join(directory, "synthetic.srt"), os.path.join(directory, "synthetic.ass")]
+        write_srt(files[0], cues)
+        write_ass(files[1], cues)
+        # Index build alone, without file reading and parsing
+        start = time.perf_counter()
+        CueTrack(cues)
+        print(f"index build for {len(cues)} cues: {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    for path in files:
+        bench_file(path, args.lookups)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# benchmarks/theme_switch.py
+#
+# Theme-switch latency on a window with a large playlist.
+#
+#   python -m benchmarks.theme_switch [--entries N] [--switches N] [--legacy]
+#
+# A main window with the player controls and a playlist view holding N
+# entries is shown, then themes are switched back and forth; each switch is
+# timed until the event loop has re-polished and repainted everything.
+# --legacy re-reads the theme and sets it on the window each time, the way
+# CinesqPlayer used to. Runs offscreen unless QT_QPA_PLATFORM is set.
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QListView, QMainWindow, QVBoxLayout, QWidget
+
+from player.controls import PlayerControls
+from player.playlist import Playlist, PlaylistModel
+from player.theming import DEFAULT_THEME, LIGHT_THEME, ThemeManager
+
+
+def build_window(entries):
+    window = QMainWindow()
+    playlist = Playlist()
+    playlist.add_many([f"/media/videos/season {i // 100:03}/episode {i:06}.mkv" for i in range(entries)])
+    view = QListView()
+    view.setUniformItemSizes(True)
+    view.setModel(PlaylistModel(playlist, window))
+
+    central = QWidget()
+    layout = QVBoxLayout(central)
+    layout.addWidget(view)
+    layout.addWidget(PlayerControls(window))
+    window.setCentralWidget(central)
+    window.resize(1000, 700)
+    window.show()
+    # Keep the model alive with the window
+    window.playlist = playlist
+    return window
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Theme-switch latency with a large playlist")
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--switches", type=int, default=20)
+    parser.add_argument("--legacy", action="store_true", help="re-read and set the QSS on the window")
+    args = parser.parse_args(argv)
+
+    app = QApplication(sys.argv[:1])
+    window = build_window(args.entries)
+    app.processEvents()
+
+    manager = ThemeManager()
+    themes = [DEFAULT_THEME, LIGHT_THEME]
+    times = []
+    for i in range(args.switches):
+        name = themes[i % 2]
+        start = time.perf_counter()
+        if args.legacy:
+            # Read and resolved again, set on the window
+            window.setStyleSheet(manager.compile(name))
+        else:
+            manager.apply(name)
+        app.processEvents()
+        window.repaint()
+        times.append(time.perf_counter() - start)
+
+    first = times[0]
+    times.sort()
+    label = "legacy" if args.legacy else "theme manager"
+    print(f"{label}: {args.entries} playlist entries, {args.switches} switches")
+    print(f"first {first * 1000:.1f} ms  median {statistics.median(times) * 1000:.1f} ms  "
+          f"max {times[-1] * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
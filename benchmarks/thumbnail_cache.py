@@ -0,0 +1,68 @@
+# benchmarks/thumbnail_cache.py
+#
+# Cold vs. warm seek-preview sprite generation and cache hit rates.
+#
+#   python -m benchmarks.thumbnail_cache [CLIP_DIR] [--count N]
+#
+# Uses a throwaway cache directory so the user's cache is left alone.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtGui import QGuiApplication
+
+from benchmarks.clips import find_clips, make_clips
+from player.thumbnails import ThumbnailCache, ThumbnailEngine
+
+from gi.repository import Gst
+
+
+def build_all(engine, clips):
+    timings = []
+    for path in clips:
+        loop = QEventLoop()
+        engine.ready.connect(loop.quit)
+        QTimer.singleShot(60000, loop.quit)
+        start = time.perf_counter()
+        engine.request(path)
+        loop.exec_()
+        timings.append(time.perf_counter() - start)
+        engine.ready.disconnect(loop.quit)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seek-preview thumbnail cache benchmark")
+    parser.add_argument("clip_dir", nargs="?")
+    parser.add_argument("--count", type=int, default=6)
+    args = parser.parse_args(argv)
+
+    Gst.init(None)
+    app = QGuiApplication(sys.argv[:1])
+    clips = find_clips(args.clip_dir) if args.clip_dir else make_clips(args.count, seconds=10)
+
+    cache = ThumbnailCache(directory=tempfile.mkdtemp(prefix="cinesq-thumbs-"))
+    engine = ThumbnailEngine(cache)
+
+    for label in ("cold (generate)", "warm (from cache)"):
+        timings = build_all(engine, clips)
+        total = sum(timings)
+        print(f"{label:<18} {len(timings)} files  total {total * 1000:9.1f} ms  "
+              f"per file {total / len(timings) * 1000:8.1f} ms")
+
+    stats = cache.stats()
+    print(f"cache: {stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['evictions']} evictions, hit ratio {stats['hit_ratio']:.0%}; "
+          f"{engine.generated} sheets generated")
+    engine.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
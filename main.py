@@ -5,27 +5,92 @@
 #  License: MIT
 # ──────────────────────────────────────────────────────────────
 
+import logging
 import sys
+
+if __name__ == '__main__':
+    # Diagnostics from the player modules go to stderr with their module name
+    logging.basicConfig(level=logging.INFO, format="[%(name)s] %(levelname)s: %(message)s")
+
+# Before anything heavy: a running player takes the files and this process exits
+from player import remote
+
+if __name__ == '__main__' and "--new-instance" not in sys.argv and "--benchmark-startup" not in sys.argv:
+    # Without files the running player is just raised
+    _paths = [a for a in sys.argv[1:] if not a.startswith("-")]
+    if remote.forward(_paths, enqueue="--enqueue" in sys.argv):
+        sys.exit(0)
+
+# Then the startup profile, so its clock starts before the heavy imports
+from player.startup import profile
+
+import json
+import os
 import signal
 from PyQt5.QtWidgets import QApplication
+from player.instance import InstanceServer
+from player.controls import ICON_DIR
 from player.video_player import CinesqPlayer
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+
+BENCHMARK_TIMEOUT_MS = 30000
+
+
+def benchmark_startup(app):
+    """Quit as soon as the window is painted and the engine is ready, printing the profile."""
+    def check():
+        phases = profile.phases
+        if "window" in phases and "ready" in phases:
+            print(json.dumps({
+                "time_to_window": phases["window"],
+                "time_to_ready": phases["ready"],
+                "phases": phases,
+            }))
+            app.exit(0)
+        else:
+            QTimer.singleShot(10, check)
+
+    def timeout():
+        print(json.dumps({"error": "timed out", "phases": profile.phases}))
+        app.exit(1)
+
+    QTimer.singleShot(0, check)
+    QTimer.singleShot(BENCHMARK_TIMEOUT_MS, timeout)
+
 
 if __name__ == '__main__':
     # Handle Ctrl+C in terminal
     signal.signal(signal.SIGINT, signal.SIG_DFL)
 
+    benchmark = "--benchmark-startup" in sys.argv
+    single_instance = "--new-instance" not in sys.argv and not benchmark
+    enqueue = "--enqueue" in sys.argv
+    for flag in ("--benchmark-startup", "--new-instance", "--enqueue"):
+        while flag in sys.argv:
+            sys.argv.remove(flag)
+    paths = [remote.normalize(a) for a in sys.argv[1:] if not a.startswith("-")]
+    profile.mark("imports")
+
     # Create app instance
     app = QApplication(sys.argv)
     app.setApplicationName("Cinesq Player")
-    app.setWindowIcon(QIcon("assets/icons/app.svg"))
+    app.setWindowIcon(QIcon(os.path.join(ICON_DIR, "app.svg")))
     app.setAttribute(Qt.AA_EnableHighDpiScaling, True)
 
     # Launch player
     player = CinesqPlayer()
-    player.resize(1000, 600)
+    if not player.restore_geometry():
+        player.resize(1000, 600)
     player.show()
+    if benchmark:
+        benchmark_startup(app)
+    if single_instance:
+        server = InstanceServer(player)
+        if server.listen():
+            app.aboutToQuit.connect(server.close)
+    if paths:
+        player.ingest_paths(paths, play=not enqueue)
 
     # Run main loop
     sys.exit(app.exec_())
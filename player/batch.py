@@ -0,0 +1,205 @@
+# player/batch.py
+#
+# Headless playability check for large batches of files.
+#
+#   python -m player.batch FILE_OR_DIR ... [--workers N] [--timeout S] [-o results.jsonl]
+#
+# Every file is decoded as fast as possible through the same PlaybackEngine
+# the player uses, into fakesinks, in a pool of worker processes. One JSON
+# line per file goes to --output (stdout by default):
+#
+#   {"path": ..., "ok": true, "error": null, "duration": 5400.0,
+#    "decoded": 5399.96, "wall": 41.2, "speed": 131.1, "frames": 129599, "fps": 3145.6}
+#
+# decoded is where the shortest stream ended; speed is media seconds decoded
+# per wall-clock second. A file is not ok when it errors, times out, or any
+# of its audio and video streams stops well short of the duration.
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+import gi
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+from player.engine import PlaybackEngine
+from player.library import walk_media
+
+log = logging.getLogger(__name__)
+
+# Decoding stopping this far before the reported duration counts as truncated
+TRUNCATION_TOLERANCE = 2 * Gst.SECOND
+DEFAULT_TIMEOUT = 600
+TASKS_PER_WORKER = 200
+
+_checker = None
+
+
+class Checker:
+    """One worker's engine, reused from file to file."""
+
+    def __init__(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.video_sink = self._fakesink(self._on_video_buffer)
+        self.engine = PlaybackEngine(self.video_sink, self._fakesink(self._on_audio_buffer))
+        self.frames = 0
+        self.ends = {}    # "video"/"audio" -> end of the last buffer decoded
+
+    @staticmethod
+    def _fakesink(on_buffer):
+        sink = Gst.ElementFactory.make("fakesink", None)
+        sink.set_property("sync", False)
+        sink.set_property("signal-handoffs", True)
+        sink.connect("handoff", on_buffer)
+        return sink
+
+    def _on_video_buffer(self, sink, buffer, pad):
+        # Streaming thread
+        self.frames += 1
+        self._record_end("video", buffer)
+
+    def _on_audio_buffer(self, sink, buffer, pad):
+        self._record_end("audio", buffer)
+
+    def _record_end(self, kind, buffer):
+        self.ends.setdefault(kind, 0)
+        if buffer.pts != Gst.CLOCK_TIME_NONE:
+            end = buffer.pts + (buffer.duration if buffer.duration != Gst.CLOCK_TIME_NONE else 0)
+            self.ends[kind] = max(self.ends[kind], end)
+
+    def _present_streams(self):
+        """Kinds the file has: those that decoded anything, plus those playbin counted."""
+        kinds = set(self.ends)
+        for kind in ("video", "audio"):
+            prop = f"n-{kind}"
+            if self.engine.pipeline.find_property(prop) is not None \
+                    and self.engine.pipeline.get_property(prop) > 0:
+                kinds.add(kind)
+        return sorted(kinds)
+
+    def _truncated(self, duration, present):
+        """The first stream that stops well short of duration, as (kind, end), or None."""
+        for kind in present:
+            end = self.ends.get(kind, 0)
+            if end < duration - TRUNCATION_TOLERANCE:
+                return kind, end
+        return None
+
+    def check(self, path, timeout):
+        result = {"path": path, "ok": False, "error": None}
+        self.frames = 0
+        self.ends = {}
+        # Drain bus messages still queued from the previous file
+        self.app.processEvents()
+
+        loop = QEventLoop()
+        errors = []
+        bus = self.engine.bus
+        on_error = lambda message, debug: (errors.append(message), loop.quit())
+        bus.eos.connect(loop.quit)
+        bus.error.connect(on_error)
+        timer = QTimer()
+        timer.setSingleShot(True)
+        timer.timeout.connect(lambda: (errors.append(f"timed out after {timeout}s"), loop.quit()))
+
+        start = time.perf_counter()
+        self.engine.open(Gst.filename_to_uri(path), play=True)
+        timer.start(int(timeout * 1000))
+        loop.exec_()
+        wall = time.perf_counter() - start
+        timer.stop()
+        bus.eos.disconnect(loop.quit)
+        bus.error.disconnect(on_error)
+
+        ok, duration = self.engine.pipeline.query_duration(Gst.Format.TIME)
+        duration = duration if ok and duration > 0 else 0
+        present = self._present_streams()
+        self.engine.stop()
+        # Wait for the teardown here, so a timed-out file's late buffers
+        # can't land in the next file's counters
+        self.engine.pipeline.set_state(Gst.State.NULL)
+
+        # Each stream on its own: intact audio doesn't cover for a cut-off video
+        truncated = self._truncated(duration, present) if duration else None
+        decoded = min((self.ends.get(kind, 0) for kind in present), default=0)
+        if errors:
+            result["error"] = errors[0]
+        elif truncated:
+            kind, end = truncated
+            result["error"] = (f"{kind} decoding stopped at {end / Gst.SECOND:.2f}s "
+                               f"of {duration / Gst.SECOND:.2f}s")
+        else:
+            result["ok"] = True
+        result.update({
+            "duration": round(duration / Gst.SECOND, 3),
+            "decoded": round(decoded / Gst.SECOND, 3),
+            "wall": round(wall, 3),
+            "speed": round(decoded / Gst.SECOND / wall, 2) if wall else 0.0,
+            "frames": self.frames,
+            "fps": round(self.frames / wall, 1) if wall else 0.0,
+        })
+        return result
+
+
+def _init_worker():
+    global _checker
+    Gst.init(None)
+    _checker = Checker()
+
+
+def _check(task):
+    path, timeout = task
+    try:
+        return _checker.check(path, timeout)
+    except Exception as e:
+        return {"path": path, "ok": False, "error": f"checker crashed: {e}"}
+
+
+def expand(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for found, _ in walk_media(path):
+                yield found
+        else:
+            yield os.path.abspath(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless playability check for media files")
+    parser.add_argument("paths", nargs="+", help="files, or folders searched for media")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per file")
+    parser.add_argument("-o", "--output", help="JSON lines file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    tasks = [(path, args.timeout) for path in expand(args.paths)]
+    out = open(args.output, "w") if args.output else sys.stdout
+    failed = 0
+    start = time.perf_counter()
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(args.workers, initializer=_init_worker,
+                      maxtasksperchild=TASKS_PER_WORKER) as pool:
+            for result in pool.imap_unordered(_check, tasks):
+                failed += not result["ok"]
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"[Batch] {len(tasks)} files, {failed} failed in {time.perf_counter() - start:.1f}s",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="[%(name)s] %(levelname)s: %(message)s")
+    sys.exit(main())
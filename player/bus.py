@@ -0,0 +1,171 @@
+# player/bus.py
+
+import gi
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+
+class BusDispatcher(QObject):
+    """Hands pipeline bus messages over to the Qt event loop.
+
+    GStreamer posts messages from its streaming threads. A sync handler
+    re-emits each one through a queued signal, so every public signal below
+    fires on the GUI thread and nothing has to poll the bus.
+    """
+
+    # Raw message, re-delivered on the thread that owns the dispatcher
+    _posted = pyqtSignal(object)
+
+    message = pyqtSignal(object)
+    eos = pyqtSignal()
+    error = pyqtSignal(str, str)
+    warning = pyqtSignal(str, str)
+    state_changed = pyqtSignal(object, object)
+    duration_changed = pyqtSignal()
+    buffering = pyqtSignal(int)
+    async_done = pyqtSignal()
+    stream_start = pyqtSignal()
+
+    def __init__(self, pipeline, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self._sync_handlers = []
+        self._posted.connect(self._dispatch, Qt.QueuedConnection)
+
+        self.bus = pipeline.get_bus()
+        self.bus.set_sync_handler(self._on_sync_message)
+
+    def add_sync_handler(self, handler):
+        """Register handler(message) -> bool, run on the posting thread.
+
+        Only for messages that must be answered before the posting element
+        continues, like prepare-window-handle. Returning True consumes the
+        message instead of forwarding it to the GUI thread.
+        """
+        self._sync_handlers.append(handler)
+
+    def shutdown(self):
+        self.bus.set_sync_handler(None)
+
+    def _on_sync_message(self, bus, message):
+        # Streaming thread: answer what can't wait, hand everything else over.
+        for handler in self._sync_handlers:
+            if handler(message):
+                return Gst.BusSyncReply.DROP
+        self._posted.emit(message)
+        return Gst.BusSyncReply.DROP
+
+    def _dispatch(self, message):
+        t = message.type
+        if t == Gst.MessageType.EOS:
+            self.eos.emit()
+        elif t == Gst.MessageType.ERROR:
+            err, debug = message.parse_error()
+            self.error.emit(err.message, debug or "")
+        elif t == Gst.MessageType.WARNING:
+            err, debug = message.parse_warning()
+            self.warning.emit(err.message, debug or "")
+        elif t == Gst.MessageType.STATE_CHANGED:
+            # Child elements post these too; only the pipeline's own matter
+            if message.src == self.pipeline:
+                old, new, _ = message.parse_state_changed()
+                self.state_changed.emit(old, new)
+        elif t == Gst.MessageType.DURATION_CHANGED:
+            self.duration_changed.emit()
+        elif t == Gst.MessageType.BUFFERING:
+            self.buffering.emit(message.parse_buffering())
+        elif t == Gst.MessageType.ASYNC_DONE:
+            self.async_done.emit()
+        elif t == Gst.MessageType.STREAM_START:
+            self.stream_start.emit()
+
+        self.message.emit(message)
+
+
+class PositionTracker(QObject):
+    """Polls the playback position only while the pipeline is PLAYING.
+
+    The poll interval follows the seek slider's pixel width: there is no
+    point in asking for the position more often than the handle can move
+    by one pixel. Duration is queried once and cached until the pipeline
+    reports a DURATION_CHANGED message. While suspended (nothing on screen
+    shows the position) the timer doesn't run at all.
+    """
+
+    MIN_INTERVAL_MS = 40
+    MAX_INTERVAL_MS = 1000  # time labels show whole seconds
+
+    position_changed = pyqtSignal(int, int)  # position, duration (ns)
+
+    def __init__(self, pipeline, dispatcher, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.position = 0
+        self.duration = None
+        self.resolution = 1000
+        self.playing = False
+        self.suspended = False
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.MAX_INTERVAL_MS)
+        self.timer.timeout.connect(self.poll)
+
+        dispatcher.state_changed.connect(self._on_state_changed)
+        dispatcher.duration_changed.connect(self.invalidate_duration)
+        dispatcher.async_done.connect(self.poll)
+
+    def reset(self):
+        self.timer.stop()
+        self.position = 0
+        self.duration = None
+
+    def invalidate_duration(self):
+        self.duration = None
+
+    def set_duration(self, duration):
+        """Duration known ahead (e.g. from a probe); a DURATION_CHANGED replaces it."""
+        self.duration = duration
+        self._update_interval()
+
+    def set_resolution(self, pixels):
+        self.resolution = max(1, int(pixels))
+        self._update_interval()
+
+    def _update_interval(self):
+        interval = self.MAX_INTERVAL_MS
+        if self.duration:
+            per_pixel = self.duration // Gst.MSECOND // self.resolution
+            interval = min(max(per_pixel, self.MIN_INTERVAL_MS), self.MAX_INTERVAL_MS)
+        self.timer.setInterval(int(interval))
+
+    def set_suspended(self, suspended):
+        self.suspended = suspended
+        if suspended:
+            self.timer.stop()
+        elif self.playing:
+            self.poll()
+            self.timer.start()
+
+    def _on_state_changed(self, old, new):
+        self.playing = new == Gst.State.PLAYING
+        if self.playing:
+            if not self.suspended:
+                self.timer.start()
+        else:
+            self.timer.stop()
+            if new == Gst.State.PAUSED:
+                self.poll()
+
+    def poll(self):
+        if self.duration is None:
+            ok, dur = self.pipeline.query_duration(Gst.Format.TIME)
+            if ok and dur > 0:
+                self.duration = dur
+                self._update_interval()
+
+        ok, pos = self.pipeline.query_position(Gst.Format.TIME)
+        if ok:
+            self.position = pos
+            self.position_changed.emit(pos, self.duration or 0)
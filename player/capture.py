@@ -0,0 +1,294 @@
+# player/capture.py
+#
+# Screenshots of the playing video, and batch frame export.
+#
+#   python -m player.capture FILE (--every N | --at SECONDS,...) [-o DIR]
+#       [--format png|jpg] [--workers N]
+#
+# Batch export decodes the file in a pool of worker processes, each with its
+# own pipeline running as fast as it can decode: --every splits the file
+# into one time range per worker, --at spreads the timestamps over them.
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gi
+from PyQt5.QtCore import QCoreApplication, QObject, QStandardPaths, Qt, pyqtSignal
+from PyQt5.QtGui import QImage
+
+gi.require_version('Gst', '1.0')
+gi.require_version('GstVideo', '1.0')
+from gi.repository import Gst, GstVideo
+
+log = logging.getLogger(__name__)
+
+FORMATS = {"png": "PNG", "jpg": "JPEG", "jpeg": "JPEG"}
+JPEG_QUALITY = 95
+CONVERT_TIMEOUT = 5 * Gst.SECOND
+STATE_TIMEOUT = 10 * Gst.SECOND
+
+
+def screenshot_dir():
+    pictures = QStandardPaths.writableLocation(QStandardPaths.PicturesLocation) or os.path.expanduser("~")
+    return os.path.join(pictures, "Cinesq")
+
+
+def frame_name(media_path, position, fmt):
+    ms = position // Gst.MSECOND
+    stamp = f"{ms // 3600000:02}-{ms // 60000 % 60:02}-{ms // 1000 % 60:02}.{ms % 1000:03}"
+    return f"{os.path.splitext(os.path.basename(media_path))[0]}_{stamp}.{fmt}"
+
+
+def sample_to_image(sample):
+    """QImage of an RGBx sample; copies, so the buffer can go right away."""
+    structure = sample.get_caps().get_structure(0)
+    w, h = structure.get_value("width"), structure.get_value("height")
+    buffer = sample.get_buffer()
+    ok, info = buffer.map(Gst.MapFlags.READ)
+    if not ok:
+        return None
+    try:
+        # RGBx rows are 4-byte aligned already, so the stride is w * 4
+        return QImage(bytes(info.data), w, h, w * 4, QImage.Format_RGBX8888).copy()
+    finally:
+        buffer.unmap(info)
+
+
+def save_image(image, path, fmt):
+    if not image.save(path, FORMATS[fmt], JPEG_QUALITY if FORMATS[fmt] == "JPEG" else -1):
+        raise OSError(f"could not write {path}")
+    return path
+
+
+def _display_caps(sample):
+    """RGBx caps at the sample's display size, so anamorphic video isn't squeezed."""
+    structure = sample.get_caps().get_structure(0)
+    w, h = structure.get_value("width"), structure.get_value("height")
+    ok, par_n, par_d = structure.get_fraction("pixel-aspect-ratio")
+    if ok and par_n and par_d:
+        w = w * par_n // par_d
+    return Gst.Caps.from_string(f"video/x-raw,format=RGBx,width={w},height={h},pixel-aspect-ratio=1/1")
+
+
+# ─── Screenshots ─────────────
+
+class FrameCapture(QObject):
+    """Saves the frame on screen without pausing or touching the pipeline.
+
+    playbin's `sample` property hands out a reference to the buffer the
+    video sink shows last, which costs nothing on the GUI thread; scaling
+    to display size, colour conversion and encoding run on a thread pool.
+    Batch export (export()) runs export_frames() from a worker thread.
+    """
+
+    saved = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    exported = pyqtSignal(str, int)   # media path, frames written
+
+    # Worker -> GUI thread: (path or None, message)
+    _done = pyqtSignal(object, str)
+    _exported = pyqtSignal(str, object)
+
+    def __init__(self, pipeline, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.directory = screenshot_dir()
+        self._executor = ThreadPoolExecutor(max_workers=max(2, (os.cpu_count() or 2) // 2),
+                                            thread_name_prefix="cinesq-capture")
+        self._done.connect(self._on_done, Qt.QueuedConnection)
+        self._exported.connect(self._on_exported, Qt.QueuedConnection)
+
+    def capture(self, media_path, fmt="png"):
+        sample = self.pipeline.get_property("sample")
+        if sample is None:
+            self.failed.emit("No video frame to capture")
+            return
+        ok, position = self.pipeline.query_position(Gst.Format.TIME)
+        if not ok:
+            position = sample.get_buffer().pts
+        path = os.path.join(self.directory, frame_name(media_path, max(position, 0), fmt))
+        self._executor.submit(self._save, sample, path, fmt)
+
+    def export(self, media_path, directory, every=None, timestamps=None, fmt="png", workers=None):
+        self._executor.submit(self._export, media_path, directory, every, timestamps, fmt, workers)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def _save(self, sample, path, fmt):
+        # Worker thread
+        try:
+            converted = GstVideo.video_convert_sample(sample, _display_caps(sample), CONVERT_TIMEOUT)
+            image = sample_to_image(converted)
+            if image is None:
+                raise OSError("could not read the frame")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._done.emit(save_image(image, path, fmt), "")
+        except Exception as e:
+            self._done.emit(None, str(e))
+
+    def _export(self, media_path, directory, every, timestamps, fmt, workers):
+        # Worker thread; the decoding happens in worker processes
+        try:
+            written = export_frames(media_path, directory, every, timestamps, fmt, workers)
+        except Exception as e:
+            written = e
+        self._exported.emit(media_path, written)
+
+    def _on_done(self, path, message):
+        if path is None:
+            log.warning("Screenshot failed: %s", message)
+            self.failed.emit(message)
+        else:
+            self.saved.emit(path)
+
+    def _on_exported(self, media_path, written):
+        if isinstance(written, Exception):
+            log.warning("Export of %s failed: %s", media_path, written)
+            self.failed.emit(str(written))
+        else:
+            self.exported.emit(media_path, len(written))
+
+
+# ─── Batch export ─────────────
+
+class FrameDecoder:
+    """A decode-only pipeline delivering RGBx frames to an appsink."""
+
+    def __init__(self, media_path):
+        self.pipeline = Gst.parse_launch(
+            "uridecodebin name=src ! videoconvert ! videoscale "
+            "! video/x-raw,format=RGBx,pixel-aspect-ratio=1/1 "
+            "! appsink name=sink sync=false max-buffers=4"
+        )
+        self.pipeline.get_by_name("src").set_property("uri", Gst.filename_to_uri(media_path))
+        self.sink = self.pipeline.get_by_name("sink")
+        # uridecodebin exposes audio too; anything but video is dropped
+        self.pipeline.get_by_name("src").connect("autoplug-continue", self._video_only)
+
+    @staticmethod
+    def _video_only(bin, pad, caps):
+        name = caps.get_structure(0).get_name() if caps.get_size() else ""
+        return not name.startswith("audio/") and not name.startswith("text/")
+
+    def preroll(self):
+        self.pipeline.set_state(Gst.State.PAUSED)
+        if self.pipeline.get_state(STATE_TIMEOUT).state != Gst.State.PAUSED:
+            raise RuntimeError("no decodable video stream")
+        sample = self.sink.emit("pull-preroll")
+        structure = sample.get_caps().get_structure(0)
+        ok, num, den = structure.get_fraction("framerate")
+        ok_dur, duration = self.pipeline.query_duration(Gst.Format.TIME)
+        return (num / den if ok and num and den else 0.0), (duration if ok_dur else 0)
+
+    def frame_at(self, position):
+        self.pipeline.seek_simple(Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.ACCURATE, position)
+        self.pipeline.get_state(STATE_TIMEOUT)
+        return self.sink.emit("pull-preroll")
+
+    def frames(self, start, stop):
+        """Every decoded sample between start and stop (ns), as fast as decoding goes."""
+        self.pipeline.seek(1.0, Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.ACCURATE,
+                           Gst.SeekType.SET, start, Gst.SeekType.SET, stop)
+        self.pipeline.get_state(STATE_TIMEOUT)
+        self.pipeline.set_state(Gst.State.PLAYING)
+        while True:
+            sample = self.sink.emit("try-pull-sample", STATE_TIMEOUT)
+            if sample is None:
+                return
+            yield sample
+
+    def close(self):
+        self.pipeline.set_state(Gst.State.NULL)
+
+
+def _export_task(task):
+    media_path, directory, fmt, mode, args = task
+    Gst.init(None)
+    app = QCoreApplication.instance() or QCoreApplication([])  # image format plugins
+    decoder = FrameDecoder(media_path)
+    written = []
+    try:
+        fps, _ = decoder.preroll()
+        if mode == "at":
+            samples = (decoder.frame_at(t) for t in args)
+        else:
+            start, stop, every = args
+            samples = decoder.frames(start, stop)
+        for sample in samples:
+            if sample is None:
+                continue
+            pts = sample.get_buffer().pts
+            if mode == "every":
+                # Numbered from the stream start, so ranges split anywhere agree;
+                # a frame right on the boundary belongs to the next range
+                if pts >= stop or round(pts * fps / Gst.SECOND) % every:
+                    continue
+            image = sample_to_image(sample)
+            if image is not None:
+                path = os.path.join(directory, frame_name(media_path, pts, fmt))
+                written.append(save_image(image, path, fmt))
+    finally:
+        decoder.close()
+    return written
+
+
+def export_frames(media_path, directory, every=None, timestamps=None, fmt="png", workers=None):
+    """Write every Nth frame, or the frames at the given times (ns); returns the paths."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported format {fmt}")
+    workers = workers or os.cpu_count() or 2
+    os.makedirs(directory, exist_ok=True)
+    Gst.init(None)
+    probe = FrameDecoder(media_path)
+    try:
+        _, duration = probe.preroll()
+    finally:
+        probe.close()
+
+    if timestamps:
+        times = sorted(timestamps)
+        # Each worker gets a contiguous run, so its seeks only move forward
+        chunk = -(-len(times) // workers)
+        tasks = [(media_path, directory, fmt, "at", times[i:i + chunk]) for i in range(0, len(times), chunk)]
+    else:
+        if not every or every < 1:
+            raise ValueError("either every or timestamps is needed")
+        if duration <= 0:
+            raise RuntimeError("duration unknown, cannot split the file")
+        step = -(-duration // workers)
+        tasks = [(media_path, directory, fmt, "every", (start, min(start + step, duration), every))
+                 for start in range(0, duration, step)]
+
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(min(workers, len(tasks))) as pool:
+        return [path for paths in pool.imap(_export_task, tasks) for path in paths]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export frames from a video file")
+    parser.add_argument("path")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--every", type=int, help="every Nth frame")
+    mode.add_argument("--at", help="comma-separated timestamps in seconds")
+    parser.add_argument("-o", "--output", default=".", help="output directory")
+    parser.add_argument("--format", default="png", choices=sorted(FORMATS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args(argv)
+
+    timestamps = [int(float(t) * Gst.SECOND) for t in args.at.split(",")] if args.at else None
+    start = time.perf_counter()
+    written = export_frames(os.path.abspath(args.path), args.output, args.every, timestamps,
+                            args.format, args.workers)
+    print(f"[Capture] {len(written)} frames in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0 if written else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="[%(name)s] %(levelname)s: %(message)s")
+    sys.exit(main())
@@ -1,10 +1,157 @@
 # player/controls.py
 
+import os
+
 from PyQt5.QtWidgets import (
-    QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QSlider, QLabel, QSizePolicy
+    QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QSlider, QLabel, QSizePolicy,
+    QStyle, QStyleOptionSlider
 )
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import Qt, QSize, QPoint, pyqtSignal
+from PyQt5.QtGui import QIcon, QPixmap
+
+ICON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "icons")
+
+
+# ─── Icons ─────────────
+
+class IconCache:
+    """SVG icons rasterized once per size, device pixel ratio and theme.
+
+    Building a QIcon from an SVG path parses the file again every time it is
+    painted at a new size; here each icon is rendered to a pixmap at the
+    exact size the button shows it and reused. Themes may override icons
+    with files in ICON_DIR/<theme>/.
+    """
+
+    def __init__(self, directory=ICON_DIR):
+        self.directory = directory
+        self.theme = None
+        self._icons = {}  # (name, size, ratio, theme) -> QIcon
+
+    def set_theme(self, theme):
+        self.theme = theme
+
+    def get(self, name, size, ratio=1.0):
+        key = (name, size, ratio, self.theme)
+        icon = self._icons.get(key)
+        if icon is None:
+            path = os.path.join(self.directory, f"{name}.svg")
+            if self.theme:
+                themed = os.path.join(self.directory, self.theme, f"{name}.svg")
+                if os.path.exists(themed):
+                    path = themed
+            pixmap = QIcon(path).pixmap(QSize(round(size * ratio), round(size * ratio)))
+            pixmap.setDevicePixelRatio(ratio)
+            icon = self._icons[key] = QIcon(pixmap)
+        return icon
+
+
+icons = IconCache()
+
+
+class SeekSlider(QSlider):
+    """Seek slider that reports where the mouse hovers, as a 0..1 fraction."""
+
+    hovered = pyqtSignal(float, QPoint)  # fraction, global position of the cursor
+    hover_left = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(Qt.Horizontal, parent)
+        self.setMouseTracking(True)
+
+    def fraction_at(self, x):
+        opt = QStyleOptionSlider()
+        self.initStyleOption(opt)
+        groove = self.style().subControlRect(QStyle.CC_Slider, opt, QStyle.SC_SliderGroove, self)
+        handle = self.style().subControlRect(QStyle.CC_Slider, opt, QStyle.SC_SliderHandle, self)
+        span = groove.width() - handle.width()
+        value = QStyle.sliderValueFromPosition(
+            self.minimum(), self.maximum(), x - groove.x() - handle.width() // 2, span
+        )
+        return (value - self.minimum()) / max(1, self.maximum() - self.minimum())
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        self.hovered.emit(self.fraction_at(event.x()), event.globalPos())
+
+    def leaveEvent(self, event):
+        super().leaveEvent(event)
+        self.hover_left.emit()
+
+
+class SeekPreview(QWidget):
+    """Tooltip-style popup with a thumbnail and a timestamp."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.ToolTip | Qt.FramelessWindowHint)
+        self.image = QLabel()
+        self.image.setAlignment(Qt.AlignCenter)
+        self.time = QLabel()
+        self.time.setAlignment(Qt.AlignCenter)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.setSpacing(2)
+        layout.addWidget(self.image)
+        layout.addWidget(self.time)
+        self.setLayout(layout)
+
+    def show_at(self, global_pos, text, image=None):
+        if image is not None:
+            self.image.setPixmap(QPixmap.fromImage(image))
+        self.image.setVisible(image is not None)
+        self.time.setText(text)
+        self.adjustSize()
+        self.move(global_pos.x() - self.width() // 2, global_pos.y() - self.height() - 16)
+        self.show()
+
+
+class SubtitleOverlay(QLabel):
+    """Subtitle text drawn in a frameless window over the bottom of the video."""
+
+    DEFAULT_FONT_SIZE = 22
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.ToolTip | Qt.FramelessWindowHint)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.PlainText)
+        self.setAlignment(Qt.AlignCenter)
+        self.setWordWrap(True)
+        self.font_size = self.DEFAULT_FONT_SIZE
+        self.anchor = None  # global QRect of the video area
+        self._apply_style()
+
+    def _apply_style(self):
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 150); color: white; "
+            f"font-size: {self.font_size}px; padding: 4px 10px;"
+        )
+
+    def set_font_size(self, size):
+        self.font_size = size
+        self._apply_style()
+        self.show_text(self.text())
+
+    def set_anchor(self, rect):
+        self.anchor = rect
+        if self.isVisible():
+            self._place()
+
+    def show_text(self, text):
+        if not text or self.anchor is None:
+            self.hide()
+            return
+        self.setText(text)
+        self._place()
+        self.show()
+
+    def _place(self):
+        self.setMaximumWidth(int(self.anchor.width() * 0.9))
+        self.adjustSize()
+        x = self.anchor.center().x() - self.width() // 2
+        y = self.anchor.bottom() - self.height() - self.anchor.height() // 12
+        self.move(x, y)
 
 
 class PlayerControls(QWidget):
@@ -16,10 +163,11 @@ class PlayerControls(QWidget):
         self.time_left = QLabel("00:00")
         self.time_right = QLabel("00:00")
 
-        self.seek_slider = QSlider(Qt.Horizontal)
+        self.seek_slider = SeekSlider()
         self.seek_slider.setRange(0, 1000)
         self.seek_slider.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-        self.seek_slider.setToolTip("Seek through video")
+        self.seek_preview = SeekPreview(self)
+        self.seek_slider.hover_left.connect(self.seek_preview.hide)
 
         seek_layout = QHBoxLayout()
         seek_layout.addWidget(self.time_left)
@@ -28,29 +176,19 @@ class PlayerControls(QWidget):
 
         # ─── Playback Buttons ─────────────
         self.rewind_button = QPushButton()
-        self.rewind_button.setIcon(QIcon("assets/icons/rewind.svg"))
-        self.rewind_button.setIconSize(QSize(20, 20))
         self.rewind_button.setToolTip("Rewind 10 seconds")
 
         self.play_button = QPushButton()
-        self.play_button.setIcon(QIcon("assets/icons/play.svg"))
-        self.play_button.setIconSize(QSize(24, 24))
         self.play_button.setToolTip("Play / Pause")
 
         self.stop_button = QPushButton()
-        self.stop_button.setIcon(QIcon("assets/icons/stop.svg"))
-        self.stop_button.setIconSize(QSize(20, 20))
         self.stop_button.setToolTip("Stop playback")
 
         self.forward_button = QPushButton()
-        self.forward_button.setIcon(QIcon("assets/icons/forward.svg"))
-        self.forward_button.setIconSize(QSize(20, 20))
         self.forward_button.setToolTip("Forward 10 seconds")
 
         # ─── Volume Controls ─────────────
         self.volume_icon = QPushButton()
-        self.volume_icon.setIcon(QIcon("assets/icons/volume.svg"))
-        self.volume_icon.setIconSize(QSize(20, 20))
         self.volume_icon.setToolTip("Mute / Unmute")
         self.volume_icon.setFlat(True)
 
@@ -62,10 +200,26 @@ class PlayerControls(QWidget):
 
         # ─── Fullscreen ─────────────
         self.fullscreen_button = QPushButton()
-        self.fullscreen_button.setIcon(QIcon("assets/icons/fullscreen.svg"))
-        self.fullscreen_button.setIconSize(QSize(20, 20))
         self.fullscreen_button.setToolTip("Toggle fullscreen mode")
 
+        # button -> (icon name, size); the play button's name follows set_playing()
+        self.button_icons = {
+            self.rewind_button: ("rewind", 20),
+            self.play_button: ("play", 24),
+            self.stop_button: ("stop", 20),
+            self.forward_button: ("forward", 20),
+            self.volume_icon: ("volume", 20),
+            self.fullscreen_button: ("fullscreen", 20),
+        }
+        self._screen_hooked = False
+        self.refresh_icons()
+
+        # What the widgets show now, so unchanged values cost nothing
+        self.playing = False
+        self.suspended = False
+        self._shown = (None, None, None)  # slider value, left text, right text
+        self._latest = None               # (position, duration) while suspended
+
         # ─── Layout ─────────────
         control_layout = QHBoxLayout()
         control_layout.setSpacing(10)
@@ -87,6 +241,62 @@ class PlayerControls(QWidget):
 
         self.setLayout(layout)
 
+    def refresh_icons(self):
+        """Set every button's icon for the current screen and theme."""
+        ratio = self.devicePixelRatioF()
+        for button, (name, size) in self.button_icons.items():
+            button.setIcon(icons.get(name, size, ratio))
+            button.setIconSize(QSize(size, size))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        handle = self.window().windowHandle()
+        if handle is not None and not self._screen_hooked:
+            # Moving to a screen with another scale factor needs new pixmaps
+            handle.screenChanged.connect(lambda *_: self.refresh_icons())
+            self._screen_hooked = True
+        self.refresh_icons()
+
     def set_playing(self, playing: bool):
-        icon_name = "pause.svg" if playing else "play.svg"
-        self.play_button.setIcon(QIcon(f"assets/icons/{icon_name}"))
+        if playing == self.playing:
+            return
+        self.playing = playing
+        name = "pause" if playing else "play"
+        size = self.button_icons[self.play_button][1]
+        self.button_icons[self.play_button] = (name, size)
+        self.play_button.setIcon(icons.get(name, size, self.devicePixelRatioF()))
+
+    def set_progress(self, position, duration):
+        """Show a position (ns); widgets are only touched when what they show changes."""
+        if self.suspended:
+            self._latest = (position, duration)
+            return
+        if duration <= 0:
+            return
+        value = self._shown[0]
+        if not self.seek_slider.isSliderDown():
+            value = int(position / duration * 1000)
+        shown = (value, format_time(position), format_time(duration))
+        if shown == self._shown:
+            return
+        if shown[0] != self._shown[0] and value is not None:
+            self.seek_slider.setValue(value)
+        if shown[1] != self._shown[1]:
+            self.time_left.setText(shown[1])
+        if shown[2] != self._shown[2]:
+            self.time_right.setText(shown[2])
+        self._shown = shown
+
+    def set_suspended(self, suspended):
+        """Stop (or restart) updating while nobody can see the controls."""
+        if suspended == self.suspended:
+            return
+        self.suspended = suspended
+        if not suspended and self._latest is not None:
+            latest, self._latest = self._latest, None
+            self.set_progress(*latest)
+
+
+def format_time(ns):
+    seconds = ns // 1_000_000_000
+    return f"{seconds // 60:02}:{seconds % 60:02}"
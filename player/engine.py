@@ -0,0 +1,180 @@
+# player/engine.py
+
+import gi
+from PyQt5.QtCore import QObject
+
+gi.require_version('Gst', '1.0')
+gi.require_version('GstAudio', '1.0')
+from gi.repository import Gst, GstAudio
+
+from player.bus import BusDispatcher, PositionTracker
+from player.network import BufferingController
+from player.opener import MediaOpener
+from player.rendering import PLAY_FLAG_TEXT
+from player.seeking import SeekScheduler
+from player.streams import StreamSelector
+from player.subtitles import SubtitleController
+
+# playbin3 only decodes the streams it is told to play; from 1.22 on it is
+# stable enough to use by default
+PLAYBIN3_MIN_VERSION = (1, 22)
+
+
+def make_playbin():
+    major, minor, _, _ = Gst.version()
+    if (major, minor) >= PLAYBIN3_MIN_VERSION:
+        pipeline = Gst.ElementFactory.make("playbin3", "player")
+        if pipeline is not None:
+            return pipeline
+    return Gst.ElementFactory.make("playbin", "player")
+
+
+class PlaybackEngine(QObject):
+    """playbin and everything that drives it, with no widgets involved.
+
+    Needs only a Qt event loop (QCoreApplication is enough), so the same
+    open/seek/volume/position handling runs in the window and in the
+    headless batch checker. Sinks default to playbin's automatic choice;
+    pass fakesinks to run without a display or sound card.
+    """
+
+    def __init__(self, video_sink=None, audio_sink=None, parent=None):
+        super().__init__(parent)
+        self.pipeline = make_playbin()
+        if video_sink is not None:
+            self.pipeline.set_property("video-sink", video_sink)
+        if audio_sink is not None:
+            self.pipeline.set_property("audio-sink", audio_sink)
+
+        self.bus = BusDispatcher(self.pipeline, self)
+        self.position_tracker = PositionTracker(self.pipeline, self.bus, self)
+        self.opener = MediaOpener(self.pipeline, self.bus, self)
+        self.seeker = SeekScheduler(self.pipeline, self.bus, self.position_tracker, self)
+        self.subtitles = SubtitleController(self.pipeline, self.bus, self.seeker, self)
+        self.streams = StreamSelector(self.pipeline, self.bus, self)
+        self.buffering = BufferingController(self.pipeline, self.bus, self.opener, parent=self)
+
+    # ─── Transport ─────────────
+
+    def open(self, uri, play=True, start=0):
+        """Open uri, at start (ns) or MediaOpener.START_PENDING until opener.set_start()."""
+        self.seeker.reset()
+        self.position_tracker.reset()
+        self.buffering.reset()
+        # Subtitle choices belong to the previous file
+        self.subtitles.clear()
+        self.set_subtitle_delay(0)
+        self.set_embedded_subtitles(True)
+        self.opener.open(uri, play, start)
+
+    def is_playing(self):
+        return self.opener.state == Gst.State.PLAYING
+
+    def play(self):
+        if self.buffering.active:
+            self.buffering.resume = True
+            return
+        self.opener.play()
+
+    def pause(self):
+        if self.buffering.active:
+            self.buffering.resume = False
+            return
+        self.opener.pause()
+
+    def toggle(self):
+        """Play or pause; while opening or buffering, flip whether playback starts. Returns playing."""
+        if self.buffering.active:
+            self.buffering.resume = not self.buffering.resume
+            return self.buffering.resume
+        if self.opener.is_busy():
+            self.opener.play_when_ready = not self.opener.play_when_ready
+            return self.opener.play_when_ready
+        if self.is_playing():
+            self.opener.pause()
+            return False
+        self.opener.play()
+        return True
+
+    def stop(self):
+        self.opener.stop()
+        self.seeker.reset()
+        self.position_tracker.reset()
+        self.buffering.reset()
+
+    def shutdown(self):
+        self.subtitles.shutdown()
+        self.opener.shutdown()
+        self.bus.shutdown()
+
+    # ─── Position ─────────────
+
+    def position(self):
+        if self.position_tracker.suspended:
+            # Not kept current while nothing shows it
+            self.position_tracker.poll()
+        return self.position_tracker.position
+
+    def duration(self):
+        return self.position_tracker.duration or 0
+
+    def seek(self, position, accurate=False):
+        self.seeker.seek_to(position, accurate)
+
+    def seek_fraction(self, fraction, accurate=False):
+        if self.position_tracker.duration:
+            self.seeker.seek_to(fraction * self.position_tracker.duration, accurate)
+
+    def seek_relative(self, seconds):
+        self.seeker.seek_relative(seconds)
+
+    def step_frame(self, forward=True):
+        # The first step while playing just pauses on the current frame
+        if self.is_playing():
+            self.opener.pause()
+        else:
+            self.seeker.step_frame(forward)
+
+    # ─── Volume ─────────────
+
+    # Cubic, like a mixer: the slider's midpoint sounds about half as loud
+    VOLUME_FORMAT = GstAudio.StreamVolumeFormat.CUBIC
+
+    def volume(self):
+        """Perceptual volume, 0..1."""
+        return GstAudio.StreamVolume.get_volume(self.pipeline, self.VOLUME_FORMAT)
+
+    def set_volume(self, volume):
+        GstAudio.StreamVolume.set_volume(self.pipeline, self.VOLUME_FORMAT, min(max(volume, 0.0), 1.0))
+
+    # ─── Subtitles ─────────────
+
+    def load_subtitles(self, path):
+        """Show an external subtitle file; replaces the file's own subtitle stream."""
+        self.set_embedded_subtitles(False)
+        self.subtitles.load(path)
+
+    def disable_subtitles(self):
+        self.subtitles.clear()
+        self.set_embedded_subtitles(False)
+
+    def set_embedded_subtitles(self, enabled):
+        flags = self.pipeline.get_property("flags")
+        flags = flags | PLAY_FLAG_TEXT if enabled else flags & ~PLAY_FLAG_TEXT
+        self.pipeline.set_property("flags", flags)
+
+    def select_stream(self, kind, index):
+        """Switch audio or subtitle track; for subtitles, -1 turns them off."""
+        if kind == "text":
+            self.subtitles.clear()
+            self.set_embedded_subtitles(index >= 0)
+        self.streams.select(kind, index)
+
+    def set_subtitle_delay(self, ms):
+        self.subtitles.set_delay(ms)
+        if self.pipeline.find_property("text-offset") is not None:
+            self.pipeline.set_property("text-offset", int(ms) * Gst.MSECOND)
+
+    def set_subtitle_font(self, description):
+        """Pango font description for subtitles rendered by the pipeline, e.g. "Sans 24"."""
+        self.pipeline.set_property("subtitle-font-desc", description)
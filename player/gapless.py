@@ -0,0 +1,198 @@
+# player/gapless.py
+
+import logging
+import os
+import socket
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import gi
+from PyQt5.QtCore import QObject, pyqtSignal
+
+gi.require_version('Gst', '1.0')
+gi.require_version('GstPbutils', '1.0')
+from gi.repository import GLib, Gst, GstPbutils
+
+from player.network import local_path, to_uri
+
+log = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """Gets upcoming playlist entries ready before playback reaches them.
+
+    On a worker thread the file's head and tail (where most containers keep
+    their index) are pulled into the page cache, and the file is probed with
+    a Discoverer. For network entries the host name is resolved and the
+    probe fetches the headers or manifest, so the switch doesn't start with
+    those round trips. What the probe found (duration, whether there is
+    anything to play) is kept for the handoff; see lookup().
+    """
+
+    HEAD_BYTES = 16 * 1024 * 1024
+    TAIL_BYTES = 1024 * 1024
+    PROBE_TIMEOUT = 5 * Gst.SECOND
+    MAX_ENTRIES = 32
+
+    def __init__(self):
+        self.info = OrderedDict()  # path -> {"duration": ns or None, "playable": bool}
+        self._pending = set()
+        self._lock = threading.Lock()  # info and _pending: GUI, streaming and worker threads
+        self._discoverer = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cinesq-prefetch")
+
+    def prefetch(self, path):
+        with self._lock:
+            if path in self.info or path in self._pending:
+                return
+            self._pending.add(path)
+        self._executor.submit(self._prefetch, path)
+
+    def lookup(self, path):
+        """What the probe found for path, or None if it hasn't been probed (yet)."""
+        with self._lock:
+            return self.info.get(path)
+
+    def _prefetch(self, path):
+        info = None
+        try:
+            if local_path(path) is not None:
+                self._warm(local_path(path))
+            else:
+                self._resolve(path)
+            info = self._probe(path)
+        finally:
+            with self._lock:
+                self._pending.discard(path)
+                if info is not None:
+                    self.info[path] = info
+                    while len(self.info) > self.MAX_ENTRIES:
+                        self.info.popitem(last=False)
+
+    def _warm(self, path):
+        if not hasattr(os, "posix_fadvise"):
+            return
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                size = os.fstat(fd).st_size
+                os.posix_fadvise(fd, 0, min(size, self.HEAD_BYTES), os.POSIX_FADV_WILLNEED)
+                if size > self.HEAD_BYTES:
+                    tail = max(self.HEAD_BYTES, size - self.TAIL_BYTES)
+                    os.posix_fadvise(fd, tail, size - tail, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            log.warning("Failed to warm %s: %s", path, e)
+
+    def _resolve(self, uri):
+        host = urlsplit(uri).hostname
+        if not host:
+            return
+        try:
+            socket.getaddrinfo(host, None)
+        except (OSError, UnicodeError) as e:
+            log.warning("Failed to resolve %s: %s", host, e)
+
+    def _probe(self, path):
+        if self._discoverer is None:
+            self._discoverer = GstPbutils.Discoverer.new(self.PROBE_TIMEOUT)
+        try:
+            info = self._discoverer.discover_uri(to_uri(path))
+        except GLib.Error as e:
+            log.warning("Failed to probe %s: %s", path, e.message)
+            # Timeouts and network hiccups aren't a verdict on the file
+            return None
+        duration = info.get_duration()
+        return {
+            "duration": duration if duration not in (0, Gst.CLOCK_TIME_NONE) else None,
+            "playable": bool(info.get_video_streams() or info.get_audio_streams()),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+class GaplessController(QObject):
+    """Queues the next playlist entry on playbin's about-to-finish signal.
+
+    playbin emits about-to-finish from a streaming thread shortly before the
+    current stream runs dry; setting `uri` there makes it continue straight
+    into the next file with the pipeline still running, so no NULL ->
+    PLAYING cycle (and no demuxer/decoder rebuild) happens between items.
+    The playlist catches up once the new stream's STREAM_START arrives.
+    """
+
+    # Entries after the current one kept prefetched; helps plain opens too
+    PREFETCH_AHEAD = 2
+
+    advanced = pyqtSignal(int)
+
+    def __init__(self, pipeline, dispatcher, playlist, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.playlist = playlist
+        self.enabled = True
+        self.prefetcher = Prefetcher()
+
+        self._lock = threading.Lock()
+        self._next_index = -1
+        self._next_path = None
+        self._next_uri = None
+        self._switch_to = -1
+
+        pipeline.connect("about-to-finish", self._on_about_to_finish)
+        dispatcher.stream_start.connect(self._on_stream_start)
+        playlist.current_changed.connect(self.queue_next)
+        playlist.changed.connect(self.queue_next)
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self.queue_next()
+
+    def cancel(self):
+        """Forget a queued switch, e.g. because the user opened something else."""
+        with self._lock:
+            self._switch_to = -1
+
+    def queue_next(self, *_):
+        index = self.playlist.next_index()
+        path = self.playlist.files[index] if index >= 0 else None
+        with self._lock:
+            self._next_index = index
+            self._next_path = path
+            self._next_uri = to_uri(path) if path and self.enabled else None
+        if index >= 0:
+            for path in self.playlist.files[index:index + self.PREFETCH_AHEAD]:
+                self.prefetcher.prefetch(path)
+
+    def _on_about_to_finish(self, pipeline):
+        # Streaming thread
+        with self._lock:
+            if self._next_uri is None:
+                return
+            info = self.prefetcher.lookup(self._next_path)
+            if info is not None and not info["playable"]:
+                # Nothing playbin could switch to; the EOS path opens it
+                # normally and reports the error
+                return
+            pipeline.set_property("uri", self._next_uri)
+            self._switch_to = self._next_index
+            self._next_uri = None
+
+    def duration_of(self, path):
+        """Duration found when path was prefetched, or None."""
+        info = self.prefetcher.lookup(path)
+        return info["duration"] if info else None
+
+    def _on_stream_start(self):
+        with self._lock:
+            index, self._switch_to = self._switch_to, -1
+        if index >= 0:
+            self.playlist.advance_to(index)
+            self.advanced.emit(index)
+
+    def shutdown(self):
+        self.prefetcher.shutdown()
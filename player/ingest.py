@@ -0,0 +1,126 @@
+# player/ingest.py
+
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gi
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+
+gi.require_version('Gio', '2.0')
+from gi.repository import Gio
+
+from player.library import MEDIA_EXTENSIONS, walk_media
+
+log = logging.getLogger(__name__)
+
+# Enough for every container signature Gio knows about
+SNIFF_BYTES = 4096
+
+# Containers whose MIME type is not under video/ or audio/
+MEDIA_MIME_TYPES = {"application/ogg", "application/x-matroska", "application/vnd.rn-realmedia",
+                    "application/mxf", "application/x-flash-video"}
+UNKNOWN_MIME_TYPES = {"application/octet-stream", "application/x-zerosize"}
+
+
+def natural_key(path):
+    """Sort key that puts "ep2" before "ep10"."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", path)]
+
+
+def is_media(path):
+    """Whether the file's content looks like audio or video.
+
+    The first few KB are matched against the shared-mime-info signatures.
+    When the content doesn't identify the format (raw MPEG-TS, some WMV
+    and MP3 files) the extension decides; a file whose content is clearly
+    something else is rejected whatever it is called.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+    except OSError:
+        return False
+    content_type, _ = Gio.content_type_guess(None, head)
+    mime = Gio.content_type_get_mime_type(content_type) or ""
+    if mime.startswith(("video/", "audio/")) or mime in MEDIA_MIME_TYPES:
+        return True
+    return mime in UNKNOWN_MIME_TYPES and os.path.splitext(path)[1].lower() in MEDIA_EXTENSIONS
+
+
+class MediaIngest(QObject):
+    """Turns dropped, opened or command-line locations into playlist entries.
+
+    Folders are walked recursively and every candidate file is sniffed on
+    a thread pool, so a folder of thousands of files never blocks the GUI
+    thread. The first playable entry is reported as soon as it is known,
+    for playback to start right away; the full, ordered list follows in
+    one finished signal so it can be inserted as a single batch. URLs are
+    passed through untouched.
+    """
+
+    CHUNK = 256
+
+    first_found = pyqtSignal(str, bool)    # location, play it
+    finished = pyqtSignal(list, dict)      # locations in order, stats
+
+    # Worker -> GUI thread
+    _first = pyqtSignal(str, bool)
+    _done = pyqtSignal(list, dict)
+
+    def __init__(self, workers=None, parent=None):
+        super().__init__(parent)
+        self.workers = workers or min(8, os.cpu_count() or 2)
+        self._cancelled = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cinesq-ingest")
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cinesq-sniff")
+        self._first.connect(self.first_found, Qt.QueuedConnection)
+        self._done.connect(self.finished, Qt.QueuedConnection)
+
+    def ingest(self, locations, play=True):
+        """Expand and filter locations; play=True starts the first one found."""
+        self._executor.submit(self._run, list(locations), play)
+
+    def shutdown(self):
+        self._cancelled.set()
+        self._executor.shutdown(wait=False)
+        self._pool.shutdown(wait=False)
+
+    def _candidates(self, location):
+        if "://" in location:
+            return [location]
+        if os.path.isdir(location):
+            found = [path for path, _ in walk_media(location, extensions=None)]
+            found.sort(key=natural_key)
+            return found
+        return [location]
+
+    def _run(self, locations, play):
+        # Worker thread
+        start = time.monotonic()
+        stats = {"candidates": 0, "accepted": 0, "rejected": 0}
+        accepted = []
+        for location in locations:
+            candidates = self._candidates(location)
+            stats["candidates"] += len(candidates)
+            for i in range(0, len(candidates), self.CHUNK):
+                if self._cancelled.is_set():
+                    return
+                chunk = candidates[i:i + self.CHUNK]
+                local = [c for c in chunk if "://" not in c]
+                verdicts = dict(zip(local, self._pool.map(is_media, local)))
+                for candidate in chunk:
+                    if verdicts.get(candidate, True):
+                        if not accepted:
+                            self._first.emit(candidate, play)
+                        accepted.append(candidate)
+                    else:
+                        stats["rejected"] += 1
+        stats["accepted"] = len(accepted)
+        stats["seconds"] = round(time.monotonic() - start, 2)
+        log.info("%d of %d files in %ss", stats["accepted"], stats["candidates"], stats["seconds"])
+        self._done.emit(accepted, stats)
+
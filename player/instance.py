@@ -0,0 +1,141 @@
+# player/instance.py
+
+import json
+import logging
+import os
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtNetwork import QLocalServer
+
+from gi.repository import Gst
+
+from player.remote import is_running, socket_path
+
+log = logging.getLogger(__name__)
+
+
+class InstanceServer(QObject):
+    """Makes the first player the only one: later launches and scripts talk to it.
+
+    Requests are JSON objects, one per line, with a "cmd" key; every request
+    gets one JSON line back with "ok" and either results or "error". See
+    player/remote.py for the client.
+    """
+
+    def __init__(self, player, parent=None):
+        super().__init__(parent or player)
+        self.player = player
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._on_connection)
+
+    def listen(self):
+        path = socket_path()
+        if os.path.exists(path):
+            if is_running():
+                # Another player started meanwhile, or didn't answer main.py in time
+                log.info("Another player is listening on %s", path)
+                return False
+            # Left behind by a player that crashed
+            QLocalServer.removeServer(path)
+        if not self.server.listen(path):
+            log.warning("Could not listen on %s: %s", path, self.server.errorString())
+            return False
+        return True
+
+    def close(self):
+        self.server.close()
+
+    def _on_connection(self):
+        while self.server.hasPendingConnections():
+            conn = self.server.nextPendingConnection()
+            conn.readyRead.connect(lambda c=conn: self._on_ready_read(c))
+            conn.disconnected.connect(conn.deleteLater)
+
+    def _on_ready_read(self, conn):
+        while conn.canReadLine():
+            line = bytes(conn.readLine()).decode(errors="replace").strip()
+            if line:
+                conn.write((json.dumps(self.handle(line)) + "\n").encode())
+        conn.flush()
+
+    def handle(self, line):
+        try:
+            request = json.loads(line)
+            handler = getattr(self, f"_cmd_{request.get('cmd')}", None)
+            if handler is None:
+                return {"ok": False, "error": f"unknown command {request.get('cmd')!r}"}
+            result = handler(request)
+        except (AttributeError, ValueError, TypeError, KeyError) as e:
+            return {"ok": False, "error": str(e)}
+        return dict(result or {}, ok=True)
+
+    # ─── Commands ─────────────
+
+    def _engine(self):
+        if self.player.engine is None:
+            raise ValueError("player is still starting")
+        return self.player
+
+    def _cmd_open(self, request):
+        self.player.ingest_paths(list(request["paths"]))
+        self.player.raise_()
+        self.player.activateWindow()
+
+    def _cmd_enqueue(self, request):
+        # Folders are expanded in the background; the count is what was asked for
+        paths = list(request["paths"])
+        self.player.ingest_paths(paths, play=False)
+        return {"queued": len(paths)}
+
+    def _cmd_play(self, request):
+        self._engine().engine.play()
+
+    def _cmd_pause(self, request):
+        self._engine().engine.pause()
+
+    def _cmd_toggle(self, request):
+        self._engine().toggle_play()
+
+    def _cmd_stop(self, request):
+        self._engine().stop_video()
+
+    def _cmd_seek(self, request):
+        engine = self._engine().engine
+        value = float(request["value"])
+        if request.get("relative"):
+            engine.seek_relative(value)
+        else:
+            engine.seek(value * Gst.SECOND, accurate=True)
+
+    def _cmd_volume(self, request):
+        player = self._engine()
+        value = float(request["value"])
+        if request.get("relative"):
+            value += player.controls.volume_slider.value()
+        player.controls.volume_slider.setValue(int(min(max(value, 0), 100)))
+
+    def _cmd_next(self, request):
+        index = self.player.playlist_model.next_index()
+        if index < 0:
+            raise ValueError("end of playlist")
+        self.player.playlist_model.set_index(index)
+
+    def _cmd_status(self, request):
+        player = self.player
+        status = {
+            "file": player.current_file,
+            "playlist_length": len(player.playlist_model),
+            "volume": player.controls.volume_slider.value(),
+        }
+        engine = player.engine
+        if engine is None:
+            status["state"] = "starting"
+            return status
+        status.update({
+            "state": engine.opener.phase,
+            "position": engine.position() / Gst.SECOND,
+            "duration": engine.duration() / Gst.SECOND,
+            "rate": engine.seeker.rate,
+        })
+        return status
@@ -0,0 +1,339 @@
+# player/library.py
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import gi
+from PyQt5.QtCore import QObject, pyqtSignal
+
+gi.require_version('Gst', '1.0')
+gi.require_version('GstPbutils', '1.0')
+from gi.repository import GLib, Gst, GstPbutils
+
+from player.storage import DATA_DIR
+
+log = logging.getLogger(__name__)
+
+LIBRARY_DB = os.path.join(DATA_DIR, "library.db")
+
+MEDIA_EXTENSIONS = {
+    ".mp4", ".m4v", ".mkv", ".webm", ".avi", ".mov", ".wmv", ".flv", ".mpg",
+    ".mpeg", ".ts", ".m2ts", ".ogv", ".3gp",
+    ".mp3", ".m4a", ".aac", ".flac", ".ogg", ".opus", ".wav", ".wma",
+}
+
+TAG_NAMES = [Gst.TAG_TITLE, Gst.TAG_ARTIST, Gst.TAG_ALBUM, Gst.TAG_GENRE, Gst.TAG_COMMENT]
+
+
+class LibraryIndex:
+    """On-disk metadata index, one row per file.
+
+    Rows are keyed by path and stamped with the file's mtime and size, so a
+    rescan only has to stat() files to know which ones need probing again.
+    Path is the primary key, which also makes "everything under this folder"
+    a cheap range query.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS media (
+            path        TEXT PRIMARY KEY,
+            mtime       INTEGER NOT NULL,
+            size        INTEGER NOT NULL,
+            duration    INTEGER,
+            container   TEXT,
+            video_codec TEXT,
+            audio_codec TEXT,
+            width       INTEGER,
+            height      INTEGER,
+            tags        TEXT,
+            error       TEXT
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS roots (
+            path TEXT PRIMARY KEY
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS loudness (
+            path        TEXT PRIMARY KEY,
+            mtime       INTEGER NOT NULL,
+            size        INTEGER NOT NULL,
+            track_gain  REAL,
+            track_peak  REAL,
+            error       TEXT
+        ) WITHOUT ROWID;
+    """
+
+    COLUMNS = ("path", "mtime", "size", "duration", "container", "video_codec",
+               "audio_codec", "width", "height", "tags", "error")
+
+    def __init__(self, path=LIBRARY_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _prefix_range(root):
+        root = os.path.join(os.path.abspath(root), "")
+        # Every path under root sorts between "root/" and "root0" ("0" follows "/")
+        return root, root[:-1] + chr(ord(os.sep) + 1)
+
+    def roots(self):
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT path FROM roots")]
+
+    def add_root(self, root):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR IGNORE INTO roots VALUES (?)", (os.path.abspath(root),))
+
+    def stamps(self, root):
+        low, high = self._prefix_range(root)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, mtime, size FROM media WHERE path >= ? AND path < ?", (low, high)
+            )
+            return {path: (mtime, size) for path, mtime, size in rows}
+
+    def upsert_many(self, rows):
+        placeholders = ", ".join("?" * len(self.COLUMNS))
+        with self._lock, self._db:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO media VALUES ({placeholders})",
+                [tuple(row.get(c) for c in self.COLUMNS) for row in rows],
+            )
+
+    def remove_many(self, paths):
+        with self._lock, self._db:
+            self._db.executemany("DELETE FROM media WHERE path = ?", [(p,) for p in paths])
+
+    def get(self, path):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM media WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(self.COLUMNS, row))
+        entry["tags"] = json.loads(entry["tags"]) if entry["tags"] else {}
+        return entry
+
+    # ─── Loudness ─────────────
+
+    def loudness(self, path):
+        """(track gain dB, track peak) measured for path, or None if not measured or stale."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT track_gain, track_peak FROM loudness WHERE path = ? AND mtime = ? AND size = ? "
+                "AND error IS NULL", (path, st.st_mtime_ns, st.st_size)
+            ).fetchone()
+        return row
+
+    def loudness_stamps(self, paths):
+        """{path: (mtime, size)} of the given paths that have a loudness row."""
+        with self._lock:
+            stamps = {}
+            for path in paths:
+                row = self._db.execute("SELECT mtime, size FROM loudness WHERE path = ?", (path,)).fetchone()
+                if row is not None:
+                    stamps[path] = row
+            return stamps
+
+    def unmeasured(self):
+        """Library files with audio and no loudness row for their current stamp."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT m.path FROM media m LEFT JOIN loudness l ON l.path = m.path "
+                "WHERE m.audio_codec IS NOT NULL AND (l.path IS NULL OR l.mtime != m.mtime OR l.size != m.size)"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def set_loudness_many(self, rows):
+        """rows: (path, mtime, size, track_gain, track_peak, error)."""
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO loudness VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM media").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def walk_media(root, extensions=MEDIA_EXTENSIONS, unreadable=None):
+    """Yield (path, stat) for every media file below root, without recursion.
+
+    extensions=None yields every non-hidden file. Directories that can't be
+    listed (root included) are added to the unreadable set, if given.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            log.warning("Cannot read %s: %s", e.filename, e.strerror)
+            if unreadable is not None:
+                unreadable.add(directory)
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif extensions is None or os.path.splitext(entry.name)[1].lower() in extensions:
+                        yield entry.path, entry.stat()
+                except OSError:
+                    continue
+
+
+def _codec(stream):
+    caps = stream.get_caps()
+    return GstPbutils.pb_utils_get_codec_description(caps) if caps else None
+
+
+def probe_file(discoverer, path, stamp):
+    row = {"path": path, "mtime": stamp[0], "size": stamp[1]}
+    try:
+        info = discoverer.discover_uri(Gst.filename_to_uri(path))
+    except GLib.Error as e:
+        row["error"] = e.message
+        return row
+
+    row["duration"] = info.get_duration()
+    container = info.get_stream_info()
+    if isinstance(container, GstPbutils.DiscovererContainerInfo):
+        row["container"] = _codec(container)
+
+    video = info.get_video_streams()
+    if video:
+        row["video_codec"] = _codec(video[0])
+        row["width"] = video[0].get_width()
+        row["height"] = video[0].get_height()
+    audio = info.get_audio_streams()
+    if audio:
+        row["audio_codec"] = _codec(audio[0])
+
+    tags = {}
+    taglist = info.get_tags()
+    if taglist:
+        for name in TAG_NAMES:
+            ok, value = taglist.get_string(name)
+            if ok:
+                tags[name] = value
+    row["tags"] = json.dumps(tags) if tags else None
+    return row
+
+
+class LibraryScanner(QObject):
+    """Walks folders in the background and keeps a LibraryIndex current.
+
+    Only files whose (mtime, size) differ from the index are probed; probing
+    runs on a thread pool with one Discoverer per worker. Rows are written
+    in batches so a large first scan doesn't hammer the database.
+    """
+
+    PROBE_TIMEOUT = 10 * Gst.SECOND
+    BATCH_SIZE = 64
+
+    progress = pyqtSignal(int, int)  # probed so far, files that need probing
+    finished = pyqtSignal(dict)
+
+    def __init__(self, index, workers=None, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.workers = workers or min(8, os.cpu_count() or 2)
+        self._local = threading.local()
+        self._thread = None
+        self._cancelled = threading.Event()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def scan(self, roots):
+        if self.is_running():
+            return False
+        self._cancelled.clear()
+        self._thread = threading.Thread(target=self._run, args=(list(roots),), daemon=True)
+        self._thread.start()
+        return True
+
+    def rescan(self):
+        return self.scan(self.index.roots())
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _probe(self, path, stamp):
+        discoverer = getattr(self._local, "discoverer", None)
+        if discoverer is None:
+            discoverer = self._local.discoverer = GstPbutils.Discoverer.new(self.PROBE_TIMEOUT)
+        return probe_file(discoverer, path, stamp)
+
+    def _run(self, roots):
+        start = time.monotonic()
+        stats = {"files": 0, "probed": 0, "failed": 0, "removed": 0}
+
+        changed = []
+        for root in roots:
+            self.index.add_root(root)
+            known = self.index.stamps(root)
+            seen = set()
+            unreadable = set()
+            for path, st in walk_media(root, unreadable=unreadable):
+                seen.add(path)
+                stamp = (st.st_mtime_ns, st.st_size)
+                if known.get(path) != stamp:
+                    changed.append((path, stamp))
+            # Unmounted, offline or denied: keep what was indexed for next time.
+            # An unmounted share often leaves an empty mount point behind,
+            # so a root that lists nothing at all counts as offline too.
+            if root in unreadable or (known and not seen):
+                log.warning("Skipping %s: not readable or empty, keeping its entries", root)
+                continue
+            # Files below directories that couldn't be listed may well still exist
+            prefixes = tuple(d.rstrip(os.sep) + os.sep for d in unreadable)
+            removed = [p for p in known if p not in seen and not p.startswith(prefixes)]
+            self.index.remove_many(removed)
+            stats["files"] += len(seen)
+            stats["removed"] += len(removed)
+
+        batch = []
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="cinesq-probe") as pool:
+            futures = {pool.submit(self._probe, path, stamp): (path, stamp) for path, stamp in changed}
+            for future in as_completed(futures):
+                if self._cancelled.is_set():
+                    for f in futures:
+                        f.cancel()
+                    break
+                try:
+                    row = future.result()
+                except Exception as e:
+                    # probe_file only turns GLib errors into rows; one odd
+                    # file must not end the scan
+                    path, stamp = futures[future]
+                    log.warning("Probing %s failed: %s", path, e)
+                    row = {"path": path, "mtime": stamp[0], "size": stamp[1], "error": str(e)}
+                batch.append(row)
+                stats["probed"] += 1
+                stats["failed"] += row.get("error") is not None
+                if len(batch) >= self.BATCH_SIZE:
+                    self.index.upsert_many(batch)
+                    batch = []
+                    self.progress.emit(stats["probed"], len(changed))
+        if batch:
+            self.index.upsert_many(batch)
+
+        stats["seconds"] = round(time.monotonic() - start, 2)
+        self.progress.emit(stats["probed"], len(changed))
+        self.finished.emit(stats)
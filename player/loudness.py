@@ -0,0 +1,280 @@
+# player/loudness.py
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import gi
+from PyQt5.QtCore import QObject, pyqtSignal
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+from player.network import local_path
+
+log = logging.getLogger(__name__)
+
+# ReplayGain 2.0 gains are relative to -18 LUFS (89 dB SPL in RG 1.0 terms)
+REFERENCE_LUFS = -18.0
+TARGETS = {
+    "ReplayGain (-18 LUFS)": -18.0,
+    "EBU R128 (-23 LUFS)": -23.0,
+    "Streaming (-14 LUFS)": -14.0,
+}
+DEFAULT_TARGET = REFERENCE_LUFS
+# Files that measure very quiet aren't boosted into the noise floor
+MAX_GAIN_DB = 15.0
+MIN_GAIN_DB = -30.0
+# Analysis gives up once the decoded position hasn't moved for this long,
+# however long the file is; the bus is polled at ANALYSIS_POLL meanwhile
+ANALYSIS_STALL_TIMEOUT = 10 * Gst.SECOND
+ANALYSIS_POLL = Gst.SECOND
+
+
+class AnalysisStalled(RuntimeError):
+    """Decoding stopped making progress; unlike other failures, worth retrying later."""
+
+
+def db_to_linear(db):
+    return 10.0 ** (db / 20.0)
+
+
+def make_audio_filter():
+    """playbin audio-filter: a gain stage for normalization, then a limiter.
+
+    rglimiter only acts above -6 dBFS, so a boosted quiet file can't clip
+    while normal material goes through untouched.
+    """
+    return Gst.parse_bin_from_description(
+        "audioconvert ! volume name=gain ! rglimiter name=limiter ! audioconvert", True)
+
+
+def analyze_file(path):
+    """Decode path's audio through rganalysis; returns (track gain dB, track peak).
+
+    Runs as fast as the decoder goes, on the calling thread. Raises
+    RuntimeError when the file has no decodable audio, AnalysisStalled when
+    decoding stops advancing.
+    """
+    pipeline = Gst.parse_launch(
+        "uridecodebin name=src caps=audio/x-raw expose-all-streams=false "
+        "! audioconvert ! audioresample ! audio/x-raw,rate=[8000,48000] "
+        "! rganalysis forced=true ! fakesink sync=false"
+    )
+    pipeline.get_by_name("src").set_property("uri", Gst.filename_to_uri(path))
+    bus = pipeline.get_bus()
+    gain = peak = None
+    position = -1
+    progressed = time.monotonic()
+    try:
+        pipeline.set_state(Gst.State.PLAYING)
+        while True:
+            message = bus.timed_pop_filtered(
+                ANALYSIS_POLL, Gst.MessageType.TAG | Gst.MessageType.EOS | Gst.MessageType.ERROR)
+            ok, now_at = pipeline.query_position(Gst.Format.TIME)
+            if ok and now_at > position:
+                position, progressed = now_at, time.monotonic()
+            if message is None:
+                if (time.monotonic() - progressed) * Gst.SECOND > ANALYSIS_STALL_TIMEOUT:
+                    raise AnalysisStalled(f"analysis stalled at {max(position, 0) // Gst.SECOND}s")
+                continue
+            if message.type == Gst.MessageType.ERROR:
+                raise RuntimeError(message.parse_error()[0].message)
+            if message.type == Gst.MessageType.EOS:
+                break
+            tags = message.parse_tag()
+            ok, value = tags.get_double(Gst.TAG_TRACK_GAIN)
+            if ok:
+                gain = value
+            ok, value = tags.get_double(Gst.TAG_TRACK_PEAK)
+            if ok:
+                peak = value
+    finally:
+        pipeline.set_state(Gst.State.NULL)
+    if gain is None:
+        raise RuntimeError("no audio measured")
+    return gain, peak
+
+
+class LoudnessAnalyzer(QObject):
+    """Measures files with rganalysis in the background and caches the result.
+
+    Results go into the library database with the file's (mtime, size), so
+    a file is analysed once until it changes; stat() calls and cache checks
+    happen on the worker too. Decoding whole files is heavy, so the pool is
+    kept to half the cores and playback keeps its share.
+    """
+
+    finished = pyqtSignal(dict)
+
+    def __init__(self, index, workers=None, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self._queue = []
+        self._library = False
+        self._lock = threading.Lock()
+        self._thread = None
+        self._cancelled = threading.Event()
+
+    def analyze(self, paths, first=False):
+        """Queue files (remote ones are ignored); first=True puts them ahead of the rest."""
+        paths = [p for p in map(local_path, paths) if p is not None]
+        with self._lock:
+            self._queue = paths + self._queue if first else self._queue + paths
+            self._start()
+
+    def analyze_library(self):
+        """Queue every library file with audio that has no current measurement."""
+        with self._lock:
+            self._library = True
+            self._start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _start(self):
+        # Called with the lock held
+        if self._thread is None and (self._queue or self._library):
+            self._cancelled.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _take(self, count):
+        with self._lock:
+            if self._library:
+                self._library = False
+                self._queue += self.index.unmeasured()
+            taken, self._queue = self._queue[:count], self._queue[count:]
+            if not taken:
+                # Under the lock, so analyze() either sees a worker or starts one
+                self._thread = None
+            return taken
+
+    def _measure(self, path, stamp):
+        try:
+            gain, peak = analyze_file(path)
+            return (path, stamp[0], stamp[1], gain, peak, None)
+        except AnalysisStalled as e:
+            # Not recorded, so the file is tried again next time it's queued
+            log.warning("%s: %s", path, e)
+            return None
+        except Exception as e:
+            return (path, stamp[0], stamp[1], None, None, str(e))
+
+    def _stale(self, paths):
+        known = self.index.loudness_stamps(paths)
+        stale = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stamp = (st.st_mtime_ns, st.st_size)
+            if known.get(path) != stamp:
+                stale[path] = stamp
+        return stale
+
+    def _run(self):
+        # Worker thread
+        start = time.monotonic()
+        stats = {"measured": 0, "failed": 0}
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="cinesq-loudness") as pool:
+            # Small rounds, so files queued with first=True get in early
+            while not self._cancelled.is_set():
+                paths = self._take(self.workers)
+                if not paths:
+                    break
+                futures = [pool.submit(self._measure, path, stamp) for path, stamp in self._stale(paths).items()]
+                rows = []
+                for future in as_completed(futures):
+                    row = future.result()
+                    if row is None:
+                        stats["failed"] += 1
+                        continue
+                    rows.append(row)
+                    stats["failed" if row[5] else "measured"] += 1
+                if rows:
+                    self.index.set_loudness_many(rows)
+        if self._cancelled.is_set():
+            with self._lock:
+                self._queue = []
+                self._thread = None
+            return
+        stats["seconds"] = round(time.monotonic() - start, 2)
+        self.finished.emit(stats)
+
+
+class LoudnessNormalizer(QObject):
+    """Applies per-file gain through playbin's audio-filter.
+
+    When a stream starts (also after a gapless switch) the gain for the
+    file is looked up among the measured values; files not measured yet
+    fall back to ReplayGain tags in the stream, if any, and are queued for
+    analysis so the next play is normalized. Nothing is analysed during
+    playback.
+    """
+
+    changed = pyqtSignal(object)   # gain in dB now applied, None when unity
+
+    def __init__(self, pipeline, dispatcher, index, analyzer=None, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.index = index
+        self.analyzer = analyzer
+        self.enabled = True
+        self.target = DEFAULT_TARGET
+        self.track_gain = None   # dB relative to REFERENCE_LUFS, None if unknown
+        self._from_tags = False
+
+        self.filter = make_audio_filter()
+        self._gain = self.filter.get_by_name("gain")
+        pipeline.set_property("audio-filter", self.filter)
+
+        dispatcher.stream_start.connect(self._on_stream_start)
+        dispatcher.message.connect(self._on_message)
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self._apply()
+
+    def set_target(self, lufs):
+        self.target = lufs
+        self._apply()
+
+    def gain_db(self):
+        if not self.enabled or self.track_gain is None:
+            return None
+        return min(max(self.track_gain + self.target - REFERENCE_LUFS, MIN_GAIN_DB), MAX_GAIN_DB)
+
+    def _apply(self):
+        gain = self.gain_db()
+        self._gain.set_property("volume", db_to_linear(gain) if gain is not None else 1.0)
+        self.changed.emit(gain)
+
+    def _on_stream_start(self):
+        uri = self.pipeline.get_property("current-uri")
+        path = local_path(uri) if uri else None
+        measured = self.index.loudness(path) if path else None
+        self.track_gain = measured[0] if measured else None
+        self._from_tags = False
+        if measured is None and path and self.analyzer is not None:
+            self.analyzer.analyze([path], first=True)
+        self._apply()
+
+    def _on_message(self, message):
+        # Stream tags only stand in until the file has been measured
+        if message.type != Gst.MessageType.TAG or (self.track_gain is not None and not self._from_tags):
+            return
+        tags = message.parse_tag()
+        ok, gain = tags.get_double(Gst.TAG_TRACK_GAIN)
+        if not ok or (self._from_tags and gain == self.track_gain):
+            return
+        ok, reference = tags.get_double(Gst.TAG_REFERENCE_LEVEL)
+        # RG 1.0 tags are relative to 89 dB, which is the -18 LUFS of RG 2.0 too;
+        # gains computed for another reference level are shifted to it
+        self.track_gain = gain + (89.0 - reference if ok else 0.0)
+        self._from_tags = True
+        self._apply()
@@ -1,9 +1,11 @@
 # player/menubar.py
 
 from PyQt5.QtWidgets import (
-    QMenuBar, QMenu, QAction, QMessageBox
+    QMenuBar, QMenu, QAction, QActionGroup, QMessageBox
 )
 
+from player.loudness import TARGETS
+
 def create_menu_bar(parent):
     menubar = QMenuBar(parent)
 
@@ -15,12 +17,23 @@ def create_menu_bar(parent):
     open_action.triggered.connect(parent.open_file)
     file_menu.addAction(open_action)
 
+    open_url = QAction("Open URL…", parent)
+    open_url.setShortcut("Ctrl+U")
+    open_url.triggered.connect(parent.open_url)
+    file_menu.addAction(open_url)
+
+    open_grid = QAction("Open Grid…", parent)
+    open_grid.setShortcut("Ctrl+G")
+    open_grid.triggered.connect(parent.open_grid)
+    file_menu.addAction(open_grid)
+
     # ─── Playlist toggle ───────────────
     toggle_playlist = QAction("Toggle Playlist", parent)
     toggle_playlist.setShortcut("Ctrl+P")
     toggle_playlist.setCheckable(True)
-    toggle_playlist.setChecked(False)
+    toggle_playlist.setChecked(parent.settings.get("playlist.visible"))
     toggle_playlist.triggered.connect(parent.toggle_playlist)
+    parent.settings.watch("playlist.visible", toggle_playlist.setChecked)
     file_menu.addAction(toggle_playlist)
 
     file_menu.addSeparator()
@@ -31,13 +44,13 @@ def create_menu_bar(parent):
 
     def refresh_recent_menu():
         recent_menu.clear()
-        for path in parent.recent_files[-10:][::-1]:
+        for path in parent.settings.get("recent_files")[-10:][::-1]:
             name = path.split("/")[-1]
             action = QAction(name, parent)
             action.triggered.connect(lambda checked=False, p=path: parent.open_file(p))
             recent_menu.addAction(action)
 
-    parent.recent_files_changed = refresh_recent_menu
+    parent.settings.watch("recent_files", lambda files: refresh_recent_menu())
     refresh_recent_menu()
 
     file_menu.addSeparator()
@@ -74,6 +87,33 @@ def create_menu_bar(parent):
     forward.triggered.connect(lambda: parent.seek_relative(10))
     playback_menu.addAction(forward)
 
+    next_frame = QAction("Next Frame", parent)
+    next_frame.setShortcut("E")
+    next_frame.triggered.connect(lambda: parent.step_frame(True))
+    playback_menu.addAction(next_frame)
+
+    prev_frame = QAction("Previous Frame", parent)
+    prev_frame.setShortcut("Shift+E")
+    prev_frame.triggered.connect(lambda: parent.step_frame(False))
+    playback_menu.addAction(prev_frame)
+
+    playback_menu.addSeparator()
+
+    faster = QAction("Faster", parent)
+    faster.setShortcut("]")
+    faster.triggered.connect(lambda: parent.change_speed(+1))
+    playback_menu.addAction(faster)
+
+    slower = QAction("Slower / Rewind", parent)
+    slower.setShortcut("[")
+    slower.triggered.connect(lambda: parent.change_speed(-1))
+    playback_menu.addAction(slower)
+
+    normal_speed = QAction("Normal Speed", parent)
+    normal_speed.setShortcut("=")
+    normal_speed.triggered.connect(lambda: parent.change_speed(0))
+    playback_menu.addAction(normal_speed)
+
     playback_menu.addSeparator()
 
     vol_up = QAction("Increase Volume", parent)
@@ -88,7 +128,38 @@ def create_menu_bar(parent):
 
     # ─── Audio Menu ────────────────────
     audio_menu = menubar.addMenu("Audio")
-    # Placeholder — implement audio track switching later
+
+    audio_tracks = QMenu("Audio Track", parent)
+    audio_tracks.aboutToShow.connect(lambda: parent.fill_track_menu(audio_tracks, "audio"))
+    audio_menu.addMenu(audio_tracks)
+
+    audio_menu.addSeparator()
+
+    normalize = QAction("Normalize Loudness", parent, checkable=True)
+    normalize.setChecked(parent.settings.get("audio.normalize"))
+    normalize.triggered.connect(parent.set_loudness_normalization)
+    parent.settings.watch("audio.normalize", normalize.setChecked)
+    audio_menu.addAction(normalize)
+
+    analyze_library = QAction("Analyze Library Loudness", parent, checkable=True)
+    analyze_library.setChecked(parent.settings.get("audio.analyze_library"))
+    analyze_library.triggered.connect(parent.set_library_loudness_analysis)
+    parent.settings.watch("audio.analyze_library", analyze_library.setChecked)
+    audio_menu.addAction(analyze_library)
+
+    loudness_target = QMenu("Loudness Target", parent)
+    targets = QActionGroup(loudness_target)
+    for label, lufs in TARGETS.items():
+        action = QAction(label, loudness_target, checkable=True)
+        action.setChecked(lufs == parent.settings.get("audio.loudness_target"))
+        action.triggered.connect(lambda checked=False, t=lufs: parent.set_loudness_target(t))
+        targets.addAction(action)
+        loudness_target.addAction(action)
+    audio_menu.addMenu(loudness_target)
+
+    visualizer = QMenu("Visualizer", parent)
+    visualizer.aboutToShow.connect(lambda: parent.fill_visualizer_menu(visualizer))
+    audio_menu.addMenu(visualizer)
 
     # ─── Video Menu ────────────────────
     video_menu = menubar.addMenu("Video")
@@ -98,6 +169,16 @@ def create_menu_bar(parent):
     toggle_fullscreen.triggered.connect(parent.toggle_fullscreen)
     video_menu.addAction(toggle_fullscreen)
 
+    pip = QAction("Picture in Picture", parent, checkable=True)
+    pip.setShortcut("Ctrl+Shift+P")
+    pip.triggered.connect(parent.toggle_pip)
+    parent.pip_changed.connect(pip.setChecked)
+    video_menu.addAction(pip)
+
+    new_view = QAction("New Video Window", parent)
+    new_view.triggered.connect(lambda: parent.open_video_view())
+    video_menu.addAction(new_view)
+
     # ─── Subtitles Menu ────────────────
     subtitle_menu = menubar.addMenu("Subtitles")
 
@@ -105,6 +186,20 @@ def create_menu_bar(parent):
     load_sub.triggered.connect(parent.load_subtitle)
     subtitle_menu.addAction(load_sub)
 
+    subtitle_tracks = QMenu("Subtitle Track", parent)
+    subtitle_tracks.aboutToShow.connect(lambda: parent.fill_track_menu(subtitle_tracks, "text"))
+    subtitle_menu.addMenu(subtitle_tracks)
+
+    next_cue = QAction("Next Subtitle", parent)
+    next_cue.setShortcut("Ctrl+Right")
+    next_cue.triggered.connect(lambda: parent.jump_to_cue(True))
+    subtitle_menu.addAction(next_cue)
+
+    prev_cue = QAction("Previous Subtitle", parent)
+    prev_cue.setShortcut("Ctrl+Left")
+    prev_cue.triggered.connect(lambda: parent.jump_to_cue(False))
+    subtitle_menu.addAction(prev_cue)
+
     subtitle_menu.addSeparator()
 
     inc_font = QAction("Increase Font Size", parent)
@@ -133,11 +228,46 @@ def create_menu_bar(parent):
 
     # ─── Tools Menu ────────────────────
     tools_menu = menubar.addMenu("Tools")
-    # Placeholder for future tools (screenshot, color settings, etc.)
+
+    screenshot = QAction("Take Screenshot", parent)
+    screenshot.setShortcut("Ctrl+Shift+S")
+    screenshot.triggered.connect(parent.take_screenshot)
+    tools_menu.addAction(screenshot)
+
+    export_frames = QAction("Export Frames…", parent)
+    export_frames.triggered.connect(parent.export_frames)
+    tools_menu.addAction(export_frames)
+
+    tools_menu.addSeparator()
+
+    export_metrics = QAction("Export Playback Metrics", parent, checkable=True)
+    export_metrics.triggered.connect(parent.toggle_metrics_export)
+    tools_menu.addAction(export_metrics)
+
+    network_menu = QMenu("Network Buffering", parent)
+    tools_menu.addMenu(network_menu)
+
+    download = QAction("Download Streams to Disk", parent, checkable=True)
+    download.setChecked(parent.settings.get("network.download"))
+    download.triggered.connect(parent.set_download_buffering)
+    parent.settings.watch("network.download", download.setChecked)
+    network_menu.addAction(download)
+
+    buffer_size = QAction("Buffer Size…", parent)
+    buffer_size.triggered.connect(parent.edit_buffer_size)
+    network_menu.addAction(buffer_size)
+
+    buffer_duration = QAction("Buffer Duration…", parent)
+    buffer_duration.triggered.connect(parent.edit_buffer_duration)
+    network_menu.addAction(buffer_duration)
 
     # ─── View Menu ─────────────────────
     view_menu = menubar.addMenu("View")
-    # Placeholder for future themes/layouts
+
+    hud_action = QAction("Performance HUD", parent, checkable=True)
+    hud_action.setShortcut("Ctrl+I")
+    hud_action.triggered.connect(parent.toggle_hud)
+    view_menu.addAction(hud_action)
 
     # ─── Help Menu ─────────────────────
     help_menu = menubar.addMenu("Help")
@@ -0,0 +1,347 @@
+# player/metrics.py
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import gi
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+from PyQt5.QtWidgets import QLabel
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+from player.storage import CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+METRICS_LOG = os.path.join(CACHE_DIR, "metrics.jsonl")
+METRICS_PROM = os.path.join(CACHE_DIR, "metrics.prom")
+# The log is rotated to metrics.jsonl.1 once it grows past this
+METRICS_LOG_MAX_BYTES = 8 * 1024 * 1024
+
+
+class ElementStats:
+    """Buffer counters and input->output latency for one element, fed by pad probes."""
+
+    MAX_IN_FLIGHT = 256
+
+    def __init__(self, name):
+        self.name = name
+        self.buffers = 0
+        self.bytes = 0
+        self.latency_total = 0.0
+        self.latency_count = 0
+        self._in_flight = OrderedDict()  # pts -> wall clock at the sink pad
+        self._lock = threading.Lock()
+
+    def on_input(self, pad, info):
+        buffer = info.get_buffer()
+        if buffer is not None and buffer.pts != Gst.CLOCK_TIME_NONE:
+            with self._lock:
+                self._in_flight[buffer.pts] = time.perf_counter()
+                if len(self._in_flight) > self.MAX_IN_FLIGHT:
+                    self._in_flight.popitem(last=False)
+        return Gst.PadProbeReturn.OK
+
+    def on_output(self, pad, info):
+        buffer = info.get_buffer()
+        if buffer is None:
+            return Gst.PadProbeReturn.OK
+        with self._lock:
+            self.buffers += 1
+            self.bytes += buffer.get_size()
+            start = self._in_flight.pop(buffer.pts, None)
+            if start is not None:
+                self.latency_total += time.perf_counter() - start
+                self.latency_count += 1
+        return Gst.PadProbeReturn.OK
+
+    def take(self):
+        """Return (buffers, bytes, mean latency in ms) and reset the latency window."""
+        with self._lock:
+            latency = self.latency_total / self.latency_count * 1000 if self.latency_count else 0.0
+            self.latency_total = 0.0
+            self.latency_count = 0
+            return self.buffers, self.bytes, latency
+
+
+class PlaybackMetrics(QObject):
+    """Collects playback health numbers while enabled.
+
+    - dropped/rendered frames and jitter from sink QoS messages
+    - per-decoder throughput and decode latency from pad probes
+    - buffering percent from BUFFERING messages, queue2 fill levels
+    - end-to-end pipeline latency from a latency query
+
+    Pad probes run Python on every buffer, so they are only attached while
+    someone is looking (the HUD is shown or export is on).
+    """
+
+    SAMPLE_INTERVAL_MS = 1000
+
+    updated = pyqtSignal(dict)
+
+    def __init__(self, pipeline, dispatcher, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.enabled = False
+        self.export = False
+        self.sample = {}
+
+        self._qos = {}         # sink name -> (processed, dropped, jitter ns, proportion)
+        # Frames of files and sinks gone by, so the session totals only grow
+        self._past_processed = 0
+        self._past_dropped = 0
+        self._buffering = 100
+        self._decoders = []    # decoder elements seen in the pipeline
+        self._queues = []      # queue2 elements
+        self._stats = {}       # element name -> ElementStats
+        self._probes = []      # (pad, probe id)
+        self._last = {}        # element name -> (buffers, bytes, time) at the last sample
+        self._lock = threading.Lock()
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.SAMPLE_INTERVAL_MS)
+        self.timer.timeout.connect(self._take_sample)
+
+        pipeline.connect("element-setup", self._on_element_setup)
+        dispatcher.message.connect(self._on_message)
+        dispatcher.buffering.connect(self._on_buffering)
+        dispatcher.stream_start.connect(self._on_stream_start)
+
+    # ─── Enabling ─────────────
+
+    def set_enabled(self, enabled):
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        with self._lock:
+            decoders = list(self._decoders)
+        if enabled:
+            for element in decoders:
+                self._attach(element)
+            self.timer.start()
+        else:
+            self.timer.stop()
+            self._detach_all()
+
+    def set_export(self, export):
+        self.export = export
+
+    # ─── Streaming-thread hooks ─────────────
+
+    def _on_element_setup(self, pipeline, element):
+        factory = element.get_factory()
+        if factory is None:
+            return
+        if factory.get_name() == "queue2":
+            with self._lock:
+                self._queues.append(element)
+        elif factory.list_is_type(Gst.ELEMENT_FACTORY_TYPE_DECODER):
+            with self._lock:
+                self._decoders.append(element)
+            if self.enabled:
+                self._attach(element)
+
+    def _attach(self, element):
+        sink, src = element.get_static_pad("sink"), element.get_static_pad("src")
+        if sink is None or src is None:
+            return
+        name = element.get_name()
+        with self._lock:
+            stats = self._stats.setdefault(name, ElementStats(name))
+            self._probes.append((sink, sink.add_probe(Gst.PadProbeType.BUFFER, stats.on_input)))
+            self._probes.append((src, src.add_probe(Gst.PadProbeType.BUFFER, stats.on_output)))
+
+    def _detach_all(self):
+        with self._lock:
+            probes, self._probes = self._probes, []
+        for pad, probe_id in probes:
+            pad.remove_probe(probe_id)
+
+    # ─── Bus messages (GUI thread) ─────────────
+
+    def _on_message(self, message):
+        if message.type == Gst.MessageType.QOS:
+            _, processed, dropped = message.parse_qos_stats()
+            jitter, proportion, _ = message.parse_qos_values()
+            name = message.src.get_name()
+            previous = self._qos.get(name)
+            if previous is not None and (processed < previous[0] or dropped < previous[1]):
+                # The sink started counting over (flush, reconfiguration)
+                self._retire(previous)
+            self._qos[name] = (processed, dropped, jitter, proportion)
+
+    def _on_stream_start(self):
+        # A new file: the per-file numbers start from zero
+        for counts in self._qos.values():
+            self._retire(counts)
+        self._qos = {}
+
+    def _retire(self, counts):
+        self._past_processed += max(counts[0], 0)
+        self._past_dropped += max(counts[1], 0)
+
+    def _on_buffering(self, percent):
+        self._buffering = percent
+
+    def _prune(self):
+        # Decoders and queues of a previous file get unparented when playbin
+        # tears its decodebin down; drop them along with their probes.
+        with self._lock:
+            gone = [e for e in self._decoders + self._queues if e.get_parent() is None]
+            if not gone:
+                return
+            self._decoders = [e for e in self._decoders if e not in gone]
+            self._queues = [e for e in self._queues if e not in gone]
+            gone_pads = {e.get_static_pad(n) for e in gone for n in ("sink", "src")}
+            removed = [(pad, pid) for pad, pid in self._probes if pad in gone_pads]
+            self._probes = [(pad, pid) for pad, pid in self._probes if pad not in gone_pads]
+            for element in gone:
+                self._stats.pop(element.get_name(), None)
+        for pad, probe_id in removed:
+            pad.remove_probe(probe_id)
+        for element in gone:
+            self._last.pop(element.get_name(), None)
+
+    # ─── Sampling ─────────────
+
+    def _take_sample(self):
+        self._prune()
+        now = time.monotonic()
+        sample = {"time": time.time(), "buffering_percent": self._buffering}
+
+        dropped = processed = 0
+        jitter = 0.0
+        for p, d, j, _ in self._qos.values():
+            processed += max(p, 0)
+            dropped += max(d, 0)
+            jitter = max(jitter, abs(j) / Gst.MSECOND)
+        sample["frames_processed"] = processed
+        sample["frames_dropped"] = dropped
+        sample["frames_processed_total"] = self._past_processed + processed
+        sample["frames_dropped_total"] = self._past_dropped + dropped
+        sample["jitter_ms"] = round(jitter, 2)
+
+        query = Gst.Query.new_latency()
+        if self.pipeline.query(query):
+            _, min_latency, _ = query.parse_latency()
+            sample["pipeline_latency_ms"] = round(min_latency / Gst.MSECOND, 2)
+
+        with self._lock:
+            queues = list(self._queues)
+        if queues:
+            sample["queue2_bytes"] = sum(q.get_property("current-level-bytes") for q in queues)
+            sample["queue2_ms"] = round(
+                sum(q.get_property("current-level-time") for q in queues) / Gst.MSECOND, 1)
+
+        with self._lock:
+            # _attach() adds to it from streaming threads
+            element_stats = list(self._stats.items())
+        elements = {}
+        for name, stats in element_stats:
+            buffers, nbytes, latency = stats.take()
+            last_buffers, last_bytes, last_time = self._last.get(name, (0, 0, now))
+            elapsed = now - last_time
+            elements[name] = {
+                "buffers_per_s": round((buffers - last_buffers) / elapsed, 1) if elapsed else 0.0,
+                "bytes_per_s": int((nbytes - last_bytes) / elapsed) if elapsed else 0,
+                "latency_ms": round(latency, 2),
+            }
+            self._last[name] = (buffers, nbytes, now)
+        sample["elements"] = elements
+
+        self.sample = sample
+        self.updated.emit(sample)
+        if self.export:
+            self._export(sample)
+
+    # ─── Export ─────────────
+
+    def _export(self, sample):
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            try:
+                if os.path.getsize(METRICS_LOG) >= METRICS_LOG_MAX_BYTES:
+                    os.replace(METRICS_LOG, METRICS_LOG + ".1")
+            except FileNotFoundError:
+                pass
+            with open(METRICS_LOG, "a") as f:
+                f.write(json.dumps(sample) + "\n")
+            tmp = METRICS_PROM + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(self.prometheus_text(sample))
+            os.replace(tmp, METRICS_PROM)
+        except OSError as e:
+            log.warning("Export failed: %s", e)
+            self.export = False
+
+    @staticmethod
+    def prometheus_text(sample):
+        lines = []
+
+        def metric(name, kind, help_text, values):
+            lines.append(f"# HELP cinesq_{name} {help_text}")
+            lines.append(f"# TYPE cinesq_{name} {kind}")
+            for labels, value in values:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"cinesq_{name}{{{label_text}}} {value}" if label_text
+                             else f"cinesq_{name} {value}")
+
+        # Counters must never go down, so they are session totals
+        metric("frames_processed_total", "counter", "Frames seen by the video sink this session",
+               [({}, sample["frames_processed_total"])])
+        metric("frames_dropped_total", "counter", "Frames dropped for being late this session",
+               [({}, sample["frames_dropped_total"])])
+        metric("jitter_milliseconds", "gauge", "Worst sink jitter in the last interval",
+               [({}, sample["jitter_ms"])])
+        metric("buffering_percent", "gauge", "Network buffer fill level",
+               [({}, sample["buffering_percent"])])
+        if "pipeline_latency_ms" in sample:
+            metric("pipeline_latency_milliseconds", "gauge", "Minimum pipeline latency",
+                   [({}, sample["pipeline_latency_ms"])])
+        if "queue2_bytes" in sample:
+            metric("queue2_level_bytes", "gauge", "Bytes held in queue2 buffers",
+                   [({}, sample["queue2_bytes"])])
+        elements = sample["elements"]
+        if elements:
+            metric("element_buffers_per_second", "gauge", "Buffers produced per second",
+                   [({"element": n}, e["buffers_per_s"]) for n, e in elements.items()])
+            metric("element_bytes_per_second", "gauge", "Bytes produced per second",
+                   [({"element": n}, e["bytes_per_s"]) for n, e in elements.items()])
+            metric("element_latency_milliseconds", "gauge", "Mean input to output latency",
+                   [({"element": n}, e["latency_ms"]) for n, e in elements.items()])
+        return "\n".join(lines) + "\n"
+
+
+class MetricsOverlay(QLabel):
+    """Small always-on-top text panel showing the latest metrics sample."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.ToolTip | Qt.FramelessWindowHint)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 170); color: #9f9; "
+            "font-family: monospace; font-size: 11px; padding: 6px;"
+        )
+
+    def show_sample(self, sample):
+        lines = [
+            f"dropped   {sample['frames_dropped']} / {sample['frames_processed']}",
+            f"jitter    {sample['jitter_ms']:.1f} ms",
+            f"buffering {sample['buffering_percent']} %",
+        ]
+        if "pipeline_latency_ms" in sample:
+            lines.append(f"latency   {sample['pipeline_latency_ms']:.1f} ms")
+        if "queue2_bytes" in sample:
+            lines.append(f"queue2    {sample['queue2_bytes'] // 1024} KiB / {sample['queue2_ms']:.0f} ms")
+        for name, e in sample["elements"].items():
+            lines.append(f"{name}: {e['buffers_per_s']:.0f} buf/s, "
+                         f"{e['bytes_per_s'] / 1e6:.1f} MB/s, {e['latency_ms']:.1f} ms")
+        self.setText("\n".join(lines))
+        self.adjustSize()
@@ -0,0 +1,405 @@
+# player/multiview.py
+
+import logging
+import math
+import os
+
+import gi
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+from PyQt5.QtGui import QGuiApplication
+from PyQt5.QtWidgets import QGridLayout, QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
+
+gi.require_version('Gst', '1.0')
+gi.require_version('GstVideo', '1.0')
+from gi.repository import Gst, GstVideo
+
+from player.bus import BusDispatcher
+from player.engine import make_playbin
+from player.network import display_name, to_uri
+from player.rendering import PLAY_FLAG_AUDIO, PLAY_FLAG_TEXT, configure_decoder_threads
+
+log = logging.getLogger(__name__)
+
+MAX_GRID_STREAMS = 9
+# Time given to every pipeline to get from PAUSED to PLAYING before the
+# shared base time is reached, so they all start on the same frame
+START_MARGIN = 100 * Gst.MSECOND
+STATS_INTERVAL_MS = 1000
+PIP_WIDTH_FRACTION = 0.25
+
+
+# ─── Extra views ─────────────
+
+class VideoView(QWidget):
+    """A window showing one more view of the main player's video.
+
+    The video is drawn into a native child; the frames come from the
+    player's VideoTee, so the view costs a sink, not a decoder. In
+    picture-in-picture mode it is a small window that stays on top in the
+    screen's bottom-right corner.
+    """
+
+    closed = pyqtSignal()
+
+    def __init__(self, title="Cinesq", pip=False, parent=None):
+        flags = Qt.Window
+        if pip:
+            flags |= Qt.WindowStaysOnTopHint | Qt.Tool
+        super().__init__(parent, flags)
+        self.setWindowTitle(title)
+        self.video = QWidget(self)
+        self.video.setAttribute(Qt.WA_NativeWindow)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.video)
+        if pip:
+            self._place_pip()
+        else:
+            self.resize(640, 360)
+
+    def window_handle(self):
+        return int(self.video.winId())
+
+    def _place_pip(self):
+        screen = QGuiApplication.primaryScreen()
+        if screen is None:
+            self.resize(320, 180)
+            return
+        area = screen.availableGeometry()
+        width = int(area.width() * PIP_WIDTH_FRACTION)
+        height = width * 9 // 16
+        self.setGeometry(area.right() - width - 16, area.bottom() - height - 16, width, height)
+
+    def closeEvent(self, event):
+        self.closed.emit()
+        super().closeEvent(event)
+
+
+# ─── Grid playback ─────────────
+
+class GridSession(QObject):
+    """Plays several files side by side, one playbin each, in step.
+
+    All pipelines run on one clock with the same base time, so frames with
+    the same timestamp are shown at the same moment; the pipelines never
+    pick a base time of their own (start time is NONE) and the session
+    sets it on play and after seeks. Only the first stream plays audio and
+    none decodes subtitles. The cores are split among the decoders instead
+    of every decoder sizing its thread pool for the whole machine, and
+    late frames are dropped by the sinks (and skipped by decoders through
+    QoS) rather than queued up, which is what keeps 4 to 9 streams
+    watchable on CPU decoding alone.
+
+    Per-stream frames rendered, frames dropped, frame rate and offset from
+    the first stream are reported every STATS_INTERVAL_MS. Sinks default
+    to playbin's choice; sink_factory(index) and audio_sink can supply
+    fakesinks to run without a display.
+    """
+
+    stats_updated = pyqtSignal(list)   # one dict per stream
+    error = pyqtSignal(int, str)       # stream index, message
+    finished = pyqtSignal()            # every stream reached its end
+
+    def __init__(self, uris, sink_factory=None, audio_sink=None, parent=None):
+        super().__init__(parent)
+        self.uris = list(uris)
+        self.clock = Gst.SystemClock.obtain()
+        self.playing = False
+        self.running_time = 0          # where playback stands while paused
+        self.base_time = 0
+        self.decoder_threads = max(1, (os.cpu_count() or 1) // max(1, len(self.uris)))
+        self.window_handles = [None] * len(self.uris)
+        self._video_sinks = [None] * len(self.uris)
+        self._qos_dropped = [0] * len(self.uris)
+        self._last_rendered = [0] * len(self.uris)
+        self._waiting = set()
+        self._seek_seqnums = [None] * len(self.uris)
+        self._play_when_ready = False
+        self._ended = set()
+
+        self.pipelines = []
+        self.dispatchers = []
+        for i, uri in enumerate(self.uris):
+            pipeline = make_playbin()
+            pipeline.set_property("uri", uri)
+            flags = pipeline.get_property("flags") & ~PLAY_FLAG_TEXT
+            if i > 0:
+                flags &= ~PLAY_FLAG_AUDIO
+            pipeline.set_property("flags", flags)
+            sink = sink_factory(i) if sink_factory is not None else None
+            if sink is not None:
+                pipeline.set_property("video-sink", sink)
+                # Whatever its class (fakesink is plain "Sink"), this is the video path
+                if sink.find_property("stats") is not None:
+                    self._video_sinks[i] = sink
+            if i == 0 and audio_sink is not None:
+                pipeline.set_property("audio-sink", audio_sink)
+            pipeline.use_clock(self.clock)
+            pipeline.set_start_time(Gst.CLOCK_TIME_NONE)
+            pipeline.connect("element-setup", self._on_element_setup, i)
+
+            dispatcher = BusDispatcher(pipeline, self)
+            dispatcher.add_sync_handler(lambda message, i=i: self._on_sync_message(i, message))
+            dispatcher.error.connect(lambda message, debug, i=i: self._on_error(i, message))
+            dispatcher.eos.connect(lambda i=i: self._on_eos(i))
+            dispatcher.message.connect(lambda message, i=i: self._on_message(i, message))
+            self.pipelines.append(pipeline)
+            self.dispatchers.append(dispatcher)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(STATS_INTERVAL_MS)
+        self.timer.timeout.connect(self._report)
+
+    def set_window_handles(self, handles):
+        """Native windows, by stream; taken on the GUI thread before start()."""
+        self.window_handles = list(handles)
+
+    # ─── Transport ─────────────
+
+    def start(self, play=True):
+        """Preroll every stream, then play them together."""
+        self._wait_for_all(play)
+        for pipeline in self.pipelines:
+            pipeline.set_state(Gst.State.PAUSED)
+        self.timer.start()
+
+    def play(self):
+        if self._waiting:
+            self._play_when_ready = True
+            return
+        # The same base time everywhere; running time carries on from the pause
+        self.base_time = self.clock.get_time() + START_MARGIN - self.running_time
+        for pipeline in self.pipelines:
+            pipeline.set_base_time(self.base_time)
+        for pipeline in self.pipelines:
+            pipeline.set_state(Gst.State.PLAYING)
+        self.playing = True
+
+    def pause(self):
+        if self._waiting:
+            self._play_when_ready = False
+            return
+        if self.playing:
+            self.running_time = max(0, self.clock.get_time() - self.base_time)
+        for pipeline in self.pipelines:
+            pipeline.set_state(Gst.State.PAUSED)
+        self.playing = False
+
+    def toggle(self):
+        if self.playing or (self._waiting and self._play_when_ready):
+            self.pause()
+            return False
+        self.play()
+        return True
+
+    def seek(self, position):
+        """Accurate seek of every stream to position (ns); playback resumes in step."""
+        resume = self.playing or (self._waiting and self._play_when_ready)
+        if self.playing:
+            self.pause()
+        self._wait_for_all(resume)
+        self._ended.clear()
+        flags = Gst.SeekFlags.FLUSH | Gst.SeekFlags.ACCURATE
+        for i, pipeline in enumerate(self.pipelines):
+            event = Gst.Event.new_seek(1.0, Gst.Format.TIME, flags, Gst.SeekType.SET, max(0, position),
+                                       Gst.SeekType.NONE, -1)
+            # The pause can finish after this; only the seek's own ASYNC_DONE counts
+            self._seek_seqnums[i] = event.get_seqnum()
+            pipeline.send_event(event)
+
+    def seek_relative(self, seconds):
+        self.seek(self.position() + int(seconds * Gst.SECOND))
+
+    def position(self):
+        ok, position = self.pipelines[0].query_position(Gst.Format.TIME)
+        return position if ok else 0
+
+    def shutdown(self):
+        self.timer.stop()
+        for pipeline, dispatcher in zip(self.pipelines, self.dispatchers):
+            pipeline.set_state(Gst.State.NULL)
+            dispatcher.shutdown()
+        self.playing = False
+
+    def _wait_for_all(self, play):
+        # A flushing seek starts running time over, from 0
+        self.running_time = 0
+        self._waiting = set(range(len(self.pipelines)))
+        self._play_when_ready = play
+
+    def _on_ready(self, index):
+        if index not in self._waiting:
+            return
+        self._waiting.discard(index)
+        if not self._waiting and self._play_when_ready:
+            self.play()
+
+    def _on_error(self, index, message):
+        log.warning("Stream %d: %s", index + 1, message)
+        # A broken stream mustn't hold the others at preroll
+        self._on_ready(index)
+        self.error.emit(index, message)
+
+    def _on_eos(self, index):
+        self._ended.add(index)
+        if len(self._ended) == len(self.pipelines):
+            self.pause()
+            self.finished.emit()
+
+    # ─── Streaming thread ─────────────
+
+    def _on_element_setup(self, pipeline, element, index):
+        factory = element.get_factory()
+        if factory is None:
+            return
+        if factory.list_is_type(Gst.ELEMENT_FACTORY_TYPE_DECODER):
+            configure_decoder_threads(element, self.decoder_threads)
+        elif self._video_sinks[index] is None \
+                and factory.list_is_type(Gst.ELEMENT_FACTORY_TYPE_SINK | Gst.ELEMENT_FACTORY_TYPE_MEDIA_VIDEO) \
+                and element.find_property("stats") is not None:
+            # The sink autovideosink (or a sink bin) picked
+            self._video_sinks[index] = element
+
+    def _on_sync_message(self, index, message):
+        if not GstVideo.is_video_overlay_prepare_window_handle_message(message):
+            return False
+        handle = self.window_handles[index] if index < len(self.window_handles) else None
+        if handle is not None:
+            message.src.set_window_handle(handle)
+        return True
+
+    # ─── Statistics ─────────────
+
+    def _on_message(self, index, message):
+        if message.type == Gst.MessageType.ASYNC_DONE:
+            expected = self._seek_seqnums[index]
+            if expected is None or message.get_seqnum() == expected:
+                self._on_ready(index)
+        # Drop counts for sinks that don't report stats of their own
+        elif message.type == Gst.MessageType.QOS and self._video_sinks[index] is None:
+            fmt, processed, dropped = message.parse_qos_stats()
+            if fmt == Gst.Format.BUFFERS:
+                self._qos_dropped[index] = max(self._qos_dropped[index], dropped)
+
+    def _sink_counts(self, index):
+        sink = self._video_sinks[index]
+        if sink is None:
+            return None, self._qos_dropped[index]
+        stats = sink.get_property("stats")
+        ok_rendered, rendered = stats.get_uint64("rendered")
+        ok_dropped, dropped = stats.get_uint64("dropped")
+        return (rendered if ok_rendered else None), (dropped if ok_dropped else self._qos_dropped[index])
+
+    def stats(self):
+        """Current per-stream numbers; fps is over the last interval."""
+        reference = None
+        result = []
+        for i, pipeline in enumerate(self.pipelines):
+            rendered, dropped = self._sink_counts(i)
+            fps = None
+            if rendered is not None:
+                fps = (rendered - self._last_rendered[i]) * 1000 / STATS_INTERVAL_MS
+                self._last_rendered[i] = rendered
+            ok, position = pipeline.query_position(Gst.Format.TIME)
+            position = position if ok else None
+            if i == 0:
+                reference = position
+            offset = None
+            if position is not None and reference is not None and i not in self._ended:
+                offset = (position - reference) / Gst.MSECOND
+            result.append({
+                "uri": self.uris[i],
+                "rendered": rendered,
+                "dropped": dropped,
+                "fps": fps,
+                "position": position,
+                "offset_ms": offset,
+            })
+        return result
+
+    def _report(self):
+        self.stats_updated.emit(self.stats())
+
+
+class GridWindow(QWidget):
+    """Plays up to MAX_GRID_STREAMS files in a grid, in sync, with drop counts."""
+
+    closed = pyqtSignal()
+
+    def __init__(self, paths, parent=None):
+        super().__init__(parent, Qt.Window)
+        paths = list(paths)[:MAX_GRID_STREAMS]
+        self.setWindowTitle(f"Cinesq – Grid ({len(paths)})")
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.resize(1280, 720)
+
+        columns = math.ceil(math.sqrt(len(paths)))
+        grid = QGridLayout()
+        grid.setSpacing(2)
+        self.cells = []
+        self.labels = []
+        for i, path in enumerate(paths):
+            cell = QWidget()
+            cell.setAttribute(Qt.WA_NativeWindow)
+            # Text can't be drawn over a native video window, so it goes below
+            label = QLabel(display_name(path))
+            label.setObjectName("gridStats")
+            box = QVBoxLayout()
+            box.setSpacing(0)
+            box.addWidget(cell, 1)
+            box.addWidget(label)
+            grid.addLayout(box, i // columns, i % columns)
+            self.cells.append(cell)
+            self.labels.append(label)
+        self.names = [display_name(path) for path in paths]
+
+        self.play_button = QPushButton("Pause")
+        self.play_button.clicked.connect(self.toggle)
+        back = QPushButton("−10s")
+        back.clicked.connect(lambda: self.session.seek_relative(-10))
+        forward = QPushButton("+10s")
+        forward.clicked.connect(lambda: self.session.seek_relative(10))
+        restart = QPushButton("Restart")
+        restart.clicked.connect(lambda: self.session.seek(0))
+        self.summary = QLabel()
+        controls = QHBoxLayout()
+        for widget in (self.play_button, back, forward, restart):
+            controls.addWidget(widget)
+        controls.addStretch(1)
+        controls.addWidget(self.summary)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(grid, 1)
+        layout.addLayout(controls)
+
+        self.session = GridSession([to_uri(path) for path in paths], parent=self)
+        self.session.set_window_handles([int(cell.winId()) for cell in self.cells])
+        self.session.stats_updated.connect(self.show_stats)
+        self.session.error.connect(lambda i, message: self.labels[i].setText(f"{self.names[i]} — {message}"))
+        self.session.finished.connect(lambda: self.play_button.setText("Play"))
+        self.session.start(play=True)
+
+    def toggle(self):
+        playing = self.session.toggle()
+        self.play_button.setText("Pause" if playing else "Play")
+
+    def show_stats(self, stats):
+        total_dropped = 0
+        for i, s in enumerate(stats):
+            parts = [self.names[i]]
+            if s["fps"] is not None:
+                parts.append(f"{s['fps']:.0f} fps")
+            if s["rendered"] is not None:
+                parts.append(f"{s['rendered']} shown")
+            parts.append(f"{s['dropped']} dropped")
+            if s["offset_ms"] is not None and i > 0:
+                parts.append(f"{s['offset_ms']:+.0f} ms")
+            self.labels[i].setText(" · ".join(parts))
+            total_dropped += s["dropped"] or 0
+        self.summary.setText(f"{len(stats)} streams, {self.session.decoder_threads} decoder threads each, "
+                             f"{total_dropped} frames dropped")
+
+    def closeEvent(self, event):
+        self.session.shutdown()
+        self.closed.emit()
+        super().closeEvent(event)
@@ -0,0 +1,180 @@
+# player/network.py
+
+import os
+import time
+from urllib.parse import urlsplit
+
+import gi
+from PyQt5.QtCore import QObject, pyqtSignal
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+from player.rendering import PLAY_FLAG_BUFFERING, PLAY_FLAG_DOWNLOAD
+
+# Elements that hold the network buffer inside playbin's uridecodebin
+BUFFER_ELEMENTS = ("queue2", "multiqueue", "downloadbuffer")
+
+
+# ─── Locations ─────────────
+
+def to_uri(location):
+    """URI for a playlist entry, which is either a local path or already a URI."""
+    if Gst.uri_is_valid(location):
+        return location
+    return Gst.filename_to_uri(os.path.abspath(location))
+
+
+def local_path(location):
+    """Filesystem path of a local path or file:// URI; None for anything remote."""
+    if not Gst.uri_is_valid(location):
+        return location
+    if Gst.uri_get_protocol(location) == "file":
+        return Gst.filename_from_uri(location)[0]
+    return None
+
+
+def display_name(location):
+    """Last path component, or the host for a URL without one."""
+    if "://" not in location:
+        return os.path.basename(location)
+    parts = urlsplit(location)
+    return os.path.basename(parts.path.rstrip("/")) or parts.netloc or location
+
+
+# ─── Settings ─────────────
+
+class BufferConfig:
+    """Network buffering settings for playbin.
+
+    size        bytes buffered ahead (-1 = GStreamer default, 2 MB)
+    duration    seconds buffered ahead (-1 = default)
+    download    download progressive streams to a temp file, which makes
+                them seekable and rides out long stalls
+    low, high   watermarks in percent of the buffer: playback pauses once
+                the buffer drains below low and resumes once it is back at high
+    """
+
+    def __init__(self, size=-1, duration=-1, download=False, low=10, high=99):
+        self.size = int(size)
+        self.duration = float(duration)
+        self.download = bool(download)
+        self.low = min(max(int(low), 1), 99)
+        self.high = min(max(int(high), self.low + 1), 100)
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(**settings.section("network"))
+
+    def save(self, settings):
+        settings.update({"network.size": self.size, "network.duration": self.duration,
+                         "network.download": self.download, "network.low": self.low,
+                         "network.high": self.high})
+
+    def describe(self):
+        size = f"{self.size // 1024} KiB" if self.size > 0 else "default"
+        duration = f"{self.duration:g} s" if self.duration > 0 else "default"
+        return f"buffer={size}/{duration} download={self.download} watermarks={self.low}-{self.high}%"
+
+
+# ─── Buffering ─────────────
+
+class BufferingController(QObject):
+    """Pauses playback while a network stream refills its buffer.
+
+    queue2 and multiqueue post BUFFERING messages once their fill level
+    drops below the low watermark, and keep posting them until it is back
+    at the high one. Playback is paused for that stretch and resumed
+    afterwards if it was playing (or about to) when buffering started; the
+    user's play/pause in between only changes what happens at the end. In
+    download mode playback resumes as soon as the rest of the file should
+    arrive before playback reaches it. Live streams can't be paused, so
+    for them the level is only reported.
+    """
+
+    progress = pyqtSignal(int)      # buffer fill percent, 100 when not buffering
+    stalled = pyqtSignal(bool)      # playback held for buffering
+
+    def __init__(self, pipeline, dispatcher, opener, config=None, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.opener = opener
+        self.config = config or BufferConfig()
+        self.active = False
+        self.resume = False
+        self.percent = 100
+        self.stalls = 0
+        self.stall_time = 0.0
+        self._stall_start = None
+
+        self.apply(self.config)
+        pipeline.connect("element-setup", self._on_element_setup)
+        dispatcher.message.connect(self._on_message)
+        dispatcher.error.connect(self.reset)
+
+    def apply(self, config):
+        """Use config from the next opened stream on."""
+        self.config = config
+        self.pipeline.set_property("buffer-size", config.size)
+        self.pipeline.set_property("buffer-duration", int(config.duration * Gst.SECOND) if config.duration > 0 else -1)
+        flags = self.pipeline.get_property("flags") | PLAY_FLAG_BUFFERING
+        flags = flags | PLAY_FLAG_DOWNLOAD if config.download else flags & ~PLAY_FLAG_DOWNLOAD
+        self.pipeline.set_property("flags", flags)
+
+    def reset(self, *_):
+        self._end_stall()
+        self.active = False
+        self.percent = 100
+
+    def _on_element_setup(self, pipeline, element):
+        # Streaming thread
+        factory = element.get_factory()
+        if factory is None or factory.get_name() not in BUFFER_ELEMENTS:
+            return
+        if element.find_property("low-watermark") is not None:
+            element.set_property("low-watermark", self.config.low / 100)
+            element.set_property("high-watermark", self.config.high / 100)
+        elif element.find_property("low-percent") is not None:
+            element.set_property("low-percent", self.config.low)
+            element.set_property("high-percent", self.config.high)
+
+    def _on_message(self, message):
+        if message.type != Gst.MessageType.BUFFERING or self.opener.uri is None:
+            return
+        percent = message.parse_buffering()
+        mode, _, _, left = message.parse_buffering_stats()
+        self.percent = percent
+        self.progress.emit(percent)
+        if mode == Gst.BufferingMode.LIVE:
+            return
+
+        done = percent >= 100
+        if not done and mode in (Gst.BufferingMode.DOWNLOAD, Gst.BufferingMode.TIMESHIFT):
+            done = 0 <= left < self._remaining_ms()
+        if not done and not self.active:
+            self.active = True
+            self.resume = self.opener.play_when_ready if self.opener.is_busy() \
+                else self.opener.state == Gst.State.PLAYING
+            if self.opener.phase == self.opener.PLAYING:
+                # Buffering before the first frame is not a stall
+                self.stalls += 1
+                self._stall_start = time.monotonic()
+                self.stalled.emit(True)
+            self.opener.pause()
+        elif done and self.active:
+            self.reset()
+            if self.resume:
+                self.opener.play()
+
+    def _remaining_ms(self):
+        ok, position = self.pipeline.query_position(Gst.Format.TIME)
+        ok_dur, duration = self.pipeline.query_duration(Gst.Format.TIME)
+        if not (ok and ok_dur) or duration <= 0:
+            return 0
+        return (duration - position) // Gst.MSECOND
+
+    def _end_stall(self):
+        if self._stall_start is not None:
+            self.stall_time += time.monotonic() - self._stall_start
+            self._stall_start = None
+            self.stalled.emit(False)
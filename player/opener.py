@@ -0,0 +1,216 @@
+# player/opener.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import gi
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+
+class MediaOpener(QObject):
+    """Opens media without blocking the GUI thread.
+
+    Every state change request goes through a single worker thread, so the
+    GUI never waits on set_state(NULL) joining streaming threads or on a
+    slow source opening. Progress is tracked from the bus:
+
+        idle -> opening -> prerolling -> prerolled -> playing
+
+    Each open() bumps a generation counter; work and bus messages that
+    belong to an older generation are dropped, which is how a file opened
+    halfway through another one's preroll cancels it.
+
+    A file can be opened at a start position, or with START_PENDING when
+    the position is still being looked up (see set_start()). The video
+    sinks then don't show the preroll frame; the seek is done while still
+    prerolling and the first frame shown is the one at the start position.
+    """
+
+    IDLE = "idle"
+    OPENING = "opening"
+    PREROLLING = "prerolling"
+    PREROLLED = "prerolled"
+    PLAYING = "playing"
+    FAILED = "failed"
+
+    START_PENDING = -1
+
+    phase_changed = pyqtSignal(str)
+    prerolled = pyqtSignal(str)
+
+    # Worker -> GUI thread: (generation, set_state() result)
+    _requested = pyqtSignal(int, object)
+
+    def __init__(self, pipeline, dispatcher, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.phase = self.IDLE
+        self.state = Gst.State.NULL
+        self.uri = None
+        self.play_when_ready = True
+        self.start = 0
+
+        self._generation = 0
+        self._preroll_hidden = False
+        self._awaiting_start = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cinesq-open")
+        self._requested.connect(self._on_requested, Qt.QueuedConnection)
+
+        dispatcher.state_changed.connect(self._on_state_changed)
+        dispatcher.async_done.connect(self._on_async_done)
+        dispatcher.error.connect(self._on_error)
+        pipeline.connect("element-setup", self._on_element_setup)
+
+    # ─── Public API ─────────────
+
+    def open(self, uri, play=True, start=0):
+        """Open uri; start is a position in ns, or START_PENDING until set_start()."""
+        self._generation += 1
+        self.uri = uri
+        self.play_when_ready = play
+        self.start = start
+        self._awaiting_start = False
+        self._preroll_hidden = start != 0
+        self._set_phase(self.OPENING)
+        self._executor.submit(self._load, self._generation, uri)
+
+    def set_start(self, position):
+        """Resolve a START_PENDING open; 0 plays from the beginning."""
+        if self.start != self.START_PENDING:
+            return
+        self.start = max(0, int(position))
+        if self._awaiting_start:
+            self._awaiting_start = False
+            self._on_prerolled()
+
+    def stop(self):
+        self._generation += 1
+        self.uri = None
+        self._set_phase(self.IDLE)
+        self._executor.submit(self.pipeline.set_state, Gst.State.NULL)
+        self.state = Gst.State.NULL
+
+    def play(self):
+        self._request_state(Gst.State.PLAYING)
+
+    def pause(self):
+        self._request_state(Gst.State.PAUSED)
+
+    def is_busy(self):
+        return self.phase in (self.OPENING, self.PREROLLING)
+
+    def shutdown(self):
+        self._generation += 1
+        self._executor.shutdown(wait=True)
+        self.pipeline.set_state(Gst.State.NULL)
+
+    # ─── Internals ─────────────
+
+    def _set_phase(self, phase):
+        if phase != self.phase:
+            self.phase = phase
+            self.phase_changed.emit(phase)
+
+    def _request_state(self, state):
+        if self.is_busy():
+            # Still prerolling: just remember what to do once it's done
+            self.play_when_ready = state == Gst.State.PLAYING
+            return
+        if self.uri is None:
+            return
+        self._executor.submit(self.pipeline.set_state, state)
+
+    def _load(self, generation, uri):
+        # Worker thread. Going to NULL joins the streaming threads of the
+        # previous file, which is the slow part on big files and network mounts.
+        self.pipeline.set_state(Gst.State.NULL)
+        if generation != self._generation:
+            return
+        self._show_preroll_frame(not self._preroll_hidden)
+        self.pipeline.set_property("uri", uri)
+        ret = self.pipeline.set_state(Gst.State.PAUSED)
+        self._requested.emit(generation, ret)
+
+    def _on_requested(self, generation, ret):
+        if generation != self._generation:
+            return
+        if ret == Gst.StateChangeReturn.FAILURE:
+            self._fail()
+            return
+
+        self._set_phase(self.PREROLLING)
+        # ASYNC_DONE may already have been dispatched before we got here
+        _, current, pending = self.pipeline.get_state(0)
+        if current == Gst.State.PAUSED and pending == Gst.State.VOID_PENDING:
+            self._on_prerolled()
+
+    def _on_state_changed(self, old, new):
+        self.state = new
+        if new == Gst.State.PLAYING and self.phase == self.PREROLLED:
+            self._set_phase(self.PLAYING)
+        elif new == Gst.State.PAUSED and self.phase == self.PLAYING:
+            self._set_phase(self.PREROLLED)
+
+    def _on_async_done(self):
+        if self.phase == self.PREROLLING:
+            self._on_prerolled()
+
+    def _on_prerolled(self):
+        if self.start == self.START_PENDING:
+            # Stay prerolling, nothing on screen yet, until the position is known
+            self._awaiting_start = True
+            return
+        if self.start > 0:
+            # The flushing seek prerolls again; ASYNC_DONE brings us back here
+            start, self.start = self.start, 0
+            self._executor.submit(self._seek, self._generation, start)
+            return
+        if self._preroll_hidden:
+            self._preroll_hidden = False
+            self._show_preroll_frame(True)
+            if not self.play_when_ready:
+                # Staying paused: preroll the frame at the position again so it is shown
+                self._executor.submit(self._seek, self._generation, None)
+        self._set_phase(self.PREROLLED)
+        self.prerolled.emit(self.uri)
+        if self.play_when_ready:
+            self._executor.submit(self.pipeline.set_state, Gst.State.PLAYING)
+
+    def _seek(self, generation, position):
+        # Worker thread
+        if generation != self._generation:
+            return
+        if position is None:
+            ok, position = self.pipeline.query_position(Gst.Format.TIME)
+            if not ok:
+                return
+        self.pipeline.seek_simple(Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.ACCURATE, position)
+
+    def _show_preroll_frame(self, show):
+        it = self.pipeline.iterate_recurse()
+        while True:
+            result, element = it.next()
+            if result == Gst.IteratorResult.RESYNC:
+                it.resync()
+                continue
+            if result != Gst.IteratorResult.OK:
+                break
+            if element.find_property("show-preroll-frame") is not None:
+                element.set_property("show-preroll-frame", show)
+
+    def _on_element_setup(self, pipeline, element):
+        # Streaming thread; covers sinks created while prerolling
+        if self._preroll_hidden and element.find_property("show-preroll-frame") is not None:
+            element.set_property("show-preroll-frame", False)
+
+    def _on_error(self, message, debug):
+        # The error itself is reported by whoever listens to the bus
+        if self.is_busy():
+            self._fail()
+
+    def _fail(self):
+        self._generation += 1
+        self._set_phase(self.FAILED)
+        self._executor.submit(self.pipeline.set_state, Gst.State.NULL)
@@ -1,30 +1,110 @@
-import os
-import json
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import QObject, QAbstractListModel, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtGui import QFont
 
-CONFIG_DIR = os.path.expanduser("~/.config/cinesq")
-PLAYLIST_FILE = os.path.join(CONFIG_DIR, "playlist.json")
+from player.network import display_name
 
 class Playlist(QObject):
-    changed = pyqtSignal()
-    index_changed = pyqtSignal(int)
+    changed = pyqtSignal()             # anything changed, after the fine-grained signal
+    # Each change is announced before files is touched and reported after
+    rows_about_to_be_inserted = pyqtSignal(int, int)
+    rows_inserted = pyqtSignal(int, int)  # first row, count
+    rows_about_to_be_removed = pyqtSignal(int, int)
+    rows_removed = pyqtSignal(int, int)   # first row, count
+    row_about_to_be_moved = pyqtSignal(int, int)
+    row_moved = pyqtSignal(int, int)      # from row, to row (before removal)
+    about_to_reset = pyqtSignal()
+    reset = pyqtSignal()
+    index_changed = pyqtSignal(int)    # play request for an entry
+    current_changed = pyqtSignal(int)  # the current entry moved, for any reason
 
     def __init__(self):
         super().__init__()
         self.files = []
         self.current_index = -1
+        # path -> row. Rows from _stale_from on may be out of date after a
+        # remove/move and are renumbered lazily by index_of().
+        self._rows = {}
+        self._stale_from = 0
+
+    def __len__(self):
+        return len(self.files)
+
+    def __contains__(self, path):
+        return path in self._rows
+
+    def index_of(self, path):
+        row = self._rows.get(path)
+        if row is None:
+            return -1
+        if row >= self._stale_from:
+            for i in range(self._stale_from, len(self.files)):
+                self._rows[self.files[i]] = i
+            self._stale_from = len(self.files)
+            row = self._rows[path]
+        return row
 
     def add(self, path):
-        if path not in self.files:
+        return self.add_many([path])
+
+    def add_many(self, paths):
+        rows = self._rows
+        new = list(dict.fromkeys(path for path in paths if path not in rows))
+        if not new:
+            return 0
+        first = len(self.files)
+        count = len(new)
+        self.rows_about_to_be_inserted.emit(first, count)
+        for path in new:
+            rows[path] = len(self.files)
             self.files.append(path)
-            self.changed.emit()
+        if self._stale_from == first:
+            self._stale_from = len(self.files)
+        self.rows_inserted.emit(first, count)
+        self.changed.emit()
+        return count
+
+    def remove(self, row):
+        if not 0 <= row < len(self.files):
+            return
+        self.rows_about_to_be_removed.emit(row, 1)
+        del self._rows[self.files.pop(row)]
+        self._stale_from = min(self._stale_from, row)
+        if self.current_index > row:
+            self.current_index -= 1
+        elif self.current_index == row:
+            self.current_index = -1
+        self.rows_removed.emit(row, 1)
+        self.changed.emit()
+
+    def move(self, src, dst):
+        if src == dst or not (0 <= src < len(self.files) and 0 <= dst < len(self.files)):
+            return
+        current = self.current()
+        self.row_about_to_be_moved.emit(src, dst)
+        self.files.insert(dst, self.files.pop(src))
+        self._stale_from = min(self._stale_from, src, dst)
+        if current is not None:
+            self.current_index = self.index_of(current)
+        self.row_moved.emit(src, dst)
+        self.changed.emit()
 
     def all_files(self):
         return self.files
 
     def clear(self):
-        self.files.clear()
+        self._replace([])
+
+    def _replace(self, files):
+        self.about_to_reset.emit()
+        self.files = []
+        self._rows = {}
+        for path in files:
+            if path not in self._rows:
+                self._rows[path] = len(self.files)
+                self.files.append(path)
+        self._stale_from = len(self.files)
         self.current_index = -1
+        self.reset.emit()
         self.changed.emit()
 
     def current(self):
@@ -32,25 +112,84 @@ class Playlist(QObject):
             return self.files[self.current_index]
         return None
 
+    def next_index(self):
+        index = self.current_index + 1
+        return index if index < len(self.files) else -1
+
     def set_index(self, index):
         if 0 <= index < len(self.files):
             self.current_index = index
+            self.current_changed.emit(index)
             self.index_changed.emit(index)
 
-    def save(self):
-        try:
-            os.makedirs(CONFIG_DIR, exist_ok=True)
-            with open(PLAYLIST_FILE, 'w') as f:
-                json.dump(self.files, f)
-        except Exception as e:
-            print(f"[Playlist] Failed to save: {e}")
-
-    def load(self):
-        try:
-            if os.path.exists(PLAYLIST_FILE):
-                with open(PLAYLIST_FILE, 'r') as f:
-                    self.files = json.load(f)
-                self.current_index = -1
-                self.changed.emit()
-        except Exception as e:
-            print(f"[Playlist] Failed to load: {e}")
+    def advance_to(self, index):
+        # Update the current entry without asking anyone to open it, for
+        # when the player already switched on its own (gapless playback).
+        if 0 <= index < len(self.files) and index != self.current_index:
+            self.current_index = index
+            self.current_changed.emit(index)
+
+
+class PlaylistModel(QAbstractListModel):
+    """Qt view adapter for a Playlist.
+
+    Holds no copy of the data: rows are formatted on demand, so a view
+    with uniform item sizes only ever touches the rows it shows, and a
+    single insert or removal is a single row notification.
+    """
+
+    def __init__(self, playlist, parent=None):
+        super().__init__(parent)
+        self.playlist = playlist
+        self._current = -1
+        self._bold = QFont()
+        self._bold.setBold(True)
+
+        playlist.rows_about_to_be_inserted.connect(self._on_rows_about_to_be_inserted)
+        playlist.rows_inserted.connect(lambda *_: self.endInsertRows())
+        playlist.rows_about_to_be_removed.connect(self._on_rows_about_to_be_removed)
+        playlist.rows_removed.connect(lambda *_: self.endRemoveRows())
+        playlist.row_about_to_be_moved.connect(self._on_row_about_to_be_moved)
+        playlist.row_moved.connect(lambda *_: self.endMoveRows())
+        playlist.about_to_reset.connect(self.beginResetModel)
+        playlist.reset.connect(self._on_reset)
+        playlist.current_changed.connect(self._on_current_changed)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.playlist.files)
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        if not index.isValid() or row >= len(self.playlist.files):
+            return None
+        if role == Qt.DisplayRole:
+            return display_name(self.playlist.files[row])
+        if role == Qt.ToolTipRole:
+            return self.playlist.files[row]
+        if role == Qt.FontRole and row == self.playlist.current_index:
+            return self._bold
+        return None
+
+    # begin* runs on the playlist's "about to" signal, before files changes,
+    # and end* on the signal that follows the change.
+
+    def _on_rows_about_to_be_inserted(self, first, count):
+        self.beginInsertRows(QModelIndex(), first, first + count - 1)
+
+    def _on_rows_about_to_be_removed(self, first, count):
+        self.beginRemoveRows(QModelIndex(), first, first + count - 1)
+
+    def _on_row_about_to_be_moved(self, src, dst):
+        # Qt's destination row is "insert before", counted before the removal
+        self.beginMoveRows(QModelIndex(), src, src, QModelIndex(), dst + 1 if dst > src else dst)
+
+    def _on_reset(self):
+        self._current = -1
+        self.endResetModel()
+
+    def _on_current_changed(self, row):
+        previous, self._current = self._current, row
+        for r in (previous, row):
+            if 0 <= r < self.rowCount():
+                index = self.index(r)
+                self.dataChanged.emit(index, index, [Qt.FontRole])
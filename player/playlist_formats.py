@@ -0,0 +1,85 @@
+# player/playlist_formats.py
+#
+# M3U/M3U8 and XSPF import and export. Readers are generators so large
+# files are parsed as they are consumed.
+
+import os
+import pathlib
+import xml.etree.ElementTree as ET
+from urllib.parse import unquote, urlparse
+from xml.sax.saxutils import escape
+
+from player.storage import atomic_write
+
+XSPF_NS = "{http://xspf.org/ns/0/}"
+
+
+def _resolve(location, base_dir):
+    location = location.strip()
+    if location.startswith("file://"):
+        return unquote(urlparse(location).path)
+    if "://" in location:
+        return location  # network URI, kept as is
+    return os.path.normpath(os.path.join(base_dir, os.path.expanduser(location)))
+
+
+def read_m3u(path):
+    base_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield _resolve(line, base_dir)
+
+
+def write_m3u(path, files):
+    lines = ["#EXTM3U"]
+    for file in files:
+        lines.append(f"#EXTINF:-1,{os.path.basename(file)}")
+        lines.append(file)
+    atomic_write(path, "\n".join(lines) + "\n")
+
+
+def read_xspf(path):
+    base_dir = os.path.dirname(os.path.abspath(path))
+    try:
+        for _, elem in ET.iterparse(path):
+            if elem.tag in (XSPF_NS + "location", "location") and elem.text:
+                yield _resolve(elem.text, base_dir)
+            elif elem.tag in (XSPF_NS + "track", "track"):
+                elem.clear()
+    except ET.ParseError as e:
+        raise ValueError(f"Malformed XSPF: {e}") from e
+
+
+def write_xspf(path, files):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<playlist version="1" xmlns="http://xspf.org/ns/0/">',
+        "  <trackList>",
+    ]
+    for file in files:
+        location = file if "://" in file else pathlib.Path(os.path.abspath(file)).as_uri()
+        lines.append(f"    <track><location>{escape(location)}</location>"
+                     f"<title>{escape(os.path.basename(file))}</title></track>")
+    lines += ["  </trackList>", "</playlist>"]
+    atomic_write(path, "\n".join(lines) + "\n")
+
+
+def read_playlist(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".xspf":
+        return read_xspf(path)
+    if ext in (".m3u", ".m3u8"):
+        return read_m3u(path)
+    raise ValueError(f"Unsupported playlist format: {ext or path}")
+
+
+def write_playlist(path, files):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".xspf":
+        write_xspf(path, files)
+    elif ext in (".m3u", ".m3u8"):
+        write_m3u(path, files)
+    else:
+        raise ValueError(f"Unsupported playlist format: {ext or path}")
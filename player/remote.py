@@ -0,0 +1,109 @@
+# player/remote.py
+#
+# Client side of the single-instance socket. Standard library only: main.py
+# uses it to hand its files to a running player before Qt or GStreamer are
+# imported, and it doubles as a scripting CLI:
+#
+#   python -m player.remote status
+#   python -m player.remote seek 90
+#   python -m player.remote enqueue a.mkv b.mkv
+
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+
+log = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 2.0
+
+COMMANDS = ("open", "enqueue", "play", "pause", "toggle", "stop", "seek", "volume", "next", "status")
+
+
+def socket_path():
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, "cinesq.sock")
+    return os.path.join(tempfile.gettempdir(), f"cinesq-{os.getuid()}.sock")
+
+
+def normalize(path):
+    """Absolute path for local files; URIs are passed through."""
+    return path if "://" in path else os.path.abspath(path)
+
+
+def call(cmd, timeout=CONNECT_TIMEOUT, **params):
+    """Send one command to the running player and return its reply.
+
+    Returns None when no player is listening.
+    """
+    request = json.dumps(dict(params, cmd=cmd)) + "\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path())
+            sock.sendall(request.encode())
+            reply = b""
+            while not reply.endswith(b"\n"):
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                reply += chunk
+    except (FileNotFoundError, ConnectionRefusedError, socket.timeout):
+        return None
+    except OSError as e:
+        log.warning("%s", e)
+        return None
+    try:
+        return json.loads(reply)
+    except ValueError:
+        return None
+
+
+def is_running(timeout=CONNECT_TIMEOUT):
+    """True if a player accepts connections on the socket."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path())
+        return True
+    except OSError:
+        return False
+
+
+def forward(paths, enqueue=False):
+    """Hand files to a running player (none: just raise it). True if one answered."""
+    reply = call("enqueue" if enqueue else "open", paths=[normalize(p) for p in paths])
+    return bool(reply and reply.get("ok"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Control a running Cinesq Player")
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("args", nargs="*")
+    parser.add_argument("--relative", action="store_true", help="seek by the given seconds")
+    args = parser.parse_args(argv)
+
+    params = {}
+    if args.command in ("open", "enqueue"):
+        params["paths"] = [normalize(p) for p in args.args]
+    elif args.command in ("seek", "volume"):
+        if len(args.args) != 1:
+            parser.error(f"{args.command} takes one number")
+        params["value"] = float(args.args[0])
+        params["relative"] = args.relative
+
+    reply = call(args.command, **params)
+    if reply is None:
+        print("Cinesq Player is not running", file=sys.stderr)
+        return 2
+    print(json.dumps(reply, indent=2))
+    return 0 if reply.get("ok") else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="[%(name)s] %(levelname)s: %(message)s")
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# player/rendering.py
+
+import logging
+
+import gi
+
+gi.require_version('Gst', '1.0')
+gi.require_version('GstVideo', '1.0')
+from gi.repository import Gst, GstVideo
+
+log = logging.getLogger(__name__)
+
+# playbin's GstPlayFlags
+PLAY_FLAG_VIDEO = 0x001
+PLAY_FLAG_AUDIO = 0x002
+PLAY_FLAG_TEXT = 0x004
+PLAY_FLAG_VIS = 0x008
+PLAY_FLAG_DOWNLOAD = 0x080
+PLAY_FLAG_NATIVE_VIDEO = 0x040
+PLAY_FLAG_BUFFERING = 0x100
+
+# Video sink backends; None lets playbin pick (autovideosink)
+VIDEO_SINKS = {
+    "auto": None,
+    "gl": "glimagesink",
+    "xv": "xvimagesink",
+    "x11": "ximagesink",
+}
+
+DECODER_MODES = ("auto", "hardware", "software")
+
+
+class RenderConfig:
+    """Decoder and video sink choices for the playback pipeline.
+
+    sink            one of VIDEO_SINKS
+    decoder         "auto" keeps GStreamer's ranking, "hardware" ranks
+                    hardware decoders above everything, "software" disables them
+    decoder_threads thread count for software decoders (0 = decoder default)
+    decoder_ranks   {factory name: rank} overrides applied on top
+    """
+
+    def __init__(self, sink="auto", decoder="auto", decoder_threads=0, decoder_ranks=None):
+        self.sink = sink if sink in VIDEO_SINKS else "auto"
+        self.decoder = decoder if decoder in DECODER_MODES else "auto"
+        self.decoder_threads = int(decoder_threads)
+        self.decoder_ranks = dict(decoder_ranks or {})
+
+    def describe(self):
+        threads = self.decoder_threads or "default"
+        return f"sink={self.sink} decoder={self.decoder} threads={threads}"
+
+
+def is_hardware_decoder(factory):
+    klass = factory.get_metadata("klass") or ""
+    return "Hardware" in klass.split("/")
+
+
+def apply_decoder_ranks(config):
+    """Re-rank decoder factories in the registry; affects every later pipeline."""
+    if config.decoder != "auto":
+        decoders = Gst.ElementFactory.list_get_elements(
+            Gst.ELEMENT_FACTORY_TYPE_DECODER, Gst.Rank.NONE
+        )
+        for factory in decoders:
+            if is_hardware_decoder(factory):
+                rank = Gst.Rank.PRIMARY + 100 if config.decoder == "hardware" else Gst.Rank.NONE
+                factory.set_rank(rank)
+
+    registry = Gst.Registry.get()
+    for name, rank in config.decoder_ranks.items():
+        feature = registry.lookup_feature(name)
+        if feature is None:
+            log.warning("Unknown decoder '%s', rank override ignored", name)
+            continue
+        feature.set_rank(int(rank))
+
+
+def configure_decoder_threads(element, threads):
+    """Set the thread count on a software decoder, whatever it calls the property."""
+    if threads <= 0:
+        return
+    for prop in ("max-threads", "n-threads", "threads"):
+        if element.find_property(prop) is not None:
+            element.set_property(prop, threads)
+            return
+
+
+def make_video_sink(config):
+    factory = VIDEO_SINKS.get(config.sink)
+    if factory is None:
+        return None
+    sink = Gst.ElementFactory.make(factory, None)
+    if sink is None:
+        log.warning("%s not available, falling back to automatic sink", factory)
+    return sink
+
+
+def request_pad(element, template):
+    # request_pad_simple() replaced get_request_pad() in 1.20
+    if hasattr(element, "request_pad_simple"):
+        return element.request_pad_simple(template)
+    return element.get_request_pad(template)
+
+
+class VideoTee:
+    """playbin's video-sink: the main sink, plus extra views fed from a tee.
+
+    Frames are decoded (and converted) once; every view gets the same
+    buffers by reference. Each extra view sits behind a leaky queue, so a
+    slow window drops frames instead of holding up the main one, and in
+    its own async-handling bin, so adding one to a paused pipeline doesn't
+    put the whole pipeline back into preroll.
+    """
+
+    # Sinks that convert and scale by themselves
+    CONVERTING_SINKS = ("glimagesink", "glimagesinkelement")
+
+    def __init__(self, sink=None):
+        self.bin = Gst.Bin.new("video-tee")
+        self.tee = Gst.ElementFactory.make("tee", "tee")
+        self.tee.set_property("allow-not-linked", True)
+        queue = Gst.ElementFactory.make("queue", None)
+        self.sink = sink or Gst.ElementFactory.make("autovideosink", None)
+        for element in (self.tee, queue, self.sink):
+            self.bin.add(element)
+        self.tee.link(queue)
+        queue.link(self.sink)
+        self.bin.add_pad(Gst.GhostPad.new("sink", self.tee.get_static_pad("sink")))
+        self._pads = {}     # view bin name -> tee src pad
+        self._next = 0
+
+    def add_view(self, sink):
+        """Show the video in sink too; returns the view's name for remove_view()."""
+        name = f"view{self._next}"
+        self._next += 1
+        branch = Gst.Bin.new(name)
+        branch.set_property("async-handling", True)
+        queue = Gst.ElementFactory.make("queue", None)
+        queue.set_property("leaky", 2)  # downstream
+        queue.set_property("max-size-buffers", 2)
+        queue.set_property("max-size-bytes", 0)
+        queue.set_property("max-size-time", 0)
+        elements = [queue]
+        factory = sink.get_factory()
+        if factory is None or factory.get_name() not in self.CONVERTING_SINKS:
+            elements += [Gst.ElementFactory.make("videoconvert", None), Gst.ElementFactory.make("videoscale", None)]
+        elements.append(sink)
+        for element in elements:
+            branch.add(element)
+        for upstream, downstream in zip(elements, elements[1:]):
+            upstream.link(downstream)
+        branch.add_pad(Gst.GhostPad.new("sink", queue.get_static_pad("sink")))
+
+        self.bin.add(branch)
+        pad = request_pad(self.tee, "src_%u")
+        pad.link(branch.get_static_pad("sink"))
+        branch.sync_state_with_parent()
+        self._pads[name] = pad
+        return name
+
+    def remove_view(self, name):
+        pad = self._pads.pop(name, None)
+        branch = self.bin.get_by_name(name)
+        if pad is None or branch is None:
+            return
+
+        def unlink(pad, info):
+            # Streaming thread, between two buffers
+            pad.unlink(branch.get_static_pad("sink"))
+            self.tee.release_request_pad(pad)
+            branch.call_async(self._dispose, None)
+            return Gst.PadProbeReturn.REMOVE
+
+        # Runs right away when nothing is being pushed (also when not playing);
+        # the view's queue never blocks the tee, so that is soon in any case
+        pad.add_probe(Gst.PadProbeType.IDLE, unlink)
+
+    def views(self):
+        return list(self._pads)
+
+    def _dispose(self, branch, data):
+        branch.set_state(Gst.State.NULL)
+        self.bin.remove(branch)
+
+
+class VideoOutput:
+    """Applies a RenderConfig to playbin and embeds its video into a native window.
+
+    The sink asks for a window through a prepare-window-handle message, which
+    has to be answered synchronously on the streaming thread; the handle is
+    therefore captured up front on the GUI thread. Extra views (see VideoTee)
+    are told apart by the bin the asking sink sits in.
+
+    With the GL sink, NATIVE_VIDEO stops playbin from inserting its own
+    videoconvert/videoscale, so colour conversion and scaling happen on the
+    GPU and hardware-decoded frames never come back to system memory.
+    """
+
+    def __init__(self, pipeline, dispatcher, config=None):
+        self.pipeline = pipeline
+        self.config = config or RenderConfig()
+        self.window_handle = None
+        self._view_handles = {}  # view name -> window handle
+
+        apply_decoder_ranks(self.config)
+        self.sink = make_video_sink(self.config)
+        if self.sink is not None and self.config.sink == "gl":
+            flags = pipeline.get_property("flags")
+            pipeline.set_property("flags", flags | PLAY_FLAG_NATIVE_VIDEO)
+        self.tee = VideoTee(self.sink)
+        pipeline.set_property("video-sink", self.tee.bin)
+
+        pipeline.connect("element-setup", self._on_element_setup)
+        dispatcher.add_sync_handler(self._on_sync_message)
+
+    def set_window_handle(self, handle):
+        self.window_handle = handle
+
+    def add_view(self, handle):
+        """Mirror the video into another native window; returns a name for remove_view()."""
+        sink = make_video_sink(self.config) or Gst.ElementFactory.make("autovideosink", None)
+        name = self.tee.add_view(sink)
+        self._view_handles[name] = handle
+        return name
+
+    def remove_view(self, name):
+        self.tee.remove_view(name)
+        self._view_handles.pop(name, None)
+
+    def _handle_for(self, element):
+        while element is not None:
+            handle = self._view_handles.get(element.get_name())
+            if handle is not None:
+                return handle
+            element = element.get_parent()
+        return self.window_handle
+
+    def expose(self):
+        if isinstance(self.sink, GstVideo.VideoOverlay):
+            self.sink.expose()
+
+    def _on_element_setup(self, pipeline, element):
+        factory = element.get_factory()
+        if factory is not None and factory.list_is_type(Gst.ELEMENT_FACTORY_TYPE_DECODER):
+            configure_decoder_threads(element, self.config.decoder_threads)
+
+    def _on_sync_message(self, message):
+        if not GstVideo.is_video_overlay_prepare_window_handle_message(message):
+            return False
+        handle = self._handle_for(message.src)
+        if handle is not None:
+            message.src.set_window_handle(handle)
+        return True
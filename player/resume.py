@@ -0,0 +1,212 @@
+# player/resume.py
+
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+from player.storage import DATA_DIR
+
+log = logging.getLogger(__name__)
+
+RESUME_DB = os.path.join(DATA_DIR, "resume.db")
+
+FINGERPRINT_CHUNK = 64 * 1024
+
+
+def fingerprint(path):
+    """16-byte identity of a file's content: its size plus hashes of head and tail.
+
+    Survives renames and moves; reads at most 128 KiB however big the file is.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_CHUNK))
+        if size > 2 * FINGERPRINT_CHUNK:
+            f.seek(-FINGERPRINT_CHUNK, os.SEEK_END)
+            digest.update(f.read(FINGERPRINT_CHUNK))
+    return digest.digest()
+
+
+class ResumeStore(QObject):
+    """Where each file was left: position, audio/subtitle track and volume.
+
+    Tracks are None when never chosen by hand; a subtitle of -1 means off.
+
+    Rows are keyed by content fingerprint in a WITHOUT ROWID table of a few
+    dozen bytes each, pruned to MAX_ENTRIES. Every database access, and the
+    file reads for fingerprints, run on one worker thread that owns the
+    connection. update() only records the latest values in memory; they
+    are written in a single transaction once updates have been quiet for
+    FLUSH_DELAY_MS, or at most every MAX_FLUSH_INTERVAL_MS while playing.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS resume (
+            fingerprint BLOB PRIMARY KEY,
+            position    INTEGER NOT NULL,
+            audio       INTEGER,
+            subtitle    INTEGER,
+            volume      REAL,
+            updated     INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS resume_updated ON resume (updated);
+    """
+
+    MAX_ENTRIES = 5000
+    FLUSH_DELAY_MS = 2000
+    MAX_FLUSH_INTERVAL_MS = 15000
+    FINGERPRINT_CACHE = 256
+
+    found = pyqtSignal(str, object)   # path, entry dict or None
+
+    # Worker -> GUI thread
+    _found = pyqtSignal(int, str, object)
+
+    def __init__(self, path=RESUME_DB, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._db = None
+        self._fingerprints = {}   # (path, size, mtime) -> fingerprint, worker thread only
+        self._pending = {}        # path -> entry dict, or None to forget
+        self._generation = 0
+        self._first_pending = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cinesq-resume")
+        self._found.connect(self._on_found, Qt.QueuedConnection)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.FLUSH_DELAY_MS)
+        self.timer.timeout.connect(self.flush)
+
+    # ─── Public API (GUI thread) ─────────────
+
+    def lookup(self, path):
+        """Emit found(path, entry) for path; only the latest lookup is answered."""
+        self._generation += 1
+        # Values not flushed yet are newer than the stored row
+        pending = self._pending.get(path, {})
+        self._executor.submit(self._lookup, self._generation, path, dict(pending) if pending else pending)
+
+    def update(self, path, **entry):
+        """Remember position/audio/subtitle/volume for path; written later in a batch."""
+        if path in self._pending and self._pending[path] is None:
+            # Forgotten in this batch: start over rather than merge with the stored row
+            current = {"reset": True}
+        else:
+            current = self._pending.get(path) or {}
+        current.update(entry)
+        self._schedule(path, current)
+
+    def forget(self, path):
+        self._schedule(path, None)
+
+    def flush(self):
+        self.timer.stop()
+        if self._pending:
+            batch, self._pending = self._pending, {}
+            self._executor.submit(self._write, batch)
+
+    def shutdown(self):
+        self._generation += 1
+        self.flush()
+        self._executor.submit(self._close)
+        self._executor.shutdown(wait=True)
+
+    def _schedule(self, path, entry):
+        if not self._pending:
+            self._first_pending = time.monotonic()
+        self._pending[path] = entry
+        if (time.monotonic() - self._first_pending) * 1000 >= self.MAX_FLUSH_INTERVAL_MS:
+            self.flush()
+        else:
+            self.timer.start()
+
+    def _on_found(self, generation, path, entry):
+        if generation == self._generation:
+            self.found.emit(path, entry)
+
+    # ─── Worker thread ─────────────
+
+    def _connect(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(self.SCHEMA)
+        return self._db
+
+    def _close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _fingerprint(self, path):
+        st = os.stat(path)
+        key = (path, st.st_size, st.st_mtime_ns)
+        fp = self._fingerprints.get(key)
+        if fp is None:
+            fp = fingerprint(path)
+            if len(self._fingerprints) >= self.FINGERPRINT_CACHE:
+                self._fingerprints.pop(next(iter(self._fingerprints)))
+            self._fingerprints[key] = fp
+        return fp
+
+    def _lookup(self, generation, path, pending):
+        entry = None
+        if pending is not None and not pending.get("reset"):
+            try:
+                row = self._connect().execute(
+                    "SELECT position, audio, subtitle, volume FROM resume WHERE fingerprint = ?",
+                    (self._fingerprint(path),),
+                ).fetchone()
+                if row:
+                    entry = dict(zip(("position", "audio", "subtitle", "volume"), row))
+            except (OSError, sqlite3.Error) as e:
+                log.warning("Lookup failed for %s: %s", path, e)
+        if pending:
+            entry = entry or {"position": 0, "audio": None, "subtitle": None, "volume": None}
+            entry.update((k, v) for k, v in pending.items() if v is not None and k != "reset")
+        self._found.emit(generation, path, entry)
+
+    def _write(self, batch):
+        now = int(time.time())
+        upserts, deletes = [], []
+        for path, entry in batch.items():
+            try:
+                fp = self._fingerprint(path)
+            except OSError:
+                continue
+            if entry is None:
+                deletes.append((fp,))
+            else:
+                if entry.get("reset"):
+                    # The delete runs first, so this becomes a fresh row
+                    deletes.append((fp,))
+                upserts.append((fp, entry.get("position"), entry.get("audio"),
+                                entry.get("subtitle"), entry.get("volume"), now))
+        try:
+            db = self._connect()
+            with db:
+                db.executemany("DELETE FROM resume WHERE fingerprint = ?", deletes)
+                db.executemany(
+                    "INSERT INTO resume (fingerprint, position, audio, subtitle, volume, updated) "
+                    "VALUES (?, COALESCE(?, 0), ?, ?, ?, ?) ON CONFLICT(fingerprint) DO UPDATE SET "
+                    # Fields not in this update keep their stored values
+                    "position = COALESCE(?2, position), audio = COALESCE(excluded.audio, audio), "
+                    "subtitle = COALESCE(excluded.subtitle, subtitle), "
+                    "volume = COALESCE(excluded.volume, volume), updated = excluded.updated",
+                    upserts,
+                )
+                db.execute(
+                    "DELETE FROM resume WHERE fingerprint IN (SELECT fingerprint FROM resume "
+                    "ORDER BY updated DESC LIMIT -1 OFFSET ?)", (self.MAX_ENTRIES,),
+                )
+        except sqlite3.Error as e:
+            log.warning("Failed to save positions: %s", e)
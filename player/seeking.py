@@ -0,0 +1,171 @@
+# player/seeking.py
+
+import logging
+
+import gi
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+log = logging.getLogger(__name__)
+
+
+class SeekScheduler(QObject):
+    """Single entry point for every seek on the playback pipeline.
+
+    A flushing seek is only issued once the previous one has completed
+    (ASYNC_DONE); anything requested in between replaces the pending target,
+    so dragging the slider keeps at most one seek in flight plus the latest
+    position queued. Scrubbing snaps to the nearest keyframe, which is cheap
+    even on long-GOP 4K files; the final position on release is accurate.
+
+    Playback rate changes (fast-forward, rewind, slow motion) are seeks as
+    well and go through here, as do frame steps.
+    """
+
+    SCRUB_FLAGS = Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT | Gst.SeekFlags.SNAP_NEAREST
+    ACCURATE_FLAGS = Gst.SeekFlags.FLUSH | Gst.SeekFlags.ACCURATE
+    TRICKMODE_FLAGS = (Gst.SeekFlags.TRICKMODE | Gst.SeekFlags.TRICKMODE_KEY_UNITS
+                       | Gst.SeekFlags.TRICKMODE_NO_AUDIO)
+
+    RATES = [-16.0, -8.0, -4.0, -2.0, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0]
+    SEEK_TIMEOUT_MS = 1000
+
+    rate_changed = pyqtSignal(float)
+
+    def __init__(self, pipeline, dispatcher, tracker, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.tracker = tracker
+        self.rate = 1.0
+
+        self._in_flight = False
+        self._pending = None  # (position, flags)
+
+        # A seek that never completes (e.g. on an unseekable stream)
+        # must not block every later one.
+        self._watchdog = QTimer(self)
+        self._watchdog.setSingleShot(True)
+        self._watchdog.setInterval(self.SEEK_TIMEOUT_MS)
+        self._watchdog.timeout.connect(self._on_seek_done)
+
+        dispatcher.async_done.connect(self._on_seek_done)
+        dispatcher.message.connect(self._on_message)
+
+    def reset(self):
+        self._in_flight = False
+        self._pending = None
+        self._watchdog.stop()
+        if self.rate != 1.0:
+            self.rate = 1.0
+            self.rate_changed.emit(self.rate)
+
+    # ─── Position seeks ─────────────
+
+    def target(self):
+        """Where playback is headed: the queued target if any, else the last known position."""
+        return self._pending[0] if self._pending else self.tracker.position
+
+    def seek_to(self, position, accurate=False):
+        flags = self.ACCURATE_FLAGS if accurate else self.SCRUB_FLAGS
+        position = max(0, int(position))
+        if self.tracker.duration:
+            position = min(position, self.tracker.duration)
+        if self._in_flight:
+            self._pending = (position, flags)
+        else:
+            self._issue(position, flags)
+
+    def seek_relative(self, seconds):
+        self.seek_to(self.target() + int(seconds * Gst.SECOND))
+
+    def _issue(self, position, flags):
+        if self.rate == 1.0:
+            ok = self.pipeline.seek_simple(Gst.Format.TIME, flags, position)
+        else:
+            ok = self._rate_seek(self.rate, position, flags)
+        if not ok:
+            log.warning("Seek failed")
+            return
+        self._in_flight = True
+        self._watchdog.start()
+        self.tracker.position = position
+
+    def _on_seek_done(self):
+        self._watchdog.stop()
+        self._in_flight = False
+        if self._pending:
+            position, flags = self._pending
+            self._pending = None
+            self._issue(position, flags)
+
+    # ─── Trick modes ─────────────
+
+    def _rate_seek(self, rate, position, flags):
+        if abs(rate) > 2.0:
+            # Decode keyframes only and drop audio; keeps fast playback cheap
+            flags |= self.TRICKMODE_FLAGS
+        if rate > 0:
+            return self.pipeline.seek(rate, Gst.Format.TIME, flags,
+                                      Gst.SeekType.SET, position, Gst.SeekType.NONE, -1)
+        return self.pipeline.seek(rate, Gst.Format.TIME, flags,
+                                  Gst.SeekType.SET, 0, Gst.SeekType.SET, position)
+
+    def set_rate(self, rate):
+        if rate == self.rate:
+            return
+        self.rate = rate
+        ok, position = self.pipeline.query_position(Gst.Format.TIME)
+        if not ok:
+            position = self.tracker.position
+        self._pending = None
+        if self._rate_seek(rate, position, self.ACCURATE_FLAGS):
+            self._in_flight = True
+            self._watchdog.start()
+        self.rate_changed.emit(rate)
+
+    def faster(self):
+        higher = [r for r in self.RATES if r > self.rate]
+        if higher:
+            self.set_rate(higher[0])
+
+    def slower(self):
+        lower = [r for r in self.RATES if r < self.rate]
+        if lower:
+            self.set_rate(lower[-1])
+
+    def normal_speed(self):
+        self.set_rate(1.0)
+
+    # ─── Frame stepping ─────────────
+
+    def _video_caps(self):
+        if self.pipeline.find_property("n-video") is not None:
+            pad = self.pipeline.emit("get-video-pad", 0)
+            return pad.get_current_caps() if pad else None
+        # playbin3 has no per-stream pads; ask the video sink instead
+        sink = self.pipeline.get_property("video-sink")
+        pad = sink.get_static_pad("sink") if sink else None
+        return pad.get_current_caps() if pad else None
+
+    def frame_duration(self):
+        caps = self._video_caps()
+        if caps:
+            ok, num, den = caps.get_structure(0).get_fraction("framerate")
+            if ok and num > 0:
+                return Gst.SECOND * den // num
+        return Gst.SECOND // 25
+
+    def step_frame(self, forward=True):
+        """Step one frame while paused."""
+        if forward:
+            self.pipeline.send_event(Gst.Event.new_step(Gst.Format.BUFFERS, 1, 1.0, True, False))
+            return
+        ok, position = self.pipeline.query_position(Gst.Format.TIME)
+        if ok:
+            self.seek_to(position - self.frame_duration(), accurate=True)
+
+    def _on_message(self, message):
+        if message.type == Gst.MessageType.STEP_DONE:
+            self.tracker.poll()
@@ -0,0 +1,211 @@
+# player/settings.py
+
+import copy
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from player.storage import CONFIG_DIR, atomic_write_json
+
+log = logging.getLogger(__name__)
+
+SETTINGS_FILE = os.path.join(CONFIG_DIR, "settings.json")
+
+# Read once into settings.json when it doesn't exist yet
+LEGACY_RECENT_FILE = os.path.join(CONFIG_DIR, "recent.json")
+LEGACY_NETWORK_FILE = os.path.join(CONFIG_DIR, "network.json")
+
+
+class Setting:
+    """One key of the schema: its type, default and allowed values.
+
+    Values read from disk or passed to Settings.set() are coerced to the
+    type and clamped or checked; a value that can't be turned into a valid
+    one falls back to the default.
+    """
+
+    def __init__(self, type, default, minimum=None, maximum=None, choices=None, nullable=False):
+        self.type = type
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+        self.nullable = nullable
+
+    def coerce(self, value):
+        if value is None:
+            return None if self.nullable else copy.deepcopy(self.default)
+        try:
+            # bool("false") is True and list("abc") is three letters; these
+            # types only accept values that already have them
+            if self.type in (bool, list, dict) and not isinstance(value, self.type):
+                raise ValueError(f"{value!r} is not a {self.type.__name__}")
+            value = self.type(value)
+        except (TypeError, ValueError):
+            return copy.deepcopy(self.default)
+        if self.minimum is not None:
+            value = max(value, self.minimum)
+        if self.maximum is not None:
+            value = min(value, self.maximum)
+        if self.choices is not None and value not in self.choices:
+            return copy.deepcopy(self.default)
+        return value
+
+
+SCHEMA = {
+    "volume": Setting(int, 50, 0, 100),
+    "theme": Setting(str, None, nullable=True),                  # None: the default theme
+    "recent_files": Setting(list, []),
+    "window.geometry": Setting(str, None, nullable=True),        # base64 QWidget.saveGeometry()
+    "playlist.visible": Setting(bool, False),
+    "playback.gapless": Setting(bool, True),
+    "subtitles.font_size": Setting(int, 24, 10, 72),
+    "audio.visualizer": Setting(str, None, nullable=True),       # None: visualizer.default_mode()
+    "audio.normalize": Setting(bool, True),
+    "audio.analyze_library": Setting(bool, False),               # measure the whole library in the background
+    "audio.loudness_target": Setting(float, -18.0, -31.0, -5.0),
+    "render.sink": Setting(str, "auto", choices=("auto", "gl", "xv", "x11")),
+    "render.decoder": Setting(str, "auto", choices=("auto", "hardware", "software")),
+    "render.decoder_threads": Setting(int, 0, 0, 64),
+    "render.decoder_ranks": Setting(dict, {}),
+    "network.size": Setting(int, -1, -1),
+    "network.duration": Setting(float, -1.0, -1.0),
+    "network.download": Setting(bool, False),
+    "network.low": Setting(int, 10, 1, 99),
+    "network.high": Setting(int, 99, 2, 100),
+    "cache.thumbnails_mb": Setting(int, 256, 16, 16384),
+}
+
+
+class Settings(QObject):
+    """Typed, cached application settings, saved to one JSON file.
+
+    Everything is read once at startup into memory; get() never touches
+    the disk. set() updates the cache and notifies subscribers right away,
+    while writing is debounced: changes are collected until they have been
+    quiet for FLUSH_DELAY_MS (or at most MAX_FLUSH_INTERVAL_MS) and the
+    whole file is then replaced atomically on a writer thread. Keys not in
+    the schema are kept as they are, so a newer version's settings survive
+    a run of an older one.
+    """
+
+    FLUSH_DELAY_MS = 1000
+    MAX_FLUSH_INTERVAL_MS = 10000
+
+    changed = pyqtSignal(str, object)   # key, new value
+
+    def __init__(self, path=SETTINGS_FILE, schema=SCHEMA, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.schema = schema
+        self.values = {key: copy.deepcopy(s.default) for key, s in schema.items()}
+        self._extra = {}
+        self._watchers = {}   # key -> [callback(value)]
+        self._dirty = False
+        self._first_change = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cinesq-settings")
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.FLUSH_DELAY_MS)
+        self.timer.timeout.connect(self.flush)
+
+        self._load()
+
+    # ─── Access ─────────────
+
+    def get(self, key):
+        value = self.values[key]
+        # Lists and dicts are handed out as copies; changes go through set()
+        return copy.copy(value) if isinstance(value, (list, dict)) else value
+
+    def set(self, key, value):
+        value = self.schema[key].coerce(value)
+        if value == self.values[key]:
+            return
+        self.values[key] = value
+        self._schedule()
+        self.changed.emit(key, value)
+        for callback in self._watchers.get(key, ()):
+            callback(self.get(key))
+
+    def update(self, values):
+        for key, value in values.items():
+            self.set(key, value)
+
+    def section(self, prefix):
+        """{name: value} of every "prefix.name" key."""
+        start = prefix + "."
+        return {key[len(start):]: self.get(key) for key in self.values if key.startswith(start)}
+
+    def watch(self, key, callback):
+        """Call callback(value) whenever key changes."""
+        self._watchers.setdefault(key, []).append(callback)
+
+    # ─── Saving ─────────────
+
+    def flush(self):
+        self.timer.stop()
+        if self._dirty:
+            self._dirty = False
+            data = dict(self._extra, **copy.deepcopy(self.values))
+            self._executor.submit(self._write, data)
+
+    def shutdown(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _schedule(self):
+        if not self._dirty:
+            self._dirty = True
+            self._first_change = time.monotonic()
+        if (time.monotonic() - self._first_change) * 1000 >= self.MAX_FLUSH_INTERVAL_MS:
+            self.flush()
+        else:
+            self.timer.start()
+
+    def _write(self, data):
+        # Writer thread
+        try:
+            atomic_write_json(self.path, data)
+        except OSError as e:
+            log.warning("Failed to save: %s", e)
+
+    # ─── Loading ─────────────
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("not an object")
+        except FileNotFoundError:
+            data = self._migrate()
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring %s: %s", self.path, e)
+            return
+        for key, value in data.items():
+            if key in self.schema:
+                self.values[key] = self.schema[key].coerce(value)
+            else:
+                self._extra[key] = value
+
+    def _migrate(self):
+        data = {}
+        try:
+            with open(LEGACY_RECENT_FILE, "r", encoding="utf-8") as f:
+                data["recent_files"] = json.load(f)
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(LEGACY_NETWORK_FILE, "r", encoding="utf-8") as f:
+                data.update({f"network.{k}": v for k, v in json.load(f).items()})
+        except (OSError, ValueError, AttributeError):
+            pass
+        if data:
+            self._schedule()
+        return data
@@ -0,0 +1,161 @@
+# player/startup.py
+
+import json
+import logging
+import os
+import threading
+import time
+
+import gi
+from PyQt5.QtCore import QObject, pyqtSignal
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+from player.storage import CACHE_DIR, atomic_write_json
+
+log = logging.getLogger(__name__)
+
+STARTUP_PROFILE = os.path.join(CACHE_DIR, "startup.json")
+REGISTRY_STAMP = os.path.join(CACHE_DIR, "registry.json")
+
+# Loaded in the background so the first open doesn't pay for them
+WARM_FEATURES = (
+    "playbin", "uridecodebin", "decodebin", "typefind",
+    "playbin3", "uridecodebin3", "decodebin3",
+    "autovideosink", "autoaudiosink", "videoconvert", "audioconvert",
+)
+
+
+class StartupProfile:
+    """Time of each startup phase, in seconds since the profile was created.
+
+    main.py imports this module first, so phases count from just after
+    interpreter start-up and the GI typelib load; benchmarks/startup.py
+    times whole processes for the rest.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases = {}
+
+    def mark(self, name):
+        if name not in self.phases:
+            self.phases[name] = round(time.perf_counter() - self.origin, 4)
+
+    def save(self, path=STARTUP_PROFILE):
+        try:
+            atomic_write_json(path, self.phases)
+        except OSError as e:
+            log.warning("Failed to save profile: %s", e)
+
+
+profile = StartupProfile()
+
+
+# ─── Registry cache ─────────────
+
+def _plugin_paths():
+    paths = set()
+    for var in ("GST_PLUGIN_PATH", "GST_PLUGIN_PATH_1_0", "GST_PLUGIN_SYSTEM_PATH",
+                "GST_PLUGIN_SYSTEM_PATH_1_0"):
+        paths.update(p for p in os.environ.get(var, "").split(os.pathsep) if p)
+    return paths
+
+
+def _fingerprint(dirs):
+    stamp = {}
+    for path in sorted(dirs):
+        try:
+            stamp[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            stamp[path] = None
+    return stamp
+
+
+def registry_is_warm():
+    """Skip GStreamer's plugin rescan when nothing changed since the last run.
+
+    Gst.init() normally stats every plugin file to decide whether its
+    registry cache is stale. Installing, upgrading or removing a plugin
+    changes the mtime of its directory, so comparing the directories
+    recorded after the previous init is enough to know the cache is good.
+    """
+    if "GST_REGISTRY_UPDATE" in os.environ:
+        return False
+    try:
+        with open(REGISTRY_STAMP) as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if stamp.get("version") != Gst.version_string():
+        return False
+    if stamp.get("env") != sorted(_plugin_paths()):
+        return False
+    dirs = stamp.get("dirs") or {}
+    if not dirs or _fingerprint(dirs) != dirs:
+        return False
+    os.environ["GST_REGISTRY_UPDATE"] = "no"
+    return True
+
+
+def save_registry_stamp():
+    dirs = _plugin_paths()
+    for plugin in Gst.Registry.get().get_plugin_list():
+        filename = plugin.get_filename()
+        if filename:
+            dirs.add(os.path.dirname(filename))
+    try:
+        atomic_write_json(REGISTRY_STAMP, {
+            "version": Gst.version_string(),
+            "env": sorted(_plugin_paths()),
+            "dirs": _fingerprint(dirs),
+        })
+    except OSError as e:
+        log.warning("Failed to save registry stamp: %s", e)
+
+
+# ─── Background init ─────────────
+
+class GstLoader(QObject):
+    """Initializes GStreamer on a background thread.
+
+    Gst.init() loads (and, when stale, rebuilds) the plugin registry, and
+    the first playbin pulls in the playback plugins; together that is most
+    of a cold start. Running it beside widget construction lets the window
+    appear first. ready fires on the GUI thread once it is safe to build
+    pipelines.
+    """
+
+    ready = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.done = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cinesq-gst-init", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            warm = registry_is_warm()
+            Gst.init(None)
+            profile.mark("gst_init")
+            if not warm:
+                save_registry_stamp()
+            registry = Gst.Registry.get()
+            for name in WARM_FEATURES:
+                feature = registry.lookup_feature(name)
+                if feature is not None:
+                    feature.load()
+            profile.mark("plugins")
+        except Exception as e:
+            log.error("GStreamer failed to initialize: %s", e)
+            self.failed.emit(str(e))
+            return
+        self.done = True
+        self.ready.emit()
@@ -0,0 +1,317 @@
+# player/storage.py
+
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+log = logging.getLogger(__name__)
+
+# Per-user locations, following the XDG base directory spec
+CONFIG_DIR = os.path.join(os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config"), "cinesq")
+DATA_DIR = os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"), "cinesq")
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "cinesq")
+
+PLAYLIST_DIR = os.path.join(CONFIG_DIR, "playlists")
+LEGACY_PLAYLIST_FILE = os.path.join(CONFIG_DIR, "playlist.json")
+DEFAULT_PLAYLIST = "default"
+
+JOURNAL_HEADER = "#cinesq-playlist 1"
+JOURNAL_EXT = ".cpl"
+
+
+def atomic_write(path, text):
+    """Replace `path` with `text` so that readers see either the old or the new file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+def atomic_write_json(path, data):
+    atomic_write(path, json.dumps(data))
+
+
+def _fsync_dir(directory):
+    # Make the rename itself durable; not every platform allows this
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class PlaylistJournal(QObject):
+    """Append-only, crash-safe persistence for a Playlist.
+
+    A playlist file is a header line followed by one JSON value per line:
+
+        "/path/to/file.mkv"   add
+        ["-", row]            remove row
+        ["m", src, dst]       move row
+        ["c"]                 clear
+
+    Every change to the playlist is appended (and fsynced) on a writer
+    thread, so saving costs the size of the change, not of the playlist.
+    A crash can at worst leave a half-written last line, which loading
+    ignores. Once the journal grows well past the playlist it is compacted
+    into a plain list of adds through a temp file and rename.
+
+    Loading replays the file in chunks from the event loop, so the first
+    rows appear while the rest is still being read.
+    """
+
+    CHUNK_LINES = 5000
+    COMPACT_MIN_OPS = 1000
+
+    error = pyqtSignal(str)
+    loaded = pyqtSignal(str)
+
+    # Writer thread -> GUI thread
+    _failed = pyqtSignal(str)
+
+    def __init__(self, playlist, parent=None):
+        super().__init__(parent)
+        self.playlist = playlist
+        self.name = None
+        self.path = None
+
+        self._ops = 0
+        self._file = None        # append handle, writer thread only
+        self._reader = None
+        self._replaying = False
+        self._edited_while_loading = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cinesq-journal")
+        self._failed.connect(self.error)
+
+        playlist.rows_inserted.connect(self._on_rows_inserted)
+        playlist.rows_removed.connect(self._on_rows_removed)
+        playlist.row_moved.connect(self._on_row_moved)
+        playlist.reset.connect(self._on_reset)
+
+    # ─── Names ─────────────
+
+    @staticmethod
+    def path_for(name):
+        return os.path.join(PLAYLIST_DIR, name + JOURNAL_EXT)
+
+    @staticmethod
+    def names():
+        try:
+            return sorted(
+                f[:-len(JOURNAL_EXT)] for f in os.listdir(PLAYLIST_DIR) if f.endswith(JOURNAL_EXT)
+            )
+        except OSError:
+            return []
+
+    # ─── Loading ─────────────
+
+    def is_loading(self):
+        return self._reader is not None
+
+    def open(self, name=DEFAULT_PLAYLIST):
+        self._close_reader()
+        self._executor.submit(self._close_file)
+        self.name = name
+        self.path = self.path_for(name)
+        self._ops = 0
+
+        self._replaying = True
+        self.playlist.clear()
+        self._replaying = False
+
+        if not os.path.exists(self.path) and name == DEFAULT_PLAYLIST:
+            self._migrate_legacy()
+        if not os.path.exists(self.path):
+            self.loaded.emit(name)
+            return
+
+        try:
+            self._reader = open(self.path, "rb")
+            header = self._reader.readline().decode("utf-8", "replace").strip()
+        except OSError as e:
+            self._close_reader()
+            self.error.emit(f"Could not open playlist '{name}': {e}")
+            return
+        if header != JOURNAL_HEADER:
+            self._close_reader()
+            self.error.emit(f"'{self.path}' is not a Cinesq playlist")
+            return
+
+        self._edited_while_loading = False
+        QTimer.singleShot(0, self._load_chunk)
+
+    def _load_chunk(self):
+        if self._reader is None:
+            return
+        adds = []
+        done = False
+        corrupt = False
+        self._replaying = True
+        try:
+            for _ in range(self.CHUNK_LINES):
+                line = self._reader.readline()
+                if not line.endswith(b"\n"):
+                    # EOF, or a line cut short by a crash mid-append; the
+                    # fragment must go before anything is appended after it
+                    corrupt = bool(line)
+                    done = True
+                    break
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    # Later ops refer to rows as they were after this one;
+                    # replaying them without it would shift every row
+                    corrupt = done = True
+                    break
+                self._ops += 1
+                if isinstance(op, str):
+                    adds.append(op)
+                    continue
+                if adds:
+                    self.playlist.add_many(adds)
+                    adds = []
+                self._apply(op)
+            if adds:
+                self.playlist.add_many(adds)
+        except OSError as e:
+            self.error.emit(f"Failed to read playlist '{self.name}': {e}")
+            done = True
+        finally:
+            self._replaying = False
+
+        if not done:
+            QTimer.singleShot(0, self._load_chunk)
+            return
+
+        self._close_reader()
+        if corrupt:
+            log.warning("'%s' is damaged; keeping the entries read before the damage", self.path)
+        if corrupt or self._edited_while_loading or self._should_compact():
+            # Replaces the file on the writer thread, ahead of any append
+            self.compact()
+        self.loaded.emit(self.name)
+
+    def _apply(self, op):
+        kind = op[0] if op else None
+        if kind == "-":
+            self.playlist.remove(op[1])
+        elif kind == "m":
+            self.playlist.move(op[1], op[2])
+        elif kind == "c":
+            self.playlist.clear()
+
+    def _close_reader(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _migrate_legacy(self):
+        try:
+            with open(LEGACY_PLAYLIST_FILE, "r") as f:
+                files = json.load(f)
+            atomic_write(self.path, self._snapshot(files))
+        except (OSError, ValueError):
+            pass
+
+    # ─── Saving ─────────────
+
+    def save_as(self, name):
+        """Write the current playlist under a new name and keep journaling there."""
+        self.name = name
+        self.path = self.path_for(name)
+        self.compact()
+
+    def compact(self):
+        if self.path is None:
+            return
+        self._ops = len(self.playlist.files)
+        self._executor.submit(self._write_snapshot, self.path, list(self.playlist.files))
+
+    def _should_compact(self):
+        return self._ops > max(self.COMPACT_MIN_OPS, 2 * len(self.playlist.files))
+
+    def _record(self, lines):
+        if self._replaying or self.path is None:
+            return
+        if self.is_loading():
+            self._edited_while_loading = True
+            return
+        self._ops += len(lines)
+        if self._should_compact():
+            self.compact()
+        else:
+            self._executor.submit(self._append, self.path, "".join(line + "\n" for line in lines))
+
+    def _on_rows_inserted(self, first, count):
+        self._record([json.dumps(p) for p in self.playlist.files[first:first + count]])
+
+    def _on_rows_removed(self, first, count):
+        self._record([json.dumps(["-", first])] * count)
+
+    def _on_row_moved(self, src, dst):
+        self._record([json.dumps(["m", src, dst])])
+
+    def _on_reset(self):
+        if self.playlist.files:
+            # Whole-list replacement (e.g. an import): a snapshot is the delta
+            if not self._replaying and self.path is not None and not self.is_loading():
+                self.compact()
+        else:
+            self._record([json.dumps(["c"])])
+
+    @staticmethod
+    def _snapshot(files):
+        return "".join([JOURNAL_HEADER + "\n"] + [json.dumps(p) + "\n" for p in files])
+
+    # ─── Writer thread ─────────────
+
+    def _append(self, path, text):
+        try:
+            if self._file is None or self._file.name != path:
+                self._close_file()
+                if not os.path.exists(path):
+                    atomic_write(path, JOURNAL_HEADER + "\n")
+                self._file = open(path, "a", encoding="utf-8")
+            self._file.write(text)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            self._failed.emit(f"Failed to save playlist: {e}")
+
+    def _write_snapshot(self, path, files):
+        try:
+            self._close_file()
+            atomic_write(path, self._snapshot(files))
+        except OSError as e:
+            self._failed.emit(f"Failed to save playlist: {e}")
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def shutdown(self):
+        self._close_reader()
+        self._executor.submit(self._close_file)
+        self._executor.shutdown(wait=True)
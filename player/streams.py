@@ -0,0 +1,163 @@
+# player/streams.py
+
+from collections import OrderedDict
+
+import gi
+from PyQt5.QtCore import QObject, pyqtSignal
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+from player.rendering import PLAY_FLAG_TEXT
+
+KINDS = ("video", "audio", "text")
+
+
+class StreamInfo:
+    """One elementary stream of the current file, as shown in the track menus."""
+
+    def __init__(self, kind, index, stream_id=None, tags=None, caps=None):
+        self.kind = kind
+        self.index = index            # playbin's n-audio/n-text numbering
+        self.stream_id = stream_id    # playbin3 stream id
+        self.language = None
+        self.title = None
+        self.codec = None
+        if tags is not None:
+            self.language = _tag(tags, Gst.TAG_LANGUAGE_NAME) or _tag(tags, Gst.TAG_LANGUAGE_CODE)
+            self.title = _tag(tags, Gst.TAG_TITLE)
+            codec_tag = {"audio": Gst.TAG_AUDIO_CODEC, "text": Gst.TAG_SUBTITLE_CODEC}.get(kind)
+            self.codec = _tag(tags, codec_tag) if codec_tag else _tag(tags, Gst.TAG_VIDEO_CODEC)
+        if self.codec is None and caps is not None and caps.get_size():
+            self.codec = caps.get_structure(0).get_name()
+
+    def label(self):
+        parts = [p for p in (self.title, self.language) if p]
+        text = " — ".join(parts) or f"Track {self.index + 1}"
+        return f"{text} [{self.codec}]" if self.codec else text
+
+
+def _tag(tags, name):
+    ok, value = tags.get_string(name)
+    return value if ok else None
+
+
+class StreamSelector(QObject):
+    """Audio/subtitle track discovery and switching without rebuilding the pipeline.
+
+    With playbin3 the demuxer's stream collection arrives on the bus and
+    tracks are switched with select-streams events; streams that are not
+    selected are never decoded. With playbin the track list is read from
+    n-audio/n-text and the per-stream tags, and switching sets
+    current-audio/current-text. Either way the topology is read once per
+    file and cached by URI, so opening a menu never queries the pipeline.
+    """
+
+    CACHE_SIZE = 32
+
+    changed = pyqtSignal()
+
+    def __init__(self, pipeline, dispatcher, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.playbin3 = pipeline.__gtype__.name == "GstPlayBin3"
+        self.streams = {kind: [] for kind in KINDS}
+        self.selected = {kind: -1 for kind in KINDS}
+        self._stale = True
+        self._cache = OrderedDict()  # uri -> streams
+
+        dispatcher.message.connect(self._on_message)
+        dispatcher.stream_start.connect(self.invalidate)
+
+    def invalidate(self):
+        self._stale = True
+
+    def tracks(self, kind):
+        self._refresh()
+        return self.streams[kind]
+
+    def current(self, kind):
+        self._refresh()
+        return self.selected[kind]
+
+    def select(self, kind, index):
+        """Switch to tracks(kind)[index]; -1 turns subtitles off."""
+        self._refresh()
+        if self.playbin3:
+            self._select_streams(kind, index)
+        elif index >= 0:
+            self.pipeline.set_property(f"current-{kind}", self.streams[kind][index].index)
+        self.selected[kind] = index
+
+    # ─── playbin ─────────────
+
+    def _refresh(self):
+        if not self._stale or self.playbin3:
+            return
+        uri = self.pipeline.get_property("current-uri")
+        cached = self._cache.get(uri) if uri else None
+        if cached is None:
+            cached = {kind: self._read_streams(kind) for kind in KINDS}
+            if uri:
+                self._cache[uri] = cached
+                while len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(uri)
+        self.streams = cached
+        for kind in KINDS:
+            self.selected[kind] = self.pipeline.get_property(f"current-{kind}")
+        if not self.pipeline.get_property("flags") & PLAY_FLAG_TEXT:
+            self.selected["text"] = -1
+        self._stale = False
+
+    def _read_streams(self, kind):
+        streams = []
+        for i in range(self.pipeline.get_property(f"n-{kind}")):
+            tags = self.pipeline.emit(f"get-{kind}-tags", i)
+            streams.append(StreamInfo(kind, i, tags=tags))
+        return streams
+
+    # ─── playbin3 ─────────────
+
+    def _on_message(self, message):
+        if message.type == Gst.MessageType.STREAM_COLLECTION:
+            collection = message.parse_stream_collection()
+            streams = {kind: [] for kind in KINDS}
+            for i in range(collection.get_size()):
+                stream = collection.get_stream(i)
+                kind = _stream_kind(stream)
+                if kind:
+                    streams[kind].append(StreamInfo(kind, len(streams[kind]), stream.get_stream_id(),
+                                                    stream.get_tags(), stream.get_caps()))
+            self.streams = streams
+            self.selected = {kind: -1 for kind in KINDS}
+            self._stale = False
+            self.changed.emit()
+        elif message.type == Gst.MessageType.STREAMS_SELECTED:
+            selected = {kind: -1 for kind in KINDS}
+            for i in range(message.streams_selected_get_size()):
+                stream = message.streams_selected_get_stream(i)
+                kind = _stream_kind(stream)
+                for n, info in enumerate(self.streams.get(kind, [])):
+                    if info.stream_id == stream.get_stream_id():
+                        selected[kind] = n
+            self.selected = selected
+            self.changed.emit()
+
+    def _select_streams(self, kind, index):
+        selected = dict(self.selected, **{kind: index})
+        ids = [self.streams[k][i].stream_id for k, i in selected.items()
+               if 0 <= i < len(self.streams[k])]
+        self.pipeline.send_event(Gst.Event.new_select_streams(ids))
+
+
+def _stream_kind(stream):
+    stream_type = stream.get_stream_type()
+    if stream_type & Gst.StreamType.VIDEO:
+        return "video"
+    if stream_type & Gst.StreamType.AUDIO:
+        return "audio"
+    if stream_type & Gst.StreamType.TEXT:
+        return "text"
+    return None
@@ -0,0 +1,307 @@
+# player/subtitles.py
+
+import codecs
+import logging
+import os
+import re
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+import gi
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+try:
+    import chardet
+except ImportError:
+    chardet = None
+
+log = logging.getLogger(__name__)
+
+SUBTITLE_EXTENSIONS = (".srt", ".ass", ".ssa", ".vtt")
+
+# Legacy single-byte fallback when a file is neither UTF-8 nor detectable
+FALLBACK_ENCODING = "cp1252"
+
+
+# ─── Cue store ─────────────
+
+class CueTrack:
+    """Subtitle cues flattened into non-overlapping segments.
+
+    boundaries[i] is the time (ms) where segment i starts; texts[i] is what
+    shows until boundaries[i + 1], "" for a gap. Overlapping cues are merged
+    into the segments they share, so a lookup is one bisect. Delays are
+    applied by the caller shifting the lookup time; the track never changes
+    after it is built.
+    """
+
+    def __init__(self, cues):
+        points = sorted({t for start, end, _ in cues for t in (start, end)})
+        self.boundaries = array("q", points)
+        self.cue_count = len(cues)
+
+        # Sweep: open cues at their start, close them at their end
+        starts = sorted(range(len(cues)), key=lambda i: cues[i][0])
+        ends = sorted(range(len(cues)), key=lambda i: cues[i][1])
+        active = {}
+        texts = []
+        si = ei = 0
+        for t in points:
+            while ei < len(ends) and cues[ends[ei]][1] <= t:
+                active.pop(ends[ei], None)
+                ei += 1
+            while si < len(starts) and cues[starts[si]][0] <= t:
+                i = starts[si]
+                if cues[i][1] > t:
+                    active[i] = cues[i][2]
+                si += 1
+            texts.append("\n".join(active[i] for i in sorted(active)))
+        self.texts = texts
+
+    def __len__(self):
+        return self.cue_count
+
+    def lookup(self, ms):
+        """Return (text at ms, time of the next change or None)."""
+        i = bisect_right(self.boundaries, ms) - 1
+        following = self.boundaries[i + 1] if i + 1 < len(self.boundaries) else None
+        if i < 0:
+            return "", following
+        return self.texts[i], following
+
+    def cue_start(self, ms, forward):
+        """Start of the next (or previous) non-empty segment relative to ms."""
+        i = bisect_right(self.boundaries, ms) - 1
+        step = 1 if forward else -1
+        i += step
+        while 0 <= i < len(self.texts):
+            if self.texts[i]:
+                return self.boundaries[i]
+            i += step
+        return None
+
+
+# ─── Parsing ─────────────
+
+def decode_subtitle(data):
+    for bom, encoding in ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"),
+                          (codecs.BOM_UTF16_BE, "utf-16")):
+        if data.startswith(bom):
+            return data.decode(encoding, "replace")
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+    if chardet is not None:
+        # A sample is plenty and keeps detection cheap on huge files
+        guess = chardet.detect(data[:65536]).get("encoding")
+        if guess:
+            try:
+                return data.decode(guess, "replace")
+            except LookupError:
+                pass
+    return data.decode(FALLBACK_ENCODING, "replace")
+
+
+_TAG = re.compile(r"<[^>]+>")
+_ASS_OVERRIDE = re.compile(r"\{[^}]*\}")
+_SRT_TIME = re.compile(r"(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})")
+_VTT_TIME = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{1,2})\.(\d{1,3})")
+_ASS_TIME = re.compile(r"(\d+):(\d{1,2}):(\d{1,2})[.:](\d{1,2})")
+
+
+def _ms(h, m, s, frac):
+    return ((int(h or 0) * 60 + int(m)) * 60 + int(s)) * 1000 + int(frac.ljust(3, "0")[:3])
+
+
+def _parse_arrow_blocks(text, time_re):
+    cues = []
+    for block in re.split(r"\n\s*\n", text.replace("\r\n", "\n").replace("\r", "\n")):
+        lines = block.strip("\n").split("\n")
+        for n, line in enumerate(lines):
+            if "-->" in line:
+                left, _, right = line.partition("-->")
+                start, end = time_re.search(left), time_re.search(right)
+                if start and end:
+                    body = _TAG.sub("", "\n".join(lines[n + 1:])).strip()
+                    if body:
+                        cues.append((_ms(*start.groups()), _ms(*end.groups()), body))
+                break
+    return cues
+
+
+def parse_srt(text):
+    return _parse_arrow_blocks(text, _SRT_TIME)
+
+
+def parse_vtt(text):
+    # NOTE/STYLE blocks have no arrow line and are skipped with the header
+    return _parse_arrow_blocks(text, _VTT_TIME)
+
+
+def parse_ass(text):
+    cues = []
+    fields = None
+    in_events = False
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("["):
+            in_events = line.lower() == "[events]"
+            continue
+        if not in_events:
+            continue
+        if line.startswith("Format:"):
+            fields = [f.strip().lower() for f in line[7:].split(",")]
+        elif line.startswith("Dialogue:") and fields:
+            values = line[9:].split(",", len(fields) - 1)
+            if len(values) != len(fields):
+                continue
+            event = dict(zip(fields, values))
+            start, end = _ASS_TIME.search(event["start"]), _ASS_TIME.search(event["end"])
+            if not (start and end):
+                continue
+            body = _ASS_OVERRIDE.sub("", event["text"])
+            body = body.replace("\\N", "\n").replace("\\n", "\n").replace("\\h", " ").strip()
+            if body:
+                cues.append((_ms(*start.groups()), _ms(*end.groups()), body))
+    return cues
+
+
+PARSERS = {".srt": parse_srt, ".vtt": parse_vtt, ".ass": parse_ass, ".ssa": parse_ass}
+
+
+def load_track(path):
+    """Read, decode, parse and index a subtitle file. Raises OSError or ValueError."""
+    parser = PARSERS.get(os.path.splitext(path)[1].lower())
+    if parser is None:
+        raise ValueError("unsupported subtitle format")
+    with open(path, "rb") as f:
+        cues = parser(decode_subtitle(f.read()))
+    if not cues:
+        raise ValueError("no subtitles found")
+    return CueTrack(cues)
+
+
+def find_sidecar(media_path):
+    """A subtitle file next to the media with the same base name, if any."""
+    base = os.path.splitext(media_path)[0]
+    for ext in SUBTITLE_EXTENSIONS:
+        if os.path.exists(base + ext):
+            return base + ext
+    return None
+
+
+# ─── Playback ─────────────
+
+class SubtitleController(QObject):
+    """Shows external subtitles in step with the pipeline clock.
+
+    Files are parsed on a worker thread. While playing, a single-shot timer
+    is armed for the next cue boundary rather than polling the position;
+    it is re-armed from the pipeline position on every state change,
+    completed seek and rate change. cue_changed carries the text to show,
+    "" to hide.
+    """
+
+    cue_changed = pyqtSignal(str)
+    loaded = pyqtSignal(str, int)   # path, cue count
+    failed = pyqtSignal(str, str)   # path, message
+
+    # Worker -> GUI thread: (generation, path, track or exception)
+    _parsed = pyqtSignal(int, str, object)
+
+    def __init__(self, pipeline, dispatcher, seeker, parent=None):
+        super().__init__(parent)
+        self.pipeline = pipeline
+        self.seeker = seeker
+        self.track = None
+        self.path = None
+        self.delay = 0  # ms, positive shows subtitles later
+        self.text = ""
+        self._playing = False
+        self._generation = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cinesq-subs")
+        self._parsed.connect(self._on_parsed, Qt.QueuedConnection)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.sync)
+
+        dispatcher.state_changed.connect(self._on_state_changed)
+        dispatcher.async_done.connect(self.sync)
+        seeker.rate_changed.connect(self.sync)
+
+    def load(self, path):
+        self._generation += 1
+        self._executor.submit(self._load, self._generation, path)
+
+    def clear(self):
+        self._generation += 1
+        self.track = None
+        self.path = None
+        self.sync()
+
+    def set_delay(self, ms):
+        self.delay = int(ms)
+        self.sync()
+
+    def shutdown(self):
+        self._generation += 1
+        self.timer.stop()
+        self._executor.shutdown(wait=False)
+
+    def cue_position(self, forward=True):
+        """Pipeline time (ns) of the next or previous cue, or None."""
+        if self.track is None:
+            return None
+        ok, position = self.pipeline.query_position(Gst.Format.TIME)
+        if not ok:
+            return None
+        # Small bias so "previous" from the start of a cue skips past it
+        ms = position // Gst.MSECOND - self.delay + (0 if forward else -250)
+        start = self.track.cue_start(ms, forward)
+        return None if start is None else max(0, (start + self.delay) * Gst.MSECOND)
+
+    def _load(self, generation, path):
+        # Worker thread
+        try:
+            result = load_track(path)
+        except (OSError, ValueError) as e:
+            result = e
+        self._parsed.emit(generation, path, result)
+
+    def _on_parsed(self, generation, path, result):
+        if generation != self._generation:
+            return
+        if isinstance(result, Exception):
+            log.warning("Failed to load %s: %s", path, result)
+            self.failed.emit(path, str(result))
+            return
+        self.track = result
+        self.path = path
+        self.loaded.emit(path, len(result))
+        self.sync()
+
+    def _on_state_changed(self, old, new):
+        self._playing = new == Gst.State.PLAYING
+        self.sync()
+
+    def sync(self):
+        self.timer.stop()
+        text, following = "", None
+        if self.track is not None:
+            ok, position = self.pipeline.query_position(Gst.Format.TIME)
+            if ok:
+                ms = position // Gst.MSECOND - self.delay
+                text, following = self.track.lookup(ms)
+                rate = self.seeker.rate
+                if self._playing and rate > 0 and following is not None:
+                    self.timer.start(max(1, int((following - ms) / rate)))
+        if text != self.text:
+            self.text = text
+            self.cue_changed.emit(text)
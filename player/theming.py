@@ -0,0 +1,115 @@
+# player/theming.py
+
+import os
+import re
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+from player.controls import icons
+from player.storage import CONFIG_DIR
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Searched in order; user themes can shadow the bundled ones. resources/
+# is left out: its style.qss is the legacy sheet, not a theme
+THEME_DIRS = (
+    os.path.join(CONFIG_DIR, "themes"),
+    os.path.join(PACKAGE_ROOT, "themes"),
+)
+DEFAULT_THEME = "vlc_dark"
+LIGHT_THEME = "light"
+
+_IMPORT = re.compile(r'@import\s+"([^"]+)"\s*;')
+_DEFINE = re.compile(r"^\s*@([A-Za-z_][\w-]*)\s*:\s*([^;]*);[ \t]*\n?", re.MULTILINE)
+_REFERENCE = re.compile(r"@([A-Za-z_][\w-]*)")
+
+
+class ThemeError(Exception):
+    pass
+
+
+class ThemeManager(QObject):
+    """Finds, compiles and applies .qss themes.
+
+    A theme is a QSS file in one of THEME_DIRS that may define variables
+    (`@name: value;`), use them anywhere (`@name`) and pull in shared
+    sheets (`@import "_base.qss";`). Files starting with "_" are partials,
+    not themes. Each theme is compiled to plain QSS once and cached; a
+    switch is a single QApplication.setStyleSheet(), so widgets are
+    re-polished once rather than per window or per widget.
+    """
+
+    changed = pyqtSignal(str)
+
+    def __init__(self, dirs=THEME_DIRS, parent=None):
+        super().__init__(parent)
+        self.dirs = dirs
+        self.current = None
+        self._compiled = {}  # theme name -> stylesheet
+
+    def themes(self):
+        names = set()
+        for directory in self.dirs:
+            if os.path.isdir(directory):
+                names.update(os.path.splitext(f)[0] for f in os.listdir(directory)
+                              if f.endswith(".qss") and not f.startswith("_"))
+        return sorted(names)
+
+    def stylesheet(self, name):
+        sheet = self._compiled.get(name)
+        if sheet is None:
+            sheet = self._compiled[name] = self.compile(name)
+        return sheet
+
+    def compile(self, name):
+        """Resolve imports and variables of a theme. Raises ThemeError."""
+        variables = {}
+        text = self._expand(self._find(name + ".qss"), variables, ())
+
+        def substitute(match):
+            value = variables.get(match.group(1))
+            if value is None:
+                raise ThemeError(f"{name}: undefined variable @{match.group(1)}")
+            return value
+
+        return _REFERENCE.sub(substitute, text)
+
+    def apply(self, name):
+        if name == self.current:
+            return
+        sheet = self.stylesheet(name)
+        app = QApplication.instance()
+        app.setStyleSheet(sheet)
+        self.current = name
+        icons.set_theme(name)
+        self.changed.emit(name)
+
+    def reload(self):
+        """Forget compiled themes so edited files are read again."""
+        self._compiled.clear()
+        current, self.current = self.current, None
+        if current:
+            self.apply(current)
+
+    def _find(self, filename):
+        for directory in self.dirs:
+            path = os.path.join(directory, filename)
+            if os.path.isfile(path):
+                return path
+        raise ThemeError(f"theme file {filename} not found")
+
+    def _expand(self, path, variables, seen):
+        if path in seen:
+            raise ThemeError(f"{os.path.basename(path)} imports itself")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError as e:
+            raise ThemeError(f"cannot read {path}: {e}")
+
+        # Definitions are collected in file order; the first one wins, so a
+        # theme's own values take precedence over those of what it imports
+        for var, value in _DEFINE.findall(text):
+            variables.setdefault(var, value.strip())
+        text = _DEFINE.sub("", text)
+        return _IMPORT.sub(lambda m: self._expand(self._find(m.group(1)), variables, seen + (path,)), text)
@@ -0,0 +1,249 @@
+# player/thumbnails.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import gi
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+from player.storage import CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = os.path.join(CACHE_DIR, "thumbnails")
+
+
+class SpriteSheet:
+    """Evenly spaced frames of one file packed into a single image grid."""
+
+    def __init__(self, image, tile_width, tile_height, columns, count):
+        self.image = image
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.columns = columns
+        self.count = count
+
+    def frame_at(self, fraction):
+        index = min(self.count - 1, max(0, int(fraction * self.count)))
+        x = (index % self.columns) * self.tile_width
+        y = (index // self.columns) * self.tile_height
+        return self.image.copy(x, y, self.tile_width, self.tile_height)
+
+    def meta(self):
+        return {
+            "tile_width": self.tile_width, "tile_height": self.tile_height,
+            "columns": self.columns, "count": self.count,
+        }
+
+
+class ThumbnailCache:
+    """Size-capped on-disk cache of sprite sheets with LRU eviction.
+
+    Entries are keyed by path, mtime and size, so an edited file gets new
+    thumbnails. A hit bumps the entry's mtime; eviction removes the least
+    recently used sheets until the cache is back under its cap.
+    """
+
+    def __init__(self, directory=THUMBNAIL_DIR, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def key(self, path):
+        st = os.stat(path)
+        raw = f"{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}"
+        return hashlib.sha1(raw.encode("utf-8", "surrogateescape")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".png", base + ".json"
+
+    def load(self, path):
+        try:
+            image_path, meta_path = self._paths(self.key(path))
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            image = QImage(image_path)
+        except (OSError, ValueError):
+            image = None
+        with self._lock:
+            if image is None or image.isNull():
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            os.utime(image_path)
+        except OSError:
+            pass
+        return SpriteSheet(image, **meta)
+
+    def store(self, path, sheet):
+        """Save sheet for path; False if it couldn't be (the sheet is still usable)."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            image_path, meta_path = self._paths(self.key(path))
+            if not sheet.image.save(image_path, "PNG"):
+                log.warning("Failed to write %s", image_path)
+                return False
+            with open(meta_path, "w") as f:
+                json.dump(sheet.meta(), f)
+        except OSError as e:
+            log.warning("Failed to cache %s: %s", path, e)
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".png"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, st.st_size, entry.path))
+                        total += st.st_size
+        except OSError:
+            return
+        entries.sort()
+        for _, size, image_path in entries:
+            if total <= self.max_bytes:
+                break
+            for p in (image_path, image_path[:-4] + ".json"):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class ThumbnailEngine(QObject):
+    """Builds seek-preview sprite sheets on a worker thread.
+
+    Frames are pulled through a private `uridecodebin ! videoconvert !
+    videoscale ! appsink` pipeline, entirely separate from playback, and
+    packed into a QImage off the GUI thread. Only the latest request is
+    worked on; an older one in progress stops at its next seek.
+    """
+
+    TILE_WIDTH = 160
+    TILE_HEIGHT = 90
+    COLUMNS = 10
+    COUNT = 100
+    STATE_TIMEOUT = 5 * Gst.SECOND
+
+    ready = pyqtSignal(str, object)  # path, SpriteSheet
+    failed = pyqtSignal(str, str)    # path, message
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache or ThumbnailCache()
+        self.generated = 0
+        self._latest = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cinesq-thumbs")
+
+    def request(self, path):
+        self._latest = path
+        self._executor.submit(self._run, path)
+
+    def _run(self, path):
+        if path != self._latest:
+            return
+        # Worker thread: anything raised here would vanish into the future
+        try:
+            sheet = self.cache.load(path)
+            if sheet is None:
+                sheet = self._generate(path)
+                if sheet is None:
+                    if path == self._latest:
+                        self.failed.emit(path, "no frames could be decoded")
+                    return
+                self.generated += 1
+                self.cache.store(path, sheet)
+        except Exception as e:
+            self.failed.emit(path, str(e))
+            return
+        if path == self._latest:
+            self.ready.emit(path, sheet)
+
+    def _generate(self, path):
+        w, h = self.TILE_WIDTH, self.TILE_HEIGHT
+        pipeline = Gst.parse_launch(
+            f"uridecodebin name=src ! videoconvert ! videoscale add-borders=true "
+            f"! video/x-raw,format=RGBx,width={w},height={h},pixel-aspect-ratio=1/1 "
+            f"! appsink name=sink sync=false max-buffers=1"
+        )
+        pipeline.get_by_name("src").set_property("uri", Gst.filename_to_uri(path))
+        sink = pipeline.get_by_name("sink")
+
+        try:
+            pipeline.set_state(Gst.State.PAUSED)
+            if pipeline.get_state(self.STATE_TIMEOUT).state != Gst.State.PAUSED:
+                return None  # no video stream, or not decodable
+            ok, duration = pipeline.query_duration(Gst.Format.TIME)
+            if not ok or duration <= 0:
+                return None
+
+            rows = (self.COUNT + self.COLUMNS - 1) // self.COLUMNS
+            image = QImage(w * self.COLUMNS, h * rows, QImage.Format_RGB32)
+            image.fill(Qt.black)
+            painter = QPainter(image)
+            try:
+                for i in range(self.COUNT):
+                    if path != self._latest:
+                        return None
+                    target = duration * (2 * i + 1) // (2 * self.COUNT)
+                    pipeline.seek_simple(
+                        Gst.Format.TIME,
+                        Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT | Gst.SeekFlags.SNAP_NEAREST,
+                        target,
+                    )
+                    pipeline.get_state(self.STATE_TIMEOUT)
+                    sample = sink.emit("pull-preroll")
+                    if sample is None:
+                        continue
+                    tile = self._to_image(sample, w, h)
+                    if tile is not None:
+                        painter.drawImage((i % self.COLUMNS) * w, (i // self.COLUMNS) * h, tile)
+            finally:
+                painter.end()
+            return SpriteSheet(image, w, h, self.COLUMNS, self.COUNT)
+        finally:
+            pipeline.set_state(Gst.State.NULL)
+
+    @staticmethod
+    def _to_image(sample, w, h):
+        buffer = sample.get_buffer()
+        ok, info = buffer.map(Gst.MapFlags.READ)
+        if not ok:
+            return None
+        try:
+            # RGBx rows are 4-byte aligned already, so the stride is w * 4
+            return QImage(bytes(info.data), w, h, w * 4, QImage.Format_RGBX8888).copy()
+        finally:
+            buffer.unmap(info)
+
+    def shutdown(self):
+        self._latest = None
+        self._executor.shutdown(wait=False)
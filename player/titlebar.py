@@ -7,17 +7,16 @@ class CustomTitleBar(QWidget):
         super().__init__(parent)
 
         self.setFixedHeight(40)
-        self.setStyleSheet("""
-            background-color: rgba(30, 30, 30, 220);
-            color: white;
-        """)
+        # Colours and fonts come from the theme (#CustomTitleBar in themes/_base.qss)
+        self.setObjectName("CustomTitleBar")
+        self.setAttribute(Qt.WA_StyledBackground, True)
 
         layout = QHBoxLayout()
         layout.setContentsMargins(10, 0, 10, 0)
 
         # App name
         self.title = QLabel("Cinesq")
-        self.title.setStyleSheet("font-weight: bold; font-size: 16px;")
+        self.title.setObjectName("TitleLabel")
         layout.addWidget(self.title)
 
         layout.addStretch()
@@ -39,7 +38,6 @@ class CustomTitleBar(QWidget):
 
         for btn in [self.min_button, self.max_button, self.close_button]:
             btn.setFixedSize(30, 30)
-            btn.setStyleSheet("background: none; color: white; border: none; font-size: 14px;")
 
         self.setLayout(layout)
         self._is_maximized = False
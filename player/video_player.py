@@ -1,84 +1,166 @@
 # video_player.py
 
+import logging
 import os
 import sys
 import subprocess
-import json
 import gi
 
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QListWidget, QShortcut,
-    QMenu, QMenuBar, QAction, QMessageBox
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QListView, QShortcut,
+    QMenu, QMenuBar, QAction, QActionGroup, QMessageBox, QInputDialog
 )
 from PyQt5.QtGui import QKeySequence
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QByteArray, QEvent, Qt, QTimer, pyqtSignal
 
 gi.require_version('Gst', '1.0')
-gi.require_version('GstVideo', '1.0')
-gi.require_version('Gtk', '3.0')
-from gi.repository import Gst, GObject, GstVideo
-
-from player.controls import PlayerControls
+from gi.repository import Gst, GObject
+
+from player.capture import FrameCapture
+from player.controls import PlayerControls, SubtitleOverlay
+from player.engine import PlaybackEngine
+from player.gapless import GaplessController
+from player.ingest import MediaIngest
+from player.library import LibraryIndex, LibraryScanner
+from player.loudness import LoudnessAnalyzer, LoudnessNormalizer
 from player.menubar import create_menu_bar
-from player.playlist import Playlist
+from player.metrics import MetricsOverlay, PlaybackMetrics
+from player.multiview import MAX_GRID_STREAMS, GridWindow, VideoView
+from player.network import BufferConfig, display_name, local_path, to_uri
+from player.opener import MediaOpener
+from player.playlist import Playlist, PlaylistModel
+from player.playlist_formats import read_playlist, write_playlist
+from player.rendering import RenderConfig, VideoOutput
+from player.resume import ResumeStore
+from player.settings import Settings
+from player.startup import GstLoader, profile
+from player.storage import DEFAULT_PLAYLIST, PlaylistJournal
+from player.subtitles import find_sidecar
+from player.theming import DEFAULT_THEME, LIGHT_THEME, ThemeError, ThemeManager
+from player.thumbnails import ThumbnailCache, ThumbnailEngine
+from player.visualizer import (
+    HAVE_NUMPY, OFF, SPECTRUM, SpectrumAnalyzer, SpectrumView, available_vis_plugins, default_mode,
+    make_audio_tap, set_vis_plugin
+)
+
+log = logging.getLogger(__name__)
 
-Gst.init(None)
 
-CONFIG_DIR = os.path.expanduser("~/.config/cinesq")
-RECENT_FILE = os.path.join(CONFIG_DIR, "recent.json")
+# Only files this long are resumed, and only from past this point; ending
+# within RESUME_END_MARGIN of the end counts as finished
+RESUME_MIN_DURATION = 120 * Gst.SECOND
+RESUME_MIN_POSITION = 15 * Gst.SECOND
+RESUME_END_MARGIN = 30 * Gst.SECOND
+# Playlist entries after the current one measured ahead of playback
+LOUDNESS_LOOKAHEAD = 2
 
 class CinesqPlayer(QMainWindow):
+    # Fired once GStreamer is up and the playback engine has been built
+    engine_ready = pyqtSignal()
+    pip_changed = pyqtSignal(bool)
+
     def __init__(self):
         super().__init__()
+        # GStreamer initializes on a thread while the window is built;
+        # everything that needs it is created in build_engine().
+        self.gst_loader = GstLoader(self)
+        self.gst_loader.ready.connect(self.build_engine)
+        self.gst_loader.failed.connect(self.on_gst_failed)
+        self.gst_loader.start()
+
+        # Read once, before anything that is configured from it
+        self.settings = Settings(parent=self)
+
         self.setWindowTitle("Cinesq Player")
         self.setAcceptDrops(True)
         self.setMinimumSize(800, 500)
 
         self.is_dark_theme = True
         self.is_fullscreen = False
-        self.playlist_visible = False
-        self.recent_files = self.load_recent_files()
-
-        self.load_dark_qss()
+        self.current_file = None
+        self.current_path = None  # current_file on disk, None for streams
+        self.pending_file = None
+        self.buffer_config = BufferConfig.from_settings(self.settings)
+        self.engine = None
+        # Extra windows: views of this player's video (fed by its tee) and grids
+        self.video_views = {}   # view name -> VideoView
+        self.pip_view = None
+        self.grid_windows = []
+
+        # One application-wide stylesheet, compiled once per theme
+        self.theme_manager = ThemeManager(parent=self)
+        self.apply_theme(self.settings.get("theme") or DEFAULT_THEME)
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
 
-        # GStreamer pipeline
-        self.pipeline = Gst.ElementFactory.make("playbin", "player")
         self.video_widget = QWidget()
-        self.video_window_id = None
-
-        # Player controls
+        self.video_widget.setAttribute(Qt.WA_NativeWindow)
+        self.metrics_overlay = MetricsOverlay(self)
+        self.subtitle_overlay = SubtitleOverlay(self)
+        self.subtitle_overlay.set_font_size(self.settings.get("subtitles.font_size"))
+        self.sprite_sheet = None
+        # Takes the video widget's place for audio-only media
+        self.spectrum_view = SpectrumView(parent=self)
+        self.spectrum_view.setVisible(False)
+        self.settings.watch("audio.visualizer", self.apply_visualizer)
+
+        # Player controls, enabled once the engine is ready
         self.controls = PlayerControls(self)
+        self.controls.setEnabled(False)
+        self.controls.volume_slider.setValue(self.settings.get("volume"))
+        self.theme_manager.changed.connect(lambda *_: self.controls.refresh_icons())
         self.controls.play_button.clicked.connect(self.toggle_play)
         self.controls.stop_button.clicked.connect(self.stop_video)
-        self.controls.rewind_button.clicked.connect(lambda: self.seek(-10))
-        self.controls.forward_button.clicked.connect(lambda: self.seek(10))
+        self.controls.rewind_button.clicked.connect(lambda: self.seek_relative(-10))
+        self.controls.forward_button.clicked.connect(lambda: self.seek_relative(10))
         self.controls.volume_slider.valueChanged.connect(self.set_volume)
         self.controls.seek_slider.sliderMoved.connect(self.set_position)
+        self.controls.seek_slider.sliderReleased.connect(
+            lambda: self.set_position(self.controls.seek_slider.value(), accurate=True))
+        self.controls.seek_slider.hovered.connect(self.show_seek_preview)
         self.controls.fullscreen_button.clicked.connect(self.toggle_fullscreen)
 
         # Playlist
         self.playlist_model = Playlist()
-        self.playlist_widget = QListWidget()
+        self.playlist_widget = QListView()
+        self.playlist_widget.setModel(PlaylistModel(self.playlist_model, self))
+        self.playlist_widget.setUniformItemSizes(True)
         self.playlist_widget.setMaximumHeight(100)
-        self.playlist_widget.setVisible(False)
-        self.playlist_widget.itemDoubleClicked.connect(self.play_selected_video)
-        self.playlist_model.changed.connect(self.refresh_playlist_view)
+        self.playlist_widget.setVisible(self.settings.get("playlist.visible"))
+        self.playlist_widget.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.playlist_widget.customContextMenuRequested.connect(self.show_playlist_menu)
+        self.playlist_widget.doubleClicked.connect(self.play_selected_video)
         self.playlist_model.index_changed.connect(self.play_index)
-
-
-
-        # Timer for position updates
-        self.timer = self.startTimer(500)
-
-        # Connect video output
-        self.connect_video_sink()
+        self.playlist_journal = PlaylistJournal(self.playlist_model, self)
+        self.playlist_journal.error.connect(self.show_storage_error)
+        # Entries load in chunks from the event loop; files added meanwhile are kept
+        self.playlist_journal.open()
+
+        # Media library, refreshed in the background
+        self.library = LibraryIndex()
+        self.library_scanner = LibraryScanner(self.library, parent=self)
+        self.library_scanner.finished.connect(self.on_library_scanned)
+
+        # Per-file resume positions, read and written off the GUI thread
+        self.resume = ResumeStore(parent=self)
+        # While the position tracker is suspended nothing else records it
+        self.resume_poll = QTimer(self)
+        self.resume_poll.setInterval(ResumeStore.MAX_FLUSH_INTERVAL_MS)
+        self.resume_poll.timeout.connect(self.record_current_position)
+        self.resume.found.connect(self.on_resume_found)
+        self.resume_tracks = {}
+
+        # Drops, File > Open and command-line paths: folders are expanded and
+        # files sniffed on worker threads, then added as one batch
+        self.ingest = MediaIngest(parent=self)
+        self.ingest.first_found.connect(self.on_ingest_first)
+        self.ingest.finished.connect(self.on_ingest_finished)
 
         # Layout
         layout = QVBoxLayout()
         layout.addWidget(self.video_widget)
+        layout.addWidget(self.spectrum_view)
         layout.addWidget(self.controls)
         layout.addWidget(self.playlist_widget)
         central_widget.setLayout(layout)
@@ -98,13 +180,28 @@ class CinesqPlayer(QMainWindow):
         file_menu.addMenu(playlist_menu)
 
         toggle_playlist_action = QAction("Show Playlist", self, checkable=True)
+        toggle_playlist_action.setChecked(self.settings.get("playlist.visible"))
         toggle_playlist_action.triggered.connect(self.toggle_playlist)
+        self.settings.watch("playlist.visible", toggle_playlist_action.setChecked)
         playlist_menu.addAction(toggle_playlist_action)
 
+        gapless_action = QAction("Gapless Playback", self, checkable=True)
+        gapless_action.setChecked(self.settings.get("playback.gapless"))
+        gapless_action.triggered.connect(self.set_gapless)
+        playlist_menu.addAction(gapless_action)
+
         playlist_menu.addSeparator()
         playlist_menu.addAction("Clear Playlist", self.playlist_model.clear)
-        playlist_menu.addAction("Save Playlist...", self.playlist_model.save)
-        playlist_menu.addAction("Load Playlist...", self.playlist_model.load)
+        playlist_menu.addAction("Save Playlist As...", self.save_playlist_as)
+        playlist_menu.addAction("Open Saved Playlist...", self.open_saved_playlist)
+        playlist_menu.addSeparator()
+        playlist_menu.addAction("Import M3U/XSPF...", self.import_playlist)
+        playlist_menu.addAction("Export M3U/XSPF...", self.export_playlist)
+
+        library_menu = QMenu("Library", self)
+        file_menu.addMenu(library_menu)
+        library_menu.addAction("Add Folder to Library...", self.add_library_folder)
+        library_menu.addAction("Rescan Library", self.rescan_library)
 
         about_action = QAction("About", self)
         about_action.triggered.connect(self.show_about)
@@ -115,66 +212,270 @@ class CinesqPlayer(QMainWindow):
             toggle_theme = QAction("Toggle Light/Dark", self)
             toggle_theme.triggered.connect(self.toggle_theme)
             view_menu.addAction(toggle_theme)
-
-        # Timer for position updates
-        self.timer = self.startTimer(500)
-
-        # Connect video output
-        self.connect_video_sink()
-
-    def connect_video_sink(self):
-        self.video_sink = Gst.ElementFactory.make("gtksink", None)
-        if self.video_sink:
-            self.pipeline.set_property("video-sink", self.video_sink)
-            widget = self.video_sink.props.widget
-            if widget:
-                widget.set_parent_window(self.video_widget.winId())
-                layout = QVBoxLayout(self.video_widget)
-                layout.setContentsMargins(0, 0, 0, 0)
-                layout.addWidget(widget)
+            theme_menu = view_menu.addMenu("Theme")
+            theme_menu.aboutToShow.connect(lambda: self.fill_theme_menu(theme_menu))
+
+        profile.mark("ui")
+
+    def build_engine(self):
+        """Create the pipeline and everything driving it, once GStreamer is initialized."""
+        # With NumPy the audio goes through a tap the spectrum view can open
+        tap = make_audio_tap() if HAVE_NUMPY else None
+        engine = self.engine = PlaybackEngine(audio_sink=tap, parent=self)
+        engine.bus.eos.connect(self.on_eos)
+        engine.bus.error.connect(self.on_error)
+        engine.bus.state_changed.connect(self.on_state_changed)
+        engine.position_tracker.position_changed.connect(self.update_position)
+        engine.position_tracker.set_resolution(self.controls.seek_slider.width())
+        engine.position_tracker.set_suspended(self.controls.suspended)
+        engine.opener.phase_changed.connect(self.on_open_phase_changed)
+        engine.opener.prerolled.connect(self.request_thumbnails)
+        engine.opener.prerolled.connect(self.apply_resume_tracks)
+        engine.opener.prerolled.connect(self.update_visualizer)
+        engine.streams.changed.connect(self.update_visualizer)
+        engine.subtitles.cue_changed.connect(self.subtitle_overlay.show_text)
+        engine.buffering.progress.connect(self.on_buffering)
+        engine.buffering.apply(self.buffer_config)
+        engine.subtitles.failed.connect(self.on_subtitle_failed)
+        engine.set_subtitle_font(f"Sans {self.subtitle_overlay.font_size}")
+        self.video_output = VideoOutput(engine.pipeline, engine.bus, RenderConfig(**self.settings.section("render")))
+        self.video_output.set_window_handle(int(self.video_widget.winId()))
+        self.spectrum = SpectrumAnalyzer(tap, self) if tap is not None else None
+        self.spectrum_view.set_analyzer(self.spectrum)
+        self.apply_visualizer()
+
+        # Per-file gain from loudness measured ahead of time, then a limiter
+        self.loudness_analyzer = LoudnessAnalyzer(self.library, parent=self)
+        self.loudness_analyzer.finished.connect(self.on_loudness_analyzed)
+        self.loudness = LoudnessNormalizer(engine.pipeline, engine.bus, self.library, self.loudness_analyzer, self)
+        self.loudness.set_target(self.settings.get("audio.loudness_target"))
+        self.loudness.set_enabled(self.settings.get("audio.normalize"))
+        self.playlist_model.current_changed.connect(self.analyze_upcoming)
+
+        # Playback metrics, only collected while the HUD or export is on
+        self.metrics = PlaybackMetrics(engine.pipeline, engine.bus, self)
+        self.metrics.updated.connect(self.metrics_overlay.show_sample)
+
+        # Screenshots and frame export, encoded off the GUI thread
+        self.capture = FrameCapture(engine.pipeline, self)
+        self.capture.exported.connect(self.on_frames_exported)
+        self.capture.failed.connect(lambda message: QMessageBox.warning(self, "Capture", message))
+
+        # Seek previews, built off the GUI thread
+        cache = ThumbnailCache(max_bytes=self.settings.get("cache.thumbnails_mb") * 1024 * 1024)
+        self.thumbnails = ThumbnailEngine(cache, parent=self)
+        self.thumbnails.ready.connect(self.on_thumbnails_ready)
+        self.thumbnails.failed.connect(self.on_thumbnails_failed)
+
+        self.gapless = GaplessController(engine.pipeline, engine.bus, self.playlist_model, self)
+        self.gapless.set_enabled(self.settings.get("playback.gapless"))
+        self.gapless.advanced.connect(self.on_gapless_advanced)
+
+        self.set_volume(self.controls.volume_slider.value())
+        self.controls.setEnabled(True)
+        profile.mark("engine")
+
+        QTimer.singleShot(0, self.library_scanner.rescan)
+        if self.pending_file:
+            self.open_file(self.pending_file)
+            self.pending_file = None
+
+        profile.mark("ready")
+        profile.save()
+        self.engine_ready.emit()
+
+    def on_gst_failed(self, message):
+        QMessageBox.critical(self, "Cinesq Player", f"GStreamer could not be initialized:\n{message}")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        profile.mark("window")
 
     def load_subtitle(self):
-        print("Load subtitle triggered (not implemented yet).")
-
-    def connect_video_sink(self):
-        # Use the VideoOverlay interface to embed video into our Qt widget
-        overlay = self.pipeline.get_property("video-sink")
-        if isinstance(overlay, GstVideo.VideoOverlay):
-            # WinId works on both X11 and Wayland (Qt translates appropriately)
-            overlay.set_window_handle(int(self.video_widget.winId()))
-        else:
-            print("[VideoSink] Sink does not support VideoOverlay embedding")
-        
+        if self.engine is None or not self.current_file:
+            return
+        path = self.system_file_dialog("Load Subtitle", "*.srt *.ass *.ssa *.vtt")
+        if path:
+            self.engine.load_subtitles(path)
 
     def disable_subtitle(self):
-        print("Disable subtitle triggered (not implemented yet).")
+        if self.engine is not None:
+            self.engine.disable_subtitles()
 
     def adjust_sub_delay(self, ms):
-        print(f"Adjust subtitle delay by {ms} ms (not implemented yet).")
+        if self.engine is not None:
+            self.engine.set_subtitle_delay(self.engine.subtitles.delay + ms)
+            log.info("Subtitle delay %d ms", self.engine.subtitles.delay)
 
     def adjust_sub_font(self, delta):
-        print(f"Adjust subtitle font size by {delta} (not implemented yet).")
+        size = min(max(self.subtitle_overlay.font_size + delta, 10), 72)
+        self.subtitle_overlay.set_font_size(size)
+        self.settings.set("subtitles.font_size", size)
+        if self.engine is not None:
+            self.engine.set_subtitle_font(f"Sans {size}")
+
+    def fill_track_menu(self, menu, kind):
+        menu.clear()
+        streams = self.engine.streams.tracks(kind) if self.engine is not None else []
+        current = self.engine.streams.current(kind) if self.engine is not None else -1
+        group = QActionGroup(menu)
+        if kind == "text" and streams:
+            off = menu.addAction("Off")
+            off.setCheckable(True)
+            off.setChecked(current < 0)
+            off.triggered.connect(lambda: self.select_track("text", -1))
+            group.addAction(off)
+        for i, stream in enumerate(streams):
+            action = menu.addAction(stream.label())
+            action.setCheckable(True)
+            action.setChecked(i == current)
+            action.triggered.connect(lambda checked=False, i=i: self.select_track(kind, i))
+            group.addAction(action)
+        if not streams:
+            menu.addAction("No tracks").setEnabled(False)
+
+    def select_track(self, kind, index):
+        self.engine.select_stream(kind, index)
+        if self.current_path:
+            self.resume.update(self.current_path, **{"audio" if kind == "audio" else "subtitle": index})
+
+    def on_resume_found(self, path, entry):
+        if self.engine is None or path != self.current_path:
+            return
+        self.resume_tracks = {}
+        if entry:
+            if entry["volume"] is not None:
+                self.controls.volume_slider.setValue(int(round(entry["volume"] * 100)))
+            if entry["audio"] is not None:
+                self.resume_tracks["audio"] = entry["audio"]
+            if entry["subtitle"] is not None:
+                self.resume_tracks["text"] = entry["subtitle"]
+        # Tracks are applied once prerolled, which this may complete right away
+        self.engine.opener.set_start(entry["position"] if entry else 0)
+
+    def apply_resume_tracks(self, *_):
+        tracks, self.resume_tracks = self.resume_tracks, {}
+        for kind, index in tracks.items():
+            if index < len(self.engine.streams.tracks(kind)):
+                self.engine.select_stream(kind, index)
+
+    def jump_to_cue(self, forward):
+        if self.engine is None:
+            return
+        position = self.engine.subtitles.cue_position(forward)
+        if position is not None:
+            self.engine.seek(position, accurate=True)
 
-    def load_dark_qss(self):
+    def on_subtitle_failed(self, path, message):
+        QMessageBox.warning(self, "Subtitles", f"Could not load {os.path.basename(path)}: {message}")
+
+    def apply_theme(self, name):
         try:
-            with open("themes/vlc_dark.qss", "r") as f:
-                self.setStyleSheet(f.read())
-        except Exception as e:
-            print(f"Failed to load theme: {e}")
+            self.theme_manager.apply(name)
+        except ThemeError as e:
+            log.warning("%s", e)
+            if self.theme_manager.current is not None or name == DEFAULT_THEME:
+                return
+            # Nothing applied yet (a saved theme that was deleted): don't start unstyled
+            self.settings.set("theme", None)
+            self.apply_theme(DEFAULT_THEME)
+            return
+        self.is_dark_theme = name != LIGHT_THEME
+        self.settings.set("theme", name)
 
     def toggle_theme(self):
-        self.is_dark_theme = not self.is_dark_theme
-        self.setStyleSheet(self.load_dark_qss() if self.is_dark_theme else "")
+        self.apply_theme(LIGHT_THEME if self.is_dark_theme else DEFAULT_THEME)
+
+    def fill_theme_menu(self, menu):
+        menu.clear()
+        group = QActionGroup(menu)
+        for name in self.theme_manager.themes():
+            action = menu.addAction(name.replace("_", " ").title())
+            action.setCheckable(True)
+            action.setChecked(name == self.theme_manager.current)
+            action.triggered.connect(lambda checked=False, n=name: self.apply_theme(n))
+            group.addAction(action)
+        menu.addSeparator()
+        menu.addAction("Reload Themes", self.theme_manager.reload)
 
-    def system_file_dialog(self, title="Select File", file_filter="*.*"):
+    def system_file_dialog(self, title="Select File", file_filter="*.*", directory=False, save=False,
+                           multiple=False):
         try:
-            cmd = ["zenity", "--file-selection", "--title", title, "--file-filter", f"{file_filter} | {file_filter}"]
+            cmd = ["zenity", "--file-selection", "--title", title]
+            if multiple:
+                # A newline can't appear in what zenity reads back as a path list
+                cmd += ["--multiple", "--separator", "\n"]
+            if directory:
+                cmd.append("--directory")
+            else:
+                cmd += ["--file-filter", f"{file_filter} | {file_filter}"]
+            if save:
+                cmd += ["--save", "--confirm-overwrite"]
             result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
-            return result.stdout.strip() if result.returncode == 0 else None
+            if result.returncode != 0:
+                return None
+            if multiple:
+                return [line for line in result.stdout.splitlines() if line] or None
+            return result.stdout.strip()
         except Exception as e:
-            print(f"[FileDialog] Error: {e}")
+            log.warning("File dialog failed: %s", e)
             return None
 
+    def add_library_folder(self):
+        folder = self.system_file_dialog("Add Folder to Library", directory=True)
+        if not folder:
+            return
+        if self.engine is None:
+            # Recorded now, scanned by the rescan in build_engine()
+            self.library.add_root(folder)
+        else:
+            self.library_scanner.scan([folder])
+
+    def rescan_library(self):
+        # Probing needs GStreamer; build_engine() rescans anyway
+        if self.engine is not None:
+            self.library_scanner.rescan()
+
+    def on_library_scanned(self, stats):
+        log.info("Library: %d files, %d probed (%d failed), %d removed in %ss",
+                 stats["files"], stats["probed"], stats["failed"], stats["removed"], stats["seconds"])
+        if self.engine is not None and self.settings.get("audio.normalize") \
+                and self.settings.get("audio.analyze_library"):
+            self.loudness_analyzer.analyze_library()
+
+    def analyze_upcoming(self, *_):
+        """Measure the current entry and the next few, ahead of everything else queued."""
+        if self.engine is None or not self.settings.get("audio.normalize"):
+            return
+        start = max(self.playlist_model.current_index, 0)
+        paths = self.playlist_model.files[start:start + 1 + LOUDNESS_LOOKAHEAD]
+        if paths:
+            self.loudness_analyzer.analyze(paths, first=True)
+
+    def set_library_loudness_analysis(self, enabled):
+        self.settings.set("audio.analyze_library", enabled)
+        if self.engine is None:
+            return
+        if enabled:
+            if self.settings.get("audio.normalize"):
+                self.loudness_analyzer.analyze_library()
+        else:
+            self.loudness_analyzer.cancel()
+
+    def on_loudness_analyzed(self, stats):
+        log.info("Loudness: %d files measured (%d failed) in %ss", stats["measured"], stats["failed"], stats["seconds"])
+
+    def set_loudness_normalization(self, enabled):
+        self.settings.set("audio.normalize", enabled)
+        if self.engine is not None:
+            self.loudness.set_enabled(enabled)
+            self.analyze_upcoming()
+
+    def set_loudness_target(self, lufs):
+        self.settings.set("audio.loudness_target", lufs)
+        if self.engine is not None:
+            self.loudness.set_target(lufs)
+
     def show_about(self):
         QMessageBox.information(self, "About Cinesq", (
             "<b>Cinesq Player</b><br><br>"
@@ -191,90 +492,399 @@ class CinesqPlayer(QMainWindow):
         ))
 
     def toggle_play(self):
-        state = self.pipeline.get_state(1).state
-        if state == Gst.State.PLAYING:
-            self.pipeline.set_state(Gst.State.PAUSED)
-            self.controls.set_playing(False)
-        else:
-            self.pipeline.set_state(Gst.State.PLAYING)
-            self.controls.set_playing(True)
+        if self.engine is None:
+            return
+        self.controls.set_playing(self.engine.toggle())
 
     def stop_video(self):
-        self.pipeline.set_state(Gst.State.NULL)
+        if self.engine is None:
+            return
+        self.engine.stop()
         self.controls.set_playing(False)
 
     def set_volume(self, value):
-        self.pipeline.set_property("volume", value / 100.0)
+        if self.engine is None:
+            return
+        self.engine.set_volume(value / 100.0)
+        self.settings.set("volume", value)
+        if self.current_path:
+            self.resume.update(self.current_path, volume=value / 100.0)
 
     def adjust_volume(self, delta):
-        current = self.pipeline.get_property("volume")
-        self.set_volume(min(max((current * 100) + delta, 0), 100))
-
-    def seek(self, seconds):
-        success = self.pipeline.seek_simple(
-            Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
-            self.pipeline.query_position(Gst.Format.TIME)[1] + seconds * Gst.SECOND
-        )
-        if not success:
-            print("[Seek] Failed")
-
-    def set_position(self, pos):
-        dur = self.pipeline.query_duration(Gst.Format.TIME)[1]
-        self.pipeline.seek_simple(
-            Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
-            int(pos / 1000 * dur)
-        )
-
-    def timerEvent(self, _):
-        success, pos = self.pipeline.query_position(Gst.Format.TIME)
-        success_dur, dur = self.pipeline.query_duration(Gst.Format.TIME)
-        if success and success_dur and dur:
-            p = pos / dur if dur > 0 else 0
-            self.controls.seek_slider.setValue(int(p * 1000))
-            self.controls.time_left.setText(f"{pos // Gst.SECOND // 60:02}:{(pos // Gst.SECOND) % 60:02}")
-            self.controls.time_right.setText(f"{dur // Gst.SECOND // 60:02}:{(dur // Gst.SECOND) % 60:02}")
-
-    def load_recent_files(self):
-        try:
-            if os.path.exists(RECENT_FILE):
-                with open(RECENT_FILE, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"[Recent] Failed to load: {e}")
-        return []
+        # Through the slider, so it shows the change; valueChanged sets the volume
+        slider = self.controls.volume_slider
+        slider.setValue(min(max(slider.value() + delta, slider.minimum()), slider.maximum()))
 
-    def save_recent_files(self):
-        try:
-            os.makedirs(CONFIG_DIR, exist_ok=True)
-            with open(RECENT_FILE, 'w') as f:
-                json.dump(self.recent_files[-10:], f)
-        except Exception as e:
-            print(f"[Recent] Failed to save: {e}")
+    def seek_relative(self, seconds):
+        if self.engine is None:
+            return
+        self.engine.seek_relative(seconds)
+
+    def set_position(self, pos, accurate=False):
+        if self.engine is None:
+            return
+        self.engine.seek_fraction(pos / 1000, accurate)
+
+    def step_frame(self, forward=True):
+        if self.engine is None:
+            return
+        self.engine.step_frame(forward)
+
+    def update_position(self, pos, dur):
+        self.controls.set_progress(pos, dur)
+        if dur > 0:
+            self.record_position(pos, dur)
+
+    def update_suspension(self):
+        self.spectrum_view.set_suspended(self.isMinimized())
+        # Nothing shows the position while minimized or in fullscreen without controls
+        hidden = self.isMinimized() or self.controls.isHidden()
+        if hidden == self.controls.suspended:
+            return
+        if self.engine is not None:
+            if hidden:
+                # Last update before going quiet, for the resume position
+                self.engine.position_tracker.poll()
+            self.engine.position_tracker.set_suspended(hidden)
+        if hidden:
+            self.resume_poll.start()
+        else:
+            self.resume_poll.stop()
+        self.controls.set_suspended(hidden)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.update_suspension()
+
+    def record_current_position(self):
+        if self.engine is not None and self.engine.duration() > 0:
+            self.record_position(self.engine.position(), self.engine.duration())
+
+    def record_position(self, pos, dur):
+        if not self.current_path or dur < RESUME_MIN_DURATION or self.engine.opener.is_busy():
+            return
+        if dur - pos < RESUME_END_MARGIN:
+            # Watched to the end: start from the beginning next time
+            self.resume.forget(self.current_path)
+        elif pos >= RESUME_MIN_POSITION:
+            self.resume.update(self.current_path, position=pos)
+
+    def set_gapless(self, enabled):
+        self.settings.set("playback.gapless", enabled)
+        if self.engine is not None:
+            self.gapless.set_enabled(enabled)
+
+    def change_speed(self, step):
+        if self.engine is None:
+            return
+        if step > 0:
+            self.engine.seeker.faster()
+        elif step < 0:
+            self.engine.seeker.slower()
+        else:
+            self.engine.seeker.normal_speed()
+
+    def request_thumbnails(self, *_):
+        self.sprite_sheet = None
+        if self.current_path:
+            self.thumbnails.request(self.current_path)
+
+    def on_thumbnails_ready(self, path, sheet):
+        if path == self.current_path:
+            self.sprite_sheet = sheet
+
+    def on_thumbnails_failed(self, path, message):
+        # Seek previews just stay off for this file
+        log.warning("No previews for %s: %s", path, message)
+
+    def show_seek_preview(self, fraction, global_pos):
+        dur = self.engine.duration() if self.engine is not None else 0
+        if not dur:
+            return
+        secs = int(fraction * dur // Gst.SECOND)
+        image = self.sprite_sheet.frame_at(fraction) if self.sprite_sheet else None
+        self.controls.seek_preview.show_at(global_pos, f"{secs // 60:02}:{secs % 60:02}", image)
+
+    def fill_visualizer_menu(self, menu):
+        menu.clear()
+        modes = [(OFF, "Off")]
+        if HAVE_NUMPY:
+            modes.append((SPECTRUM, "Spectrum"))
+        if self.engine is not None:
+            modes += [(name, name.capitalize()) for name in available_vis_plugins()]
+        group = QActionGroup(menu)
+        for mode, label in modes:
+            action = menu.addAction(label)
+            action.setCheckable(True)
+            action.setChecked(mode == self.visualizer_mode())
+            action.triggered.connect(lambda checked=False, m=mode: self.set_visualizer(m))
+            group.addAction(action)
+
+    def visualizer_mode(self):
+        return self.settings.get("audio.visualizer") or default_mode()
+
+    def set_visualizer(self, mode):
+        """OFF, SPECTRUM, or one of playbin's visualizers, for media without video."""
+        self.settings.set("audio.visualizer", mode)
+
+    def apply_visualizer(self, *_):
+        mode = self.visualizer_mode()
+        if self.engine is not None:
+            set_vis_plugin(self.engine.pipeline, None if mode in (OFF, SPECTRUM) else mode)
+        self.update_visualizer()
+
+    def update_visualizer(self, *_):
+        audio_only = (self.engine is not None and self.current_file is not None
+                      and not self.engine.streams.tracks("video") and bool(self.engine.streams.tracks("audio")))
+        spectrum = audio_only and self.visualizer_mode() == SPECTRUM
+        self.spectrum_view.setVisible(spectrum)
+        self.video_widget.setVisible(not spectrum)
+
+    def on_state_changed(self, old, new):
+        self.controls.set_playing(new == Gst.State.PLAYING)
+
+    def on_eos(self):
+        # Only reached when gapless playback did not queue anything
+        if self.current_path:
+            self.resume.forget(self.current_path)
+        index = self.playlist_model.next_index()
+        if index >= 0:
+            self.playlist_model.set_index(index)
+        else:
+            self.engine.pause()
+
+    def on_gapless_advanced(self, index):
+        # The previous file played to its end
+        if self.current_path:
+            self.resume.forget(self.current_path)
+        self.current_file = self.playlist_model.current()
+        self.current_path = local_path(self.current_file)
+        self.engine.opener.uri = to_uri(self.current_file)
+        # The demuxer may not know the duration yet right after the switch
+        duration = self.gapless.duration_of(self.current_file)
+        if duration:
+            self.engine.position_tracker.set_duration(duration)
+        else:
+            self.engine.position_tracker.invalidate_duration()
+        self.on_open_phase_changed(self.engine.opener.phase)
+        self.request_thumbnails()
+        # No preroll here, and classic playbin doesn't signal new streams
+        self.update_visualizer()
+        self.add_recent_file(self.current_file)
+
+    def on_open_phase_changed(self, phase):
+        name = display_name(self.current_file or "")
+        if phase == MediaOpener.OPENING:
+            self.setWindowTitle(f"Opening {name}… — Cinesq Player")
+        elif phase in (MediaOpener.PREROLLED, MediaOpener.PLAYING):
+            self.setWindowTitle(f"{name} — Cinesq Player")
+        else:
+            self.setWindowTitle("Cinesq Player")
+
+    def on_buffering(self, percent):
+        name = display_name(self.current_file or "")
+        if percent < 100:
+            self.setWindowTitle(f"Buffering {percent}% — {name} — Cinesq Player")
+        else:
+            self.on_open_phase_changed(self.engine.opener.phase)
+
+    def set_download_buffering(self, enabled):
+        self.buffer_config.download = enabled
+        self.apply_buffer_config()
+
+    def edit_buffer_size(self):
+        current = max(self.buffer_config.size, 0) // (1024 * 1024)
+        size, ok = QInputDialog.getInt(self, "Network Buffer", "Buffer size in MB (0 = default):",
+                                       current, 0, 1024)
+        if ok:
+            self.buffer_config.size = size * 1024 * 1024 if size else -1
+            self.apply_buffer_config()
+
+    def edit_buffer_duration(self):
+        current = max(int(self.buffer_config.duration), 0)
+        seconds, ok = QInputDialog.getInt(self, "Network Buffer", "Buffer duration in seconds (0 = default):",
+                                          current, 0, 600)
+        if ok:
+            self.buffer_config.duration = seconds or -1
+            self.apply_buffer_config()
+
+    def apply_buffer_config(self):
+        self.buffer_config.save(self.settings)
+        if self.engine is not None:
+            self.engine.buffering.apply(self.buffer_config)
+        log.info("Network buffering: %s", self.buffer_config.describe())
+
+    def on_error(self, message, debug):
+        log.error("Pipeline error: %s (%s)", message, debug)
+        self.stop_video()
+        QMessageBox.warning(self, "Playback Error", message)
+
+    def toggle_hud(self, visible):
+        if self.engine is None:
+            return
+        self.metrics.set_enabled(visible or self.metrics.export)
+        if visible:
+            self.place_overlays()
+            self.metrics_overlay.setText("Collecting metrics...")
+            self.metrics_overlay.adjustSize()
+            self.metrics_overlay.show()
+        else:
+            self.metrics_overlay.hide()
+
+    def toggle_metrics_export(self, enabled):
+        if self.engine is None:
+            return
+        self.metrics.set_export(enabled)
+        self.metrics.set_enabled(enabled or self.metrics_overlay.isVisible())
+
+    def place_overlays(self):
+        top_left = self.video_widget.mapToGlobal(self.video_widget.rect().topLeft())
+        self.metrics_overlay.move(top_left)
+        self.subtitle_overlay.set_anchor(self.video_widget.rect().translated(top_left))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.place_overlays()
+        if self.engine is not None:
+            self.engine.position_tracker.set_resolution(self.controls.seek_slider.width())
+            self.video_output.expose()
+
+    def moveEvent(self, event):
+        super().moveEvent(event)
+        self.place_overlays()
+
+    def save_playlist_as(self):
+        name, ok = QInputDialog.getText(self, "Save Playlist", "Playlist name:")
+        name = name.strip().replace(os.sep, "_")
+        if ok and name:
+            self.playlist_journal.save_as(name)
+
+    def open_saved_playlist(self):
+        names = PlaylistJournal.names() or [DEFAULT_PLAYLIST]
+        current = names.index(self.playlist_journal.name) if self.playlist_journal.name in names else 0
+        name, ok = QInputDialog.getItem(self, "Open Playlist", "Playlist:", names, current, False)
+        if ok and name:
+            self.playlist_journal.open(name)
+
+    def import_playlist(self):
+        path = self.system_file_dialog("Import Playlist", "*.m3u *.m3u8 *.xspf")
+        if path:
+            try:
+                self.playlist_model.add_many(read_playlist(path))
+            except (OSError, ValueError) as e:
+                self.show_storage_error(f"Could not import {path}: {e}")
 
-    def open_file(self, path=None):
+    def export_playlist(self):
+        path = self.system_file_dialog("Export Playlist", "*.m3u *.m3u8 *.xspf", save=True)
+        if path:
+            if not os.path.splitext(path)[1]:
+                path += ".m3u"
+            try:
+                write_playlist(path, self.playlist_model.all_files())
+            except (OSError, ValueError) as e:
+                self.show_storage_error(f"Could not export {path}: {e}")
+
+    def show_storage_error(self, message):
+        QMessageBox.warning(self, "Cinesq Player", message)
+
+    def open_file(self, path=None, enqueue=True):
         if not path:
-            file = self.system_file_dialog("Open Media", "*.mp4 *.mkv *.avi *.webm")
+            files = self.system_file_dialog("Open Media", "*.mp4 *.mkv *.avi *.webm", multiple=True)
+            if files:
+                self.ingest_paths(files)
+            return
+        file = path
+        if self.engine is None:
+            # Opened from the command line or a drop before GStreamer is up
+            self.pending_file = file
         else:
-            file = path
-        if file:
-            self.pipeline.set_state(Gst.State.NULL)
-            self.pipeline.set_property("uri", Gst.filename_to_uri(file))
-            self.pipeline.set_state(Gst.State.PLAYING)
+            self.current_file = file
+            self.current_path = local_path(file)
+            self.gapless.cancel()
+            self.resume_tracks = {}
+            if self.current_path:
+                # Preroll waits for the saved position, so playback starts there
+                self.engine.open(to_uri(file), start=MediaOpener.START_PENDING)
+                self.resume.lookup(self.current_path)
+                sidecar = find_sidecar(self.current_path)
+                if sidecar:
+                    self.engine.load_subtitles(sidecar)
+            else:
+                self.engine.open(to_uri(file))
             self.controls.set_playing(True)
-            self.playlist_model.add(file)
-            if file not in self.recent_files:
-                self.recent_files.append(file)
-                self.recent_files = self.recent_files[-10:]
-                self.save_recent_files()
-
-    def refresh_playlist_view(self):
-        self.playlist_widget.clear()
-        for file in self.playlist_model.all_files():
-            self.playlist_widget.addItem(os.path.basename(file))
+            if enqueue:
+                self.playlist_model.add(file)
+            self.playlist_model.advance_to(self.playlist_model.index_of(file))
+            self.add_recent_file(file)
+
+    def ingest_paths(self, paths, play=True):
+        """Add files, folders and URLs to the playlist; play=True plays the first."""
+        if paths:
+            self.ingest.ingest(paths, play)
+
+    def on_ingest_first(self, path, play):
+        # Playback starts while the rest is still being sniffed; the playlist
+        # entry comes with the batch
+        if play:
+            self.open_file(path, enqueue=False)
+
+    def on_ingest_finished(self, paths, stats):
+        self.playlist_model.add_many(paths)
+        if self.current_file in self.playlist_model:
+            self.playlist_model.advance_to(self.playlist_model.index_of(self.current_file))
+        # Only what plays next is measured ahead; a large drop isn't decoded
+        # in full just because it was added
+        self.analyze_upcoming()
+
+    def take_screenshot(self):
+        if self.engine is None or not self.current_file:
+            return
+        self.capture.capture(self.current_path or display_name(self.current_file))
 
-    def play_selected_video(self, item):
-        index = self.playlist_widget.row(item)
-        self.playlist_model.set_index(index)
+    def export_frames(self):
+        if self.engine is None or not self.current_path:
+            return
+        every, ok = QInputDialog.getInt(self, "Export Frames", "Export every Nth frame:", 25, 1, 100000)
+        if not ok:
+            return
+        directory = self.system_file_dialog("Export Frames To", directory=True)
+        if directory:
+            self.capture.export(self.current_path, directory, every=every)
+
+    def on_frames_exported(self, path, count):
+        QMessageBox.information(self, "Export Frames", f"Exported {count} frames from {os.path.basename(path)}")
+
+    def open_url(self):
+        url, ok = QInputDialog.getText(self, "Open URL", "Stream URL (http, https, HLS, DASH, file):")
+        url = url.strip()
+        if ok and url:
+            if not Gst.uri_is_valid(url):
+                QMessageBox.warning(self, "Open URL", f"Not a valid URL: {url}")
+                return
+            self.open_file(url)
+
+    def add_recent_file(self, file):
+        recent = self.settings.get("recent_files")
+        if file not in recent:
+            self.settings.set("recent_files", (recent + [file])[-10:])
+
+    def restore_geometry(self):
+        """Put the window where it was last closed; False if there's nothing saved."""
+        saved = self.settings.get("window.geometry")
+        return bool(saved) and self.restoreGeometry(QByteArray.fromBase64(saved.encode()))
+
+    def play_selected_video(self, index):
+        self.playlist_model.set_index(index.row())
+
+    def show_playlist_menu(self, pos):
+        index = self.playlist_widget.indexAt(pos)
+        if not index.isValid():
+            return
+        menu = QMenu(self)
+        menu.addAction("Play", lambda: self.playlist_model.set_index(index.row()))
+        menu.addAction("Remove", lambda: self.playlist_model.remove(index.row()))
+        menu.exec_(self.playlist_widget.viewport().mapToGlobal(pos))
 
     def play_index(self, index):
         path = self.playlist_model.current()
@@ -283,7 +893,49 @@ class CinesqPlayer(QMainWindow):
 
     def toggle_playlist(self, visible):
         self.playlist_widget.setVisible(visible)
-        self.playlist_visible = visible
+        self.settings.set("playlist.visible", visible)
+
+    def open_video_view(self, pip=False):
+        """Show the current video in another window too; returns the view's name."""
+        if self.engine is None:
+            return None
+        view = VideoView(display_name(self.current_file) if self.current_file else "Cinesq", pip=pip)
+        view.show()
+        name = self.video_output.add_view(view.window_handle())
+        self.video_views[name] = view
+        view.closed.connect(lambda: self.on_video_view_closed(name))
+        return name
+
+    def on_video_view_closed(self, name):
+        view = self.video_views.pop(name, None)
+        if view is None:
+            return
+        self.video_output.remove_view(name)
+        # The branch is unlinked between two frames; its sink may still draw
+        # into the window until then
+        QTimer.singleShot(1000, view.deleteLater)
+        if name == self.pip_view:
+            self.pip_view = None
+            self.pip_changed.emit(False)
+
+    def toggle_pip(self, enabled):
+        if enabled and self.pip_view is None:
+            self.pip_view = self.open_video_view(pip=True)
+            self.pip_changed.emit(self.pip_view is not None)
+        elif not enabled and self.pip_view is not None:
+            self.video_views[self.pip_view].close()
+
+    def open_grid(self):
+        files = self.system_file_dialog(f"Compare up to {MAX_GRID_STREAMS} Files", "*.mp4 *.mkv *.avi *.webm",
+                                        multiple=True)
+        if not files:
+            return
+        if len(files) > MAX_GRID_STREAMS:
+            QMessageBox.information(self, "Grid", f"Only the first {MAX_GRID_STREAMS} files are shown.")
+        grid = GridWindow(files)
+        self.grid_windows.append(grid)
+        grid.closed.connect(lambda: self.grid_windows.remove(grid))
+        grid.show()
 
     def toggle_fullscreen(self):
         if self.isFullScreen():
@@ -293,6 +945,7 @@ class CinesqPlayer(QMainWindow):
             self.controls.hide()
             self.showFullScreen()
             self.is_fullscreen = True
+            self.update_suspension()
 
     def exit_fullscreen(self):
         if self.isFullScreen():
@@ -300,6 +953,7 @@ class CinesqPlayer(QMainWindow):
             self.menuBar().show()
             self.controls.show()
             self.is_fullscreen = False
+            self.update_suspension()
 
     def contextMenuEvent(self, event):
         if not self.isFullScreen():
@@ -313,13 +967,37 @@ class CinesqPlayer(QMainWindow):
         menu.addAction("Quit", self.close)
         menu.exec_(event.globalPos())
 
+    def closeEvent(self, event):
+        for window in list(self.video_views.values()) + self.grid_windows:
+            window.close()
+        self.metrics_overlay.hide()
+        self.subtitle_overlay.hide()
+        self.playlist_journal.shutdown()
+        self.library_scanner.cancel()
+        if self.engine is not None:
+            self.loudness_analyzer.cancel()
+        self.resume_poll.stop()
+        self.record_current_position()
+        self.resume.shutdown()
+        self.ingest.shutdown()
+        if self.engine is not None:
+            self.metrics.set_enabled(False)
+            self.thumbnails.shutdown()
+            self.capture.shutdown()
+            self.gapless.shutdown()
+            self.engine.shutdown()
+        if not self.isFullScreen():
+            self.settings.set("window.geometry", bytes(self.saveGeometry().toBase64()).decode())
+        self.settings.shutdown()
+        super().closeEvent(event)
+
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
 
     def dropEvent(self, event):
-        for url in event.mimeData().urls():
-            self.open_file(url.toLocalFile())
+        self.ingest_paths([url.toLocalFile() if url.isLocalFile() else url.toString()
+                           for url in event.mimeData().urls()])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,274 @@
+# player/visualizer.py
+
+import logging
+import threading
+
+import gi
+from PyQt5.QtCore import QObject, QRectF, QTimer
+from PyQt5.QtGui import QGuiApplication, QPainter
+from PyQt5.QtWidgets import QWidget
+
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+from player.rendering import PLAY_FLAG_VIS
+
+try:
+    import numpy as np
+except ImportError:  # the spectrum mode needs it; playbin's visualizers don't
+    np = None
+
+log = logging.getLogger(__name__)
+
+HAVE_NUMPY = np is not None
+
+# playbin visualizers, in order of preference
+VIS_PLUGINS = ("goom", "synaescope", "spectrascope", "wavescope", "spacescope", "monoscope")
+SPECTRUM = "spectrum"
+OFF = "off"
+
+FFT_SIZE = 2048
+HOP = 512            # ~94 spectra per second at 48 kHz
+BANDS = 64
+MIN_FREQ = 30.0
+MAX_FREQ = 16000.0
+MIN_DB = -80.0
+
+
+def available_vis_plugins():
+    return [name for name in VIS_PLUGINS if Gst.ElementFactory.find(name) is not None]
+
+
+def default_mode():
+    if HAVE_NUMPY:
+        return SPECTRUM
+    plugins = available_vis_plugins()
+    return plugins[0] if plugins else OFF
+
+
+def set_vis_plugin(pipeline, name):
+    """Let playbin draw audio-only media with the named visualizer; None turns it off.
+
+    playbin only uses it when the media has no video stream.
+    """
+    flags = pipeline.get_property("flags")
+    element = Gst.ElementFactory.make(name, None) if name else None
+    if name and element is None:
+        log.warning("%s not available", name)
+    if element is not None:
+        pipeline.set_property("vis-plugin", element)
+        pipeline.set_property("flags", flags | PLAY_FLAG_VIS)
+    else:
+        pipeline.set_property("flags", flags & ~PLAY_FLAG_VIS)
+
+
+def make_audio_tap(sink=None):
+    """An audio-sink bin that plays to sink (autoaudiosink) and feeds a tap.
+
+    The tap branch is closed by a valve until a SpectrumAnalyzer opens it,
+    so while nothing is drawn the only cost is the tee. The appsink is not
+    async: with the valve closed it never gets a buffer to preroll with.
+    """
+    tap = Gst.parse_bin_from_description(
+        "tee name=tee "
+        "tee. ! queue name=out "
+        "tee. ! queue leaky=downstream max-size-buffers=8 max-size-bytes=0 max-size-time=0 "
+        "! valve name=gate drop=true ! audioconvert "
+        "! audio/x-raw,format=F32LE,layout=interleaved "
+        "! appsink name=tap sync=true async=false max-buffers=4 drop=true emit-signals=true",
+        False,
+    )
+    sink = sink or Gst.ElementFactory.make("autoaudiosink", None)
+    tap.add(sink)
+    tap.get_by_name("out").link(sink)
+    tap.add_pad(Gst.GhostPad.new("sink", tap.get_by_name("tee").get_static_pad("sink")))
+    return tap
+
+
+# ─── Analysis ─────────────
+
+class SpectrumAnalysis:
+    """Band levels (0..1, log-spaced bands) of interleaved float32 PCM.
+
+    Each buffer is handled as a whole: channels are down-mixed with one
+    reshape, every complete FFT_SIZE window (HOP apart) is transformed in a
+    single batched rfft, and the band powers come from one cumulative sum. Frames
+    that don't fill a window are carried over to the next buffer.
+    """
+
+    def __init__(self, rate, channels, fft_size=FFT_SIZE, hop=HOP, bands=BANDS):
+        self.channels = channels
+        self.fft_size = fft_size
+        self.hop = hop
+        self.window = np.hanning(fft_size).astype(np.float32)
+        # Full-scale sine -> 0 dB
+        self.scale = (2.0 / self.window.sum()) ** 2
+
+        bins = fft_size // 2 + 1
+        freqs = np.fft.rfftfreq(fft_size, 1.0 / rate)
+        edges = np.geomspace(MIN_FREQ, min(MAX_FREQ, rate / 2), bands + 1)
+        index = np.clip(np.searchsorted(freqs, edges), 1, bins - 1)
+        # At least one bin per band, even where the bands are narrower than a bin
+        self.index = np.minimum(np.maximum(index, index[0] + np.arange(bands + 1)), bins - 1)
+        self.widths = np.maximum(np.diff(self.index), 1)
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def reset(self):
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def feed(self, data):
+        """Levels for the windows completed by this buffer, or None if there are none."""
+        pcm = np.frombuffer(data, dtype=np.float32)
+        pcm = pcm[:len(pcm) - len(pcm) % self.channels].reshape(-1, self.channels)
+        frames = np.concatenate((self._tail, pcm.mean(axis=1, dtype=np.float32)))
+        count = (len(frames) - self.fft_size) // self.hop + 1 if len(frames) >= self.fft_size else 0
+        if count <= 0:
+            self._tail = frames
+            return None
+        self._tail = frames[count * self.hop:]
+
+        windows = np.lib.stride_tricks.sliding_window_view(frames, self.fft_size)[::self.hop][:count]
+        power = np.abs(np.fft.rfft(windows * self.window, axis=1)) ** 2
+        total = np.concatenate(([0.0], np.cumsum(power.mean(axis=0))))
+        bands = (total[self.index[1:]] - total[self.index[:-1]]) / self.widths
+        db = 10.0 * np.log10(bands * self.scale + 1e-12)
+        return np.clip((db - MIN_DB) / -MIN_DB, 0.0, 1.0)
+
+
+class SpectrumAnalyzer(QObject):
+    """Runs SpectrumAnalysis on the audio tap's streaming thread while enabled.
+
+    Only the latest levels are kept; the view picks them up at its own
+    pace. Disabled, the tap's valve is closed and no audio reaches Python.
+    """
+
+    def __init__(self, tap, parent=None):
+        super().__init__(parent)
+        self.enabled = False
+        self._gate = tap.get_by_name("gate")
+        self._analysis = None
+        self._format = None
+        self._latest = None
+        self._lock = threading.Lock()
+        tap.get_by_name("tap").connect("new-sample", self._on_sample)
+
+    def set_enabled(self, enabled):
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        self._gate.set_property("drop", not enabled)
+        if not enabled:
+            with self._lock:
+                self._latest = None
+                if self._analysis is not None:
+                    self._analysis.reset()
+
+    def take(self):
+        """Latest levels since the last call, or None."""
+        with self._lock:
+            levels, self._latest = self._latest, None
+        return levels
+
+    def _on_sample(self, sink):
+        # Streaming thread
+        sample = sink.emit("pull-sample")
+        if sample is None:
+            return Gst.FlowReturn.EOS
+        structure = sample.get_caps().get_structure(0)
+        audio_format = (structure.get_value("rate"), structure.get_value("channels"))
+        buffer = sample.get_buffer()
+        ok, info = buffer.map(Gst.MapFlags.READ)
+        if not ok:
+            return Gst.FlowReturn.OK
+        try:
+            with self._lock:
+                if audio_format != self._format:
+                    self._format = audio_format
+                    self._analysis = SpectrumAnalysis(*audio_format)
+                levels = self._analysis.feed(info.data)
+                if levels is not None:
+                    self._latest = levels
+        finally:
+            buffer.unmap(info)
+        return Gst.FlowReturn.OK
+
+
+# ─── Drawing ─────────────
+
+class SpectrumView(QWidget):
+    """Bars for the analyzer's levels, repainted at most once per display refresh.
+
+    The analyzer is only enabled while the view is shown and not suspended
+    (window minimized); a frame with no new levels and nothing left to fall
+    is not repainted.
+    """
+
+    DECAY = 0.85  # per frame at 60 Hz
+    GAP = 2
+
+    def __init__(self, analyzer=None, parent=None):
+        super().__init__(parent)
+        self.analyzer = analyzer
+        self.suspended = False
+        self.levels = np.zeros(BANDS, dtype=np.float32) if HAVE_NUMPY else None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._tick)
+
+    def set_analyzer(self, analyzer):
+        self.analyzer = analyzer
+        self._update_active()
+
+    def set_suspended(self, suspended):
+        self.suspended = suspended
+        self._update_active()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._update_active()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_active()
+
+    def _refresh_rate(self):
+        handle = self.window().windowHandle()
+        screen = handle.screen() if handle is not None else QGuiApplication.primaryScreen()
+        return screen.refreshRate() if screen is not None and screen.refreshRate() > 0 else 60.0
+
+    def _update_active(self):
+        active = self.analyzer is not None and self.isVisible() and not self.suspended
+        if self.analyzer is not None:
+            self.analyzer.set_enabled(active)
+        if active:
+            self.timer.setInterval(max(1, round(1000 / self._refresh_rate())))
+            self.timer.start()
+        else:
+            self.timer.stop()
+            if self.levels is not None:
+                self.levels[:] = 0
+
+    def _tick(self):
+        fresh = self.analyzer.take()
+        decay = self.DECAY ** (60.0 * self.timer.interval() / 1000)
+        falling = self.levels * decay
+        if fresh is None:
+            if not self.levels.any():
+                return
+            falling[falling < 0.01] = 0
+            self.levels = falling
+        else:
+            self.levels = np.maximum(fresh.astype(np.float32), falling)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().window())
+        if self.levels is None:
+            return
+        width = self.width() / len(self.levels)
+        height = self.height()
+        color = self.palette().highlight()
+        for i, level in enumerate(self.levels):
+            bar = level * height
+            if bar >= 1:
+                painter.fillRect(QRectF(i * width, height - bar, max(width - self.GAP, 1), bar), color)